@@ -17,6 +17,39 @@ from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 
+import config
+from bar_cache import BarCache
+from feature_store import FeatureStore
+from ml_training import build_training_dataset, train_universe_model
+from model_registry import ModelRegistry, SchemaMismatchError
+from cross_sectional import (BEAR, BULL, relative_strength_columns,
+                             compute_cross_section, fetch_reference_bars,
+                             reference_tickers, relative_strength_series)
+from online_learning import OnlineModelUpdater
+from scan_telemetry import ScanTelemetry
+from sentiment import SentimentCache
+from universe_filters import prefilter_universe, coarse_screen
+
+# Bars needed to compute the rolling ML features for the latest bar
+# (price_change_20 looks back 20 bars, plus the bar itself)
+ML_FEATURE_WARMUP = 21
+
+# Feature schema produced by create_ml_features() on advanced indicators;
+# registered models trained on any other schema are refused at load time
+ML_FEATURE_COLUMNS = [
+    'price_change_1', 'price_change_5', 'price_change_20',
+    'volatility_5', 'volatility_20',
+    'volume_change', 'volume_ratio',
+    'rsi', 'rsi_change',
+    'macd', 'macd_signal', 'macd_hist',
+    'bb_width', 'bb_position',
+    'vwap_distance',
+    'adx',
+    'stoch_k', 'stoch_d',
+    'mfi',
+    'ema_cross',
+]
+
 
 class AdvancedDayTradingScreener:
     """
@@ -24,7 +57,9 @@ class AdvancedDayTradingScreener:
     """
     
     def __init__(self, min_price: float = 5.0, max_price: float = 500.0, 
-                 min_volume: int = 1000000, use_ml: bool = True):
+                 min_volume: int = 1000000, use_ml: bool = True,
+                 bar_cache: BarCache = None, feature_store: FeatureStore = None,
+                 sentiment: SentimentCache = None):
         """
         Initialize advanced screener
         
@@ -33,6 +68,11 @@ class AdvancedDayTradingScreener:
             max_price: Maximum stock price
             min_volume: Minimum average volume
             use_ml: Whether to use ML predictions
+            bar_cache: Optional on-disk cache that fetched 5m bars are merged into
+            feature_store: Optional store of ML feature rows, updated
+                incrementally on each scan
+            sentiment: Optional SentimentCache used when no sentiment
+                score is passed to analyze_with_sentiment()
         """
         self.min_price = min_price
         self.max_price = max_price
@@ -40,8 +80,28 @@ class AdvancedDayTradingScreener:
         self.use_ml = use_ml
         self.ml_model = None
         self.scaler = StandardScaler()
+        self.pending_ml = {}  # ticker -> queued features for apply_ml_batch()
+        self.feature_names = None  # Feature columns the model was trained on
+        self.ml_metadata = None  # Training window / metrics / registry version
+        self.bar_cache = bar_cache
+        self.feature_store = feature_store
+        self.sentiment = sentiment
+        self.online_updater = None  # Created on first update_ml_model_online()
         self.sp500_tickers = None  # Cache S&P 500 list
-        
+        self.snapshot = None  # Last prefilter snapshot (daily price/volume)
+        self.daily_metrics = None  # Last coarse screen metrics (gap, ATR%, etc.)
+        self.reference_bars = None  # Benchmark/sector ETF bars for this scan
+        self.sectors = {}  # ticker -> sector, from fetch_extended_data()
+        self.scan_closes = {}  # ticker -> 5m closes, for apply_cross_section()
+        self.telemetry = ScanTelemetry()  # Stage timers and counters, reset per scan
+        
+    @property
+    def ml_feature_columns(self) -> List[str]:
+        """Model feature schema (relative strength is added with USE_CROSS_SECTION)"""
+        if config.USE_CROSS_SECTION:
+            return ML_FEATURE_COLUMNS + relative_strength_columns()
+        return ML_FEATURE_COLUMNS
+    
     def fetch_sp500_tickers(self) -> List[str]:
         """
         Fetch current S&P 500 stock tickers from Wikipedia
@@ -122,12 +182,45 @@ class AdvancedDayTradingScreener:
         
         return sorted(universe)
     
-    def fetch_extended_data(self, ticker: str) -> Dict:
+    def prefilter_universe(self, tickers: List[str]) -> List[str]:
+        """
+        Drop tickers that fail price/volume criteria using a batched
+        daily snapshot, before any per-ticker fetch
+        
+        Args:
+            tickers: List of stock tickers
+            
+        Returns:
+            List of tickers that survive the prefilter
+        """
+        survivors, self.snapshot = prefilter_universe(
+            tickers, self.min_price, self.max_price, self.min_volume
+        )
+        return survivors
+    
+    def coarse_screen(self, tickers: List[str], top_k: int = 100) -> List[str]:
+        """
+        Rank tickers on daily bars (gap %, ATR %, relative volume, trend)
+        and keep only the top-K for the intraday pipeline
+        
+        Args:
+            tickers: List of stock tickers
+            top_k: Number of tickers to keep
+            
+        Returns:
+            List of the top-K tickers, best first
+        """
+        survivors, self.daily_metrics = coarse_screen(tickers, top_k)
+        return survivors
+    
+    def fetch_extended_data(self, ticker: str, 
+                            df_5m: pd.DataFrame = None) -> Dict:
         """
         Fetch comprehensive stock data including fundamentals
         
         Args:
             ticker: Stock ticker
+            df_5m: Optional already-fetched 5m bars (skips that request)
             
         Returns:
             Dictionary with extended data
@@ -136,7 +229,8 @@ class AdvancedDayTradingScreener:
             stock = yf.Ticker(ticker)
             
             # Intraday data
-            df_5m = stock.history(period="5d", interval="5m")
+            if df_5m is None:
+                df_5m = stock.history(period="5d", interval="5m")
             df_1h = stock.history(period="1mo", interval="1h")
             df_daily = stock.history(period="3mo", interval="1d")
             
@@ -333,12 +427,17 @@ class AdvancedDayTradingScreener:
         df['SAR'] = df['Close'].shift(1)
         return df
     
-    def create_ml_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def create_ml_features(self, df: pd.DataFrame, ticker: str = None,
+                           reference: Dict[str, pd.DataFrame] = None) -> pd.DataFrame:
         """
         Create features for machine learning model
         
         Args:
             df: DataFrame with technical indicators
+            ticker: Stock ticker; with USE_CROSS_SECTION, adds its relative
+                strength against the reference bars
+            reference: Benchmark/sector ETF bars (defaults to
+                self.reference_bars)
             
         Returns:
             DataFrame with ML features
@@ -389,21 +488,44 @@ class AdvancedDayTradingScreener:
         if 'EMA_9' in df.columns and 'EMA_20' in df.columns:
             features['ema_cross'] = (df['EMA_9'] - df['EMA_20']) / df['EMA_20']
         
+        # Relative strength vs. benchmarks and the sector ETF
+        reference = reference if reference is not None else self.reference_bars
+        if config.USE_CROSS_SECTION and ticker is not None and reference is not None:
+            relative = relative_strength_series(df['Close'], reference,
+                                                self.sectors.get(ticker))
+            for column in relative.columns:
+                features[column] = relative[column]
+        
         # Target: next period return (for training)
         features['target'] = df['Close'].shift(-1) / df['Close'] - 1
         
         return features
     
-    def train_ml_model(self, historical_data: pd.DataFrame):
+    def train_ml_model(self, historical_data: pd.DataFrame = None, 
+                       features_df: pd.DataFrame = None, ticker: str = None,
+                       reference: Dict[str, pd.DataFrame] = None):
         """
         Train ML model for price movement prediction
         
         Args:
             historical_data: Historical market data with features
+            features_df: Precomputed feature rows (e.g. from the feature
+                store), used instead of recomputing from historical_data
+            ticker: Ticker of historical_data (required with
+                USE_CROSS_SECTION for the relative strength features)
+            reference: Benchmark/sector ETF bars covering historical_data
+                (defaults to self.reference_bars)
         """
         # Create features
-        features_df = self.create_ml_features(historical_data)
-        features_df = features_df.dropna()
+        if features_df is None:
+            features_df = self.create_ml_features(historical_data, ticker, reference)
+        
+        missing = [c for c in self.ml_feature_columns if c not in features_df.columns]
+        if missing:
+            print(f"⚠️  Cannot train ML model: features {missing} are missing "
+                  f"(with USE_CROSS_SECTION, pass the ticker and reference bars)")
+            return
+        features_df = features_df[self.ml_feature_columns + ['target']].dropna()
         
         if len(features_df) < 100:
             print("Not enough data to train ML model")
@@ -413,9 +535,9 @@ class AdvancedDayTradingScreener:
         X = features_df.drop('target', axis=1)
         y = (features_df['target'] > 0).astype(int)  # Binary classification
         
-        # Split data
+        # Split data in time order (shuffling would leak future bars into training)
         X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
+            X, y, test_size=0.2, shuffle=False
         )
         
         # Scale features
@@ -434,14 +556,287 @@ class AdvancedDayTradingScreener:
         train_score = self.ml_model.score(X_train_scaled, y_train)
         test_score = self.ml_model.score(X_test_scaled, y_test)
         
+        self.feature_names = list(X.columns)
+        self.ml_metadata = {
+            'training_window': {
+                'start': str(features_df.index[0]),
+                'end': str(features_df.index[-1]),
+                'n_samples': len(features_df),
+            },
+            'metrics': {
+                'train_accuracy': round(train_score, 4),
+                'test_accuracy': round(test_score, 4),
+            },
+        }
+        
         print(f"ML Model trained - Train accuracy: {train_score:.3f}, Test accuracy: {test_score:.3f}")
     
-    def predict_with_ml(self, df: pd.DataFrame) -> Dict:
+    def backfill_feature_store(self, archive, tickers: List[str] = None,
+                               interval: str = "5m") -> int:
+        """
+        Compute stored ML features from archived bar history
+        
+        Only bars newer than each ticker's stored features are featurized,
+        so the training dataset builder sees the archive's full history.
+        
+        Args:
+            archive: BarArchive to read
+            tickers: Tickers to backfill (all archived tickers by default)
+            interval: Bar interval
+            
+        Returns:
+            Number of tickers updated
+        """
+        if self.feature_store is None:
+            self.feature_store = FeatureStore()
+        tickers = tickers if tickers is not None else archive.tickers(interval)
+        
+        # Archived benchmark/sector ETF history, if any, for the relative
+        # strength features
+        reference = None
+        if config.USE_CROSS_SECTION:
+            reference = {t: archive.load(t, interval) for t in reference_tickers()}
+            reference = {t: df for t, df in reference.items() if df is not None}
+        
+        updated = 0
+        for ticker in tickers:
+            latest = self.feature_store.latest(ticker, interval)
+            # Enough history before the last stored row to refill the warmup
+            start = latest.name - pd.Timedelta(days=7) if latest is not None else None
+            df = archive.load(ticker, interval, start=start)
+            if df is None or len(df) < ML_FEATURE_WARMUP:
+                continue
+            
+            df = self.calculate_advanced_indicators(df)
+            self.feature_store.update(
+                ticker, df, lambda d: self.create_ml_features(d, ticker, reference),
+                ML_FEATURE_WARMUP, interval
+            )
+            updated += 1
+        
+        print(f"✅ Backfilled ML features for {updated} tickers from the bar archive")
+        return updated
+    
+    def train_ml_model_universe(self, tickers: List[str] = None, 
+                                n_jobs: int = None) -> Dict:
+        """
+        Train on every ticker in the feature store with all CPU cores
+        
+        Args:
+            tickers: Tickers to train on (all stored tickers by default)
+            n_jobs: Parallel jobs (defaults to config.ML_N_JOBS)
+            
+        Returns:
+            Training metrics
+        """
+        dataset = build_training_dataset(
+            self.feature_store, tickers, feature_names=self.ml_feature_columns
+        )
+        result = train_universe_model(dataset, n_jobs=n_jobs)
+        
+        self.ml_model = result['model']
+        self.scaler = result['scaler']
+        self.online_updater = None
+        self.feature_names = result['feature_names']
+        self.ml_metadata = {
+            'training_window': result['training_window'],
+            'metrics': result['metrics'],
+        }
+        
+        return result['metrics']
+    
+    def update_ml_model_online(self, tickers: List[str] = None) -> Dict:
+        """
+        Update the model with bars labeled since it was last trained/updated
+        
+        Adds a few trees fitted on the new rows from the feature store
+        instead of refitting on all history. The returned stats include the
+        drift monitor's 'needs_full_refit' recommendation.
+        
+        Args:
+            tickers: Tickers to read new rows for (all stored tickers by default)
+            
+        Returns:
+            Update stats
+        """
+        if self.ml_model is None:
+            raise ValueError("No ML model to update - train or load one first")
+        
+        metadata = self.ml_metadata or {}
+        window = metadata.setdefault('training_window', {})
+        
+        if self.online_updater is None:
+            baseline = metadata.get('metrics', {}).get('test_accuracy', 0.5)
+            # The drift window of earlier runs comes from the registry metadata
+            self.online_updater = OnlineModelUpdater(
+                self.ml_model, self.scaler, baseline_accuracy=baseline,
+                drift_state=metadata.get('drift')
+            )
+        
+        dataset = build_training_dataset(
+            self.feature_store, tickers, feature_names=self.ml_feature_columns,
+            since=window.get('end')
+        )
+        updates_before = self.online_updater.updates
+        stats = self.online_updater.update(dataset['X'], dataset['y'])
+        
+        if stats['rows']:
+            window['end'] = str(dataset['index'].get_level_values('time').max())
+            window['n_samples'] = window.get('n_samples', 0) + stats['rows']
+        # Counted across runs, like n_samples (the updater starts at 0 each process)
+        metrics = metadata.setdefault('metrics', {})
+        metrics['online_updates'] = metrics.get('online_updates', 0) + \
+            self.online_updater.updates - updates_before
+        metadata['drift'] = self.online_updater.drift_monitor.state()
+        self.ml_metadata = metadata
+        
+        print(f"ML Model updated online with {stats['rows']:,} rows - "
+              f"{stats['n_trees']} trees, full refit needed: {stats['needs_full_refit']}")
+        
+        return stats
+    
+    def save_ml_model(self, registry: ModelRegistry = None) -> str:
+        """
+        Save the trained model and scaler to the model registry
+        
+        Args:
+            registry: Model registry (defaults to config.MODEL_REGISTRY_DIR)
+            
+        Returns:
+            Registered version identifier
+        """
+        if self.ml_model is None:
+            raise ValueError("No trained ML model to save")
+        
+        registry = registry or ModelRegistry()
+        metadata = self.ml_metadata or {}
+        version = registry.save(
+            self.ml_model, self.scaler, self.feature_names,
+            training_window=metadata.get('training_window'),
+            metrics=metadata.get('metrics'),
+            drift=metadata.get('drift')
+        )
+        
+        print(f"💾 ML model saved as version {version}")
+        return version
+    
+    def load_ml_model(self, version: str = None, 
+                      registry: ModelRegistry = None) -> Optional[Dict]:
+        """
+        Load a registered model instead of training one
+        
+        Args:
+            version: Registry version (defaults to the latest)
+            registry: Model registry (defaults to config.MODEL_REGISTRY_DIR)
+            
+        Returns:
+            Model metadata, or None if no version was requested and no
+            model is registered, or if the model's feature schema does not
+            match USE_CROSS_SECTION (a requested version that does not
+            exist raises FileNotFoundError)
+        """
+        registry = registry or ModelRegistry()
+        
+        if version is None and registry.latest_version() is None:
+            return None
+        
+        try:
+            bundle = registry.load(version, feature_names=self.ml_feature_columns)
+        except SchemaMismatchError as e:
+            schema = "extended (relative strength)" if config.USE_CROSS_SECTION else "base"
+            print(f"⚠️  {e}. USE_CROSS_SECTION is {config.USE_CROSS_SECTION}: retrain with "
+                  f"the {schema} schema (python ml_training.py) to use ML predictions")
+            return None
+        
+        self.ml_model = bundle['model']
+        self.scaler = bundle['scaler']
+        self.online_updater = None
+        self.feature_names = bundle['metadata']['feature_names']
+        self.ml_metadata = bundle['metadata']
+        
+        return bundle['metadata']
+    
+    def latest_ml_features(self, df: pd.DataFrame, ticker: str = None,
+                           reference: Dict[str, pd.DataFrame] = None) -> Optional[np.ndarray]:
+        """
+        Build the feature vector for the most recent bar only
+        
+        Indicator columns are already computed on `df`, so only the last
+        ML_FEATURE_WARMUP bars are needed for the rolling features. With a
+        feature store, the new bars are appended to the ticker's stored
+        features and the latest stored row is used.
+        
+        Args:
+            df: Current stock data with indicators
+            ticker: Stock ticker (required to use the feature store, and
+                with USE_CROSS_SECTION for the relative strength features)
+            reference: Benchmark/sector ETF bars (defaults to
+                self.reference_bars)
+            
+        Returns:
+            1-D feature vector, or None if any feature is missing
+        """
+        make_features = lambda d: self.create_ml_features(d, ticker, reference)
+        if self.feature_store is not None and ticker is not None:
+            features_df = self.feature_store.update(
+                ticker, df, make_features, ML_FEATURE_WARMUP
+            )
+        else:
+            features_df = make_features(df.iloc[-ML_FEATURE_WARMUP:])
+        
+        # Missing schema columns become NaN, so the row is rejected below
+        latest_features = features_df.iloc[-1].reindex(
+            self.ml_feature_columns).values.astype(np.float64)
+        
+        if np.isnan(latest_features).any():
+            return None
+        
+        return latest_features
+    
+    def predict_with_ml_batch(self, feature_rows: Dict[str, np.ndarray]) -> Dict[str, Dict]:
+        """
+        Make ML predictions for many tickers with a single model call
+        
+        Args:
+            feature_rows: Dictionary of ticker -> latest feature vector
+            
+        Returns:
+            Dictionary of ticker -> ML predictions
+        """
+        predictions = {ticker: {'ml_probability': None, 'ml_confidence': None}
+                       for ticker in feature_rows}
+        
+        if self.ml_model is None:
+            return predictions
+        
+        tickers = [t for t, row in feature_rows.items() if row is not None]
+        if not tickers:
+            return predictions
+        
+        # One contiguous matrix -> one transform and one predict_proba
+        with self.telemetry.stage('ml_inference'):
+            X = np.ascontiguousarray(np.vstack([feature_rows[t] for t in tickers]))
+            X_scaled = self.scaler.transform(X)
+            probs = self.ml_model.predict_proba(X_scaled)
+        
+        for ticker, prob in zip(tickers, probs):
+            predictions[ticker] = {
+                'ml_probability': round(prob[1] * 100, 2),  # Probability of upward move
+                'ml_confidence': round(max(prob) * 100, 2)  # Confidence in prediction
+            }
+        
+        return predictions
+    
+    def predict_with_ml(self, df: pd.DataFrame, ticker: str = None,
+                        reference: Dict[str, pd.DataFrame] = None) -> Dict:
         """
         Make predictions using ML model
         
         Args:
             df: Current stock data
+            ticker: Stock ticker (required with USE_CROSS_SECTION)
+            reference: Benchmark/sector ETF bars (defaults to
+                self.reference_bars)
             
         Returns:
             Dictionary with ML predictions
@@ -449,64 +844,135 @@ class AdvancedDayTradingScreener:
         if self.ml_model is None:
             return {'ml_probability': None, 'ml_confidence': None}
         
-        # Create features
-        features_df = self.create_ml_features(df)
-        features_df = features_df.drop('target', axis=1, errors='ignore')
+        features = self.latest_ml_features(df, ticker, reference)
+        return self.predict_with_ml_batch({'_': features})['_']
+    
+    def apply_ml_batch(self, analyses: List[Dict]) -> List[Dict]:
+        """
+        Score all deferred ML predictions at once and update the analyses
         
-        # Get latest features
-        latest_features = features_df.iloc[-1:].values
+        Consumes the feature vectors queued by analyze_with_sentiment(...,
+        defer_ml=True), runs one batched inference, then recomputes the
+        ML-dependent fields of each analysis in place.
         
-        if np.isnan(latest_features).any():
-            return {'ml_probability': None, 'ml_confidence': None}
+        Args:
+            analyses: Analysis dictionaries from analyze_with_sentiment()
+            
+        Returns:
+            The same analyses, updated with ML predictions
+        """
+        pending = self.pending_ml
+        self.pending_ml = {}
+        
+        if not pending or self.ml_model is None:
+            return analyses
         
-        # Scale and predict
-        latest_features_scaled = self.scaler.transform(latest_features)
+        predictions = self.predict_with_ml_batch(
+            {ticker: entry['features'] for ticker, entry in pending.items()}
+        )
         
-        # Predict probability
-        prob = self.ml_model.predict_proba(latest_features_scaled)[0]
+        for analysis in analyses:
+            entry = pending.get(analysis['ticker'])
+            if entry is None:
+                continue
+            
+            ml_pred = predictions[analysis['ticker']]
+            analysis.update(ml_pred)
+            self._score_analysis(analysis, entry['df'], entry['signals'],
+                                 ml_pred, entry['sentiment'])
         
-        return {
-            'ml_probability': round(prob[1] * 100, 2),  # Probability of upward move
-            'ml_confidence': round(max(prob) * 100, 2)  # Confidence in prediction
-        }
+        return analyses
     
-    def analyze_with_sentiment(self, ticker: str, sentiment_score: float = None) -> Dict:
+    def analyze_with_sentiment(self, ticker: str, sentiment_score: float = None,
+                               defer_ml: bool = False) -> Dict:
         """
         Analyze stock with optional sentiment integration
         
         Args:
             ticker: Stock ticker
-            sentiment_score: Optional sentiment score (-1 to 1)
+            sentiment_score: Optional sentiment score (-1 to 1); looked up
+                in self.sentiment when omitted
+            defer_ml: Queue the ML features for apply_ml_batch() instead
+                of running a per-ticker prediction
             
         Returns:
             Complete analysis dictionary
         """
-        # Fetch extended data
-        extended_data = self.fetch_extended_data(ticker)
-        
-        if not extended_data or extended_data['df_5m'].empty:
+        # Stage 1: cheap snapshot filter, before any request for this ticker
+        if self.snapshot is not None and ticker in self.snapshot.index:
+            quote = self.snapshot.loc[ticker]
+            if (quote['last_close'] < self.min_price or 
+                quote['last_close'] > self.max_price or 
+                quote['avg_volume'] < self.min_volume):
+                return None
+        
+        # Stage 2: 5m bars only, filter on the last bar before the heavy fetch
+        try:
+            with self.telemetry.stage('fetch'):
+                df_5m = yf.Ticker(ticker).history(period="5d", interval="5m")
+        except Exception as e:
+            self.telemetry.count('fetch_errors', type=type(e).__name__)
+            if "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
+                self.telemetry.count('rate_limit_events')
+            print(f"Error fetching data for {ticker}: {e}")
             return None
         
-        df_5m = extended_data['df_5m']
+        if df_5m is None or df_5m.empty:
+            self.telemetry.count('fetch_errors', type='empty')
+            return None
         
-        # Filter by criteria
         current_price = df_5m['Close'].iloc[-1]
+        if current_price < self.min_price or current_price > self.max_price:
+            return None
+        
+        if self.bar_cache is not None:
+            self.bar_cache.update(ticker, df_5m, interval="5m")
+        
+        # Stage 3: remaining timeframes and fundamentals for survivors only
+        with self.telemetry.stage('fetch_extended'):
+            extended_data = self.fetch_extended_data(ticker, df_5m=df_5m)
+        
+        if not extended_data:
+            return None
+        
         avg_volume = extended_data['avg_volume']
         
-        if (current_price < self.min_price or current_price > self.max_price or 
-            avg_volume < self.min_volume):
+        if avg_volume < self.min_volume:
             return None
         
+        self.sectors[ticker] = extended_data['sector']
+        if config.USE_CROSS_SECTION:
+            self.scan_closes[ticker] = df_5m['Close']
+        
         # Calculate indicators
-        df_5m = self.calculate_advanced_indicators(df_5m)
+        with self.telemetry.stage('indicators'):
+            df_5m = self.calculate_advanced_indicators(df_5m)
         
         # Generate technical signals
-        signals = self._generate_advanced_signals(df_5m)
+        with self.telemetry.stage('signals'):
+            signals = self._generate_advanced_signals(df_5m)
+        
+        # Usually already prefetched, so this is a cache hit
+        if sentiment_score is None and self.sentiment is not None:
+            with self.telemetry.stage('sentiment'):
+                sentiment_score = self.sentiment.get(ticker)
         
-        # ML prediction
+        # ML prediction (deferred predictions are scored by apply_ml_batch)
         ml_pred = {}
-        if self.use_ml:
-            ml_pred = self.predict_with_ml(df_5m)
+        if self.use_ml and defer_ml:
+            ml_pred = {'ml_probability': None, 'ml_confidence': None}
+            with self.telemetry.stage('ml_features'):
+                features = self.latest_ml_features(df_5m, ticker)
+            self.pending_ml[ticker] = {
+                'features': features,
+                'signals': signals,
+                'sentiment': sentiment_score,
+                'df': df_5m,
+            }
+        elif self.use_ml:
+            ml_pred = self.predict_with_ml_batch(
+                {ticker: self.latest_ml_features(df_5m, ticker)}
+            )[ticker]
         
         # Compile analysis
         analysis = {
@@ -525,6 +991,21 @@ class AdvancedDayTradingScreener:
             analysis['sentiment_score'] = round(sentiment_score, 2)
             analysis['sentiment_impact'] = self._calculate_sentiment_impact(sentiment_score)
         
+        self._score_analysis(analysis, df_5m, signals, ml_pred, sentiment_score)
+        
+        analysis['risk_level'] = self._calculate_risk_advanced(
+            df_5m, extended_data
+        )
+        atr = df_5m['ATR'].iloc[-1]
+        analysis['atr'] = round(atr, 4) if pd.notna(atr) else None
+        
+        return analysis
+    
+    def _score_analysis(self, analysis: Dict, df: pd.DataFrame, signals: Dict, 
+                        ml_pred: Dict, sentiment_score: float = None) -> Dict:
+        """Fill in the ML/sentiment-dependent score fields of an analysis"""
+        analysis.pop('rs_adjustment', None)
+        
         # Calculate enhanced confidence score
         analysis['confidence_score'] = self._calculate_enhanced_confidence(
             signals, ml_pred, sentiment_score
@@ -532,16 +1013,87 @@ class AdvancedDayTradingScreener:
         
         # Enhanced prediction
         analysis['predicted_move_pct'] = self._enhanced_prediction(
-            df_5m, signals, ml_pred, sentiment_score
+            df, signals, ml_pred, sentiment_score
         )
         
         analysis['trade_direction'] = self._determine_direction_advanced(
             signals, ml_pred, sentiment_score
         )
         
-        analysis['risk_level'] = self._calculate_risk_advanced(
-            df_5m, extended_data
-        )
+        if 'rs_percentile' in analysis:
+            self._apply_relative_strength(analysis)
+        
+        return analysis
+    
+    def load_reference_bars(self, period: str = "5d") -> Dict[str, pd.DataFrame]:
+        """
+        Fetch benchmark and sector ETF bars once for the scan
+        
+        Args:
+            period: History period
+            
+        Returns:
+            Dictionary of reference ticker -> 5m bars
+        """
+        self.reference_bars = fetch_reference_bars(period=period)
+        return self.reference_bars
+    
+    def apply_cross_section(self, analyses: List[Dict]) -> List[Dict]:
+        """
+        Add universe-relative features to the analyses and rescore them
+        
+        Uses the 5m closes kept by analyze_with_sentiment() (with
+        USE_CROSS_SECTION) and the reference bars, so ranking the whole
+        universe needs no further requests. Call after apply_ml_batch().
+        
+        Args:
+            analyses: Analysis dictionaries from analyze_with_sentiment()
+            
+        Returns:
+            The same analyses, with relative strength, percentile ranks and
+            the market regime added
+        """
+        closes = self.scan_closes
+        self.scan_closes = {}
+        if not closes:
+            return analyses
+        
+        if self.reference_bars is None:
+            self.load_reference_bars()
+        
+        table = compute_cross_section(closes, self.sectors, self.reference_bars)
+        for analysis in analyses:
+            if analysis['ticker'] not in table.index:
+                continue
+            analysis.update(table.loc[analysis['ticker']].to_dict())
+            self._apply_relative_strength(analysis)
+        
+        return analyses
+    
+    def _apply_relative_strength(self, analysis: Dict) -> Dict:
+        """
+        Adjust the confidence score for relative strength and regime
+        
+        Longs gain (and shorts lose) up to RS_CONFIDENCE_WEIGHT points as
+        the ticker's RS percentile moves above 50, and trades against the
+        market regime lose REGIME_COUNTER_TREND_PENALTY points.
+        """
+        direction = analysis.get('trade_direction', '')
+        side = 1 if 'LONG' in direction else -1 if 'SHORT' in direction else 0
+        
+        adjustment = 0.0
+        percentile = analysis.get('rs_percentile')
+        if side and pd.notna(percentile):
+            adjustment += side * (percentile - 50) / 50 * config.RS_CONFIDENCE_WEIGHT
+        
+        regime = analysis.get('market_regime')
+        if (side > 0 and regime == BEAR) or (side < 0 and regime == BULL):
+            adjustment -= config.REGIME_COUNTER_TREND_PENALTY
+        
+        # Adjust the score from _score_analysis(), not an already adjusted one
+        base = analysis['confidence_score'] - analysis.get('rs_adjustment', 0)
+        analysis['rs_adjustment'] = round(adjustment, 2)
+        analysis['confidence_score'] = round(min(100, max(0, base + adjustment)), 2)
         
         return analysis
     
@@ -683,8 +1235,16 @@ def main_advanced():
         use_ml=True
     )
     
-    # Note: ML training would require historical data
-    # screener.train_ml_model(historical_data)
+    # Load the latest registered model (training happens offline:
+    # screener.train_ml_model(historical_data); screener.save_ml_model())
+    metadata = screener.load_ml_model(config.ML_MODEL_VERSION)
+    if metadata:
+        print(f"✅ Loaded ML model {metadata['version']} "
+              f"(test accuracy: {metadata['metrics'].get('test_accuracy', 'N/A')})")
+    else:
+        print(f"⚠️  No ML model registered in {config.MODEL_REGISTRY_DIR}/ - "
+              f"ML predictions disabled")
+        screener.use_ml = False
     
     print("\nThis advanced version supports:")
     print("- Extended technical indicators (Stochastic, ADX, MFI, Ichimoku)")
@@ -0,0 +1,263 @@
+"""
+Alert Engine
+Edge-triggered alert rules evaluated on each incremental score update,
+with per-rule cooldowns and pluggable delivery sinks
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import requests
+
+import config
+
+RULE_TYPES = ['cross_above', 'cross_below', 'transition']
+
+
+class ConsoleAlertSink:
+    """Prints alerts"""
+
+    def send(self, alert: Dict):
+        print(f"🔔 [{alert['time'][11:19]}] {alert['message']}")
+
+    def close(self):
+        pass
+
+
+class FileAlertSink:
+    """Appends alerts to a JSON lines file"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(config.OUTPUT_DIRECTORY, config.ALERT_FILENAME)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+    def send(self, alert: Dict):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(alert, default=str) + '\n')
+
+    def close(self):
+        pass
+
+
+class WebhookAlertSink:
+    """
+    Posts alerts to a webhook
+
+    `style` picks the payload: 'slack' ({"text": ...}), 'discord'
+    ({"content": ...}) or 'json' (the alert itself). Delivery failures are
+    reported and dropped so a slow endpoint never stalls the scan.
+    """
+
+    def __init__(self, url: str = None, style: str = 'json', timeout: float = 5.0):
+        self.url = url or config.ALERT_WEBHOOK_URL
+        if not self.url:
+            raise ValueError("Webhook alerts need a URL (set config.ALERT_WEBHOOK_URL)")
+        self.style = style
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, alert: Dict):
+        if self.style == 'slack':
+            payload = {'text': alert['message']}
+        elif self.style == 'discord':
+            payload = {'content': alert['message']}
+        else:
+            payload = alert
+
+        try:
+            self.session.post(self.url, data=json.dumps(payload, default=str),
+                              headers={'Content-Type': 'application/json'},
+                              timeout=self.timeout).raise_for_status()
+        except requests.RequestException as e:
+            print(f"⚠️  Alert webhook failed: {str(e)[:100]}")
+
+    def close(self):
+        self.session.close()
+
+
+class MemoryAlertSink:
+    """Keeps alerts in a list (for tests and notebooks)"""
+
+    def __init__(self):
+        self.alerts = []
+
+    def send(self, alert: Dict):
+        self.alerts.append(alert)
+
+    def close(self):
+        pass
+
+
+def make_alert_sinks(method: str = None) -> List:
+    """
+    Build the sinks named by config.ALERT_METHOD
+
+    Args:
+        method: Comma-separated sink names (defaults to config.ALERT_METHOD)
+
+    Returns:
+        List of alert sinks
+    """
+    sinks = []
+    for name in (method or config.ALERT_METHOD).split(','):
+        name = name.strip().lower()
+        if name == 'console':
+            sinks.append(ConsoleAlertSink())
+        elif name == 'file':
+            sinks.append(FileAlertSink())
+        elif name in ('webhook', 'slack', 'discord'):
+            sinks.append(WebhookAlertSink(style='json' if name == 'webhook' else name))
+        elif name == 'memory':
+            sinks.append(MemoryAlertSink())
+        else:
+            raise ValueError(f"Unknown alert method '{name}' "
+                             f"(use console, file, webhook, slack or discord)")
+    return sinks
+
+
+class AlertEngine:
+    """
+    Evaluates alert rules against each ticker's score updates
+
+    Only the values of the fields the rules reference are remembered per
+    ticker, so each update costs O(rules) and a bar close costs
+    O(changed tickers), independent of the universe size. Rules fire on
+    edges (a threshold crossing or a state transition), never on levels,
+    so an unchanged ticker never re-alerts. A rule that fires for a
+    ticker is then muted for that ticker for the cooldown, which absorbs
+    a value flapping around a threshold.
+
+    A ticker's first update has no previous value: crossing rules treat
+    that as coming from the other side of the threshold (so a new scan
+    reports what is already above it), transition rules wait for a
+    second update.
+
+    The engine has write()/close() and can be passed anywhere a scan sink
+    is accepted (ScanPipeline, BarWatcher).
+    """
+
+    def __init__(self, rules: List[Dict] = None, sinks: List = None,
+                 cooldown_seconds: float = None):
+        """
+        Initialize the engine
+
+        Args:
+            rules: Rule dictionaries (defaults to config.ALERT_RULES)
+            sinks: Objects with send(alert) and close()
+                (defaults to make_alert_sinks())
+            cooldown_seconds: Mute time after a rule fires for a ticker
+        """
+        self.rules = list(config.ALERT_RULES if rules is None else rules)
+        for rule in self.rules:
+            self._check_rule(rule)
+        self.sinks = make_alert_sinks() if sinks is None else sinks
+        self.cooldown_seconds = config.ALERT_COOLDOWN_MINUTES * 60 \
+            if cooldown_seconds is None else cooldown_seconds
+
+        self.fields = sorted({rule['field'] for rule in self.rules})
+        self.state = {}  # ticker -> {field: last value}
+        self.last_fired = {}  # (ticker, rule name) -> time
+        self.fired = 0
+        self.suppressed = 0
+
+    @staticmethod
+    def _check_rule(rule: Dict):
+        missing = {'name', 'type', 'field'} - set(rule)
+        if missing:
+            raise ValueError(f"Alert rule {rule} is missing {sorted(missing)}")
+        if rule['type'] not in RULE_TYPES:
+            raise ValueError(f"Unknown alert rule type '{rule['type']}' (use {RULE_TYPES})")
+        if rule['type'] == 'transition':
+            if 'from' not in rule or 'to' not in rule:
+                raise ValueError(f"Transition rule '{rule['name']}' needs 'from' and 'to'")
+        elif 'threshold' not in rule:
+            raise ValueError(f"Crossing rule '{rule['name']}' needs a 'threshold'")
+
+    @staticmethod
+    def _edge(rule: Dict, before, value) -> bool:
+        """Whether moving from `before` to `value` triggers the rule"""
+        if value is None:
+            return False
+        if rule['type'] == 'cross_above':
+            return value >= rule['threshold'] and (before is None or before < rule['threshold'])
+        if rule['type'] == 'cross_below':
+            return value <= rule['threshold'] and (before is None or before > rule['threshold'])
+        return (before is not None and before != value and
+                before in rule['from'] and value in rule['to'])
+
+    @staticmethod
+    def _message(rule: Dict, analysis: Dict, before, value) -> str:
+        ticker = analysis['ticker']
+        if rule['type'] == 'transition':
+            change = f"{rule['field']} {before} → {value}"
+        else:
+            side = 'above' if rule['type'] == 'cross_above' else 'below'
+            change = f"{rule['field']} crossed {side} {rule['threshold']} ({value})"
+        return (f"{ticker} {rule['name']}: {change} | {analysis.get('trade_direction')} "
+                f"confidence {analysis.get('confidence_score')} "
+                f"@ ${analysis.get('current_price')}")
+
+    def update(self, analysis: Dict, now: float = None) -> List[Dict]:
+        """
+        Evaluate the rules for one ticker's new analysis
+
+        Args:
+            analysis: Latest analysis for a ticker
+            now: Update time in epoch seconds (defaults to now; pass bar
+                times when replaying history)
+
+        Returns:
+            Alerts fired (already delivered to the sinks)
+        """
+        now = time.time() if now is None else now
+        ticker = analysis['ticker']
+        previous = self.state.get(ticker, {})
+        current = {field: analysis.get(field) for field in self.fields}
+        self.state[ticker] = current
+        if current == previous:
+            return []
+
+        alerts = []
+        for rule in self.rules:
+            before, value = previous.get(rule['field']), current[rule['field']]
+            if not self._edge(rule, before, value):
+                continue
+
+            key = (ticker, rule['name'])
+            if now - self.last_fired.get(key, -float('inf')) < self.cooldown_seconds:
+                self.suppressed += 1
+                continue
+            self.last_fired[key] = now
+
+            alerts.append({
+                'time': datetime.fromtimestamp(now).isoformat(timespec='seconds'),
+                'ticker': ticker,
+                'rule': rule['name'],
+                'field': rule['field'],
+                'previous': before,
+                'value': value,
+                'confidence_score': analysis.get('confidence_score'),
+                'trade_direction': analysis.get('trade_direction'),
+                'current_price': analysis.get('current_price'),
+                'message': self._message(rule, analysis, before, value),
+            })
+
+        for alert in alerts:
+            for sink in self.sinks:
+                sink.send(alert)
+        self.fired += len(alerts)
+        return alerts
+
+    def remove(self, ticker: str):
+        """Forget a ticker that no longer qualifies"""
+        self.state.pop(ticker, None)
+
+    def write(self, analysis: Dict):
+        self.update(analysis)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,237 @@
+"""
+Backtest Engine
+Replays cached bars through the vectorized scoring path and simulates trades
+"""
+
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import config
+from bar_archive import BarArchive
+from bar_cache import BarCache
+from bar_panel import SharedBarPanel
+from day_trading_screener import DayTradingScreener
+from vectorized_scoring import score_bars
+
+SCORE_BUCKETS = [0, 50, 60, 70, 80, 90, 100.01]
+
+
+def simulate_trades(df: pd.DataFrame, scores: pd.DataFrame,
+                    min_confidence: float = None, stop_loss: float = None,
+                    max_daily_trades: int = None, hold_bars: int = None) -> pd.DataFrame:
+    """
+    Simulate trades for one ticker with array operations
+
+    An entry is taken at the close of a bar where a LONG/SHORT signal with
+    enough confidence first appears (not on every bar it persists). Each
+    trade exits at the first of: the STOP_LOSS_PERCENTAGE stop, the
+    predicted-move target, `hold_bars` bars later, or the session's last
+    bar. A bar that touches both stop and target counts as a stop. Only the
+    first `max_daily_trades` entries per day are taken.
+
+    Args:
+        df: OHLCV bars
+        scores: Output of score_bars() for the same bars
+        min_confidence: Minimum confidence score to enter
+        stop_loss: Stop distance as a fraction of entry price
+        max_daily_trades: Entries allowed per day
+        hold_bars: Maximum bars a trade is held
+
+    Returns:
+        DataFrame with one row per trade
+    """
+    min_confidence = config.MIN_CONFIDENCE_SCORE if min_confidence is None else min_confidence
+    stop_loss = config.STOP_LOSS_PERCENTAGE if stop_loss is None else stop_loss
+    max_daily_trades = config.MAX_DAILY_TRADES if max_daily_trades is None else max_daily_trades
+    hold_bars = config.BACKTEST_HOLD_BARS if hold_bars is None else hold_bars
+    if hold_bars < 1:
+        raise ValueError(f"hold_bars must be at least 1 (got {hold_bars})")
+
+    direction = np.select([scores['trade_direction'] == 'LONG',
+                           scores['trade_direction'] == 'SHORT'], [1, -1], 0)
+    active = np.where(scores['confidence_score'].to_numpy() >= min_confidence, direction, 0)
+    onset = (active != 0) & (active != np.r_[0, active[:-1]])
+
+    days = df.index.normalize()
+    day_codes = pd.factorize(days)[0]
+
+    entries = np.flatnonzero(onset)
+    if len(entries):
+        # Daily trade cap: rank entries within their day
+        rank = pd.Series(day_codes[entries]).groupby(day_codes[entries]).cumcount().to_numpy()
+        entries = entries[rank < max_daily_trades]
+    # The entry bar needs at least one later bar to exit on
+    entries = entries[entries < len(df) - 1]
+    if not len(entries):
+        return pd.DataFrame()
+
+    close = df['Close'].to_numpy(dtype=np.float64)
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+
+    # Forward windows of the next `hold_bars` bars for every entry
+    pad = np.full(hold_bars, np.nan)
+    high_win = sliding_window_view(np.r_[high, pad], hold_bars)[entries + 1]
+    low_win = sliding_window_view(np.r_[low, pad], hold_bars)[entries + 1]
+    close_win = sliding_window_view(np.r_[close, pad], hold_bars)[entries + 1]
+    day_win = sliding_window_view(np.r_[day_codes, np.full(hold_bars, -1)], hold_bars)[entries + 1]
+    valid = day_win == day_codes[entries][:, None]
+
+    side = active[entries]
+    entry_price = close[entries]
+    target_pct = np.abs(scores['predicted_move_pct'].to_numpy()[entries]) / 100
+    stop_price = entry_price * (1 - side * stop_loss)
+    target_price = entry_price * (1 + side * target_pct)
+
+    long_side = (side == 1)[:, None]
+    stop_hit = valid & np.where(long_side, low_win <= stop_price[:, None],
+                                high_win >= stop_price[:, None])
+    target_hit = valid & (target_pct[:, None] > 0) & np.where(
+        long_side, high_win >= target_price[:, None], low_win <= target_price[:, None])
+
+    no_hit = hold_bars
+    first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), no_hit)
+    first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), no_hit)
+    last_valid = valid.sum(axis=1) - 1
+
+    exit_offset = np.minimum(np.minimum(first_stop, first_target), last_valid)
+    rows = np.arange(len(entries))
+    exit_price = np.select(
+        [first_stop <= np.minimum(first_target, last_valid),
+         first_target <= last_valid],
+        [stop_price, target_price],
+        close_win[rows, np.maximum(last_valid, 0)])
+    exit_reason = np.select(
+        [first_stop <= np.minimum(first_target, last_valid),
+         first_target <= last_valid],
+        ['stop', 'target'], 'time')
+
+    # Entries on a session's last bar have no same-day exit bar
+    keep = last_valid >= 0
+    return_pct = side * (exit_price / entry_price - 1) * 100
+
+    trades = pd.DataFrame({
+        'entry_time': df.index[entries],
+        'exit_time': df.index[np.minimum(entries + 1 + exit_offset, len(df) - 1)],
+        'direction': np.where(side == 1, 'LONG', 'SHORT'),
+        'confidence_score': scores['confidence_score'].to_numpy()[entries],
+        'predicted_move_pct': scores['predicted_move_pct'].to_numpy()[entries],
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'exit_reason': exit_reason,
+        'return_pct': return_pct,
+    })
+
+    return trades[keep].reset_index(drop=True)
+
+
+def max_drawdown(returns_pct: pd.Series) -> float:
+    """Largest peak-to-trough drop of cumulative (summed) trade returns"""
+    equity = returns_pct.cumsum()
+    return float((equity.cummax().clip(lower=0) - equity).max())
+
+
+def summarize_trades(trades: pd.DataFrame, by: str) -> pd.DataFrame:
+    """
+    Hit rate, expectancy and drawdown grouped by a trades column
+
+    Args:
+        trades: Trades with a return_pct column
+        by: Column to group by
+
+    Returns:
+        DataFrame of metrics per group
+    """
+    if trades.empty:
+        return pd.DataFrame()
+
+    trades = trades.sort_values('entry_time')
+    grouped = trades.groupby(by, observed=True)['return_pct']
+    summary = pd.DataFrame({
+        'trades': grouped.size(),
+        'hit_rate': grouped.apply(lambda r: (r > 0).mean() * 100),
+        'expectancy_pct': grouped.mean(),
+        'total_return_pct': grouped.sum(),
+        'max_drawdown_pct': grouped.apply(max_drawdown),
+    })
+
+    return summary.round(3)
+
+
+def run_backtest(bars=None, tickers: List[str] = None,
+                 bar_cache: BarCache = None, params: Dict = None,
+                 interval: str = "5m", start=None, end=None,
+                 **trade_options) -> Dict:
+    """
+    Backtest the screener's confidence score over cached historical bars
+
+    Args:
+        bars: Dictionary of ticker -> OHLCV bars, a SharedBarPanel to read
+            without copying, or a BarArchive (read from the bar cache if omitted)
+        tickers: Tickers to load from the bar cache (all cached by default)
+        bar_cache: Bar cache to replay (defaults to config.CACHE_DIRECTORY)
+        params: Scoring parameter overrides (see vectorized_scoring.default_params)
+        interval: Bar interval to load from the cache or archive
+        start: First date to load from a BarArchive
+        end: Last date to load from a BarArchive (inclusive)
+        **trade_options: Passed to simulate_trades (min_confidence, stop_loss, ...)
+
+    Returns:
+        Dictionary with 'trades', 'by_ticker', 'by_bucket' DataFrames
+    """
+    if isinstance(bars, SharedBarPanel):
+        # Panel frames are fresh views; indicator columns never touch the panel
+        bars = bars.frames(tickers)
+    elif isinstance(bars, BarArchive):
+        archive = bars
+        tickers = tickers if tickers is not None else archive.tickers(interval)
+        bars = {t: archive.load(t, interval, start, end) for t in tickers}
+    elif bars is None:
+        bar_cache = bar_cache or BarCache()
+        tickers = tickers if tickers is not None else bar_cache.tickers(interval)
+        bars = {t: bar_cache.load(t, interval) for t in tickers}
+    else:
+        bars = {t: df.copy() for t, df in bars.items() if df is not None}
+
+    screener = DayTradingScreener()
+    start = time.time()
+
+    all_trades = []
+    for ticker, df in bars.items():
+        if df is None or len(df) < 50:
+            continue
+        indicators = screener.calculate_technical_indicators(df)
+        trades = simulate_trades(indicators, score_bars(indicators, params), **trade_options)
+        if not trades.empty:
+            trades.insert(0, 'ticker', ticker)
+            all_trades.append(trades)
+
+    trades = pd.concat(all_trades, ignore_index=True) if all_trades else pd.DataFrame()
+    if not trades.empty:
+        trades['score_bucket'] = pd.cut(trades['confidence_score'], SCORE_BUCKETS, right=False)
+
+    print(f"✅ Backtest: {len(trades):,} trades across {len(bars)} tickers "
+          f"in {time.time() - start:.1f}s")
+
+    return {
+        'trades': trades,
+        'by_ticker': summarize_trades(trades, 'ticker'),
+        'by_bucket': summarize_trades(trades, 'score_bucket'),
+    }
+
+
+if __name__ == "__main__":
+    results = run_backtest()
+
+    print("\nBY CONFIDENCE BUCKET")
+    print("-" * 80)
+    print(results['by_bucket'])
+
+    print("\nTOP TICKERS BY EXPECTANCY")
+    print("-" * 80)
+    if not results['by_ticker'].empty:
+        print(results['by_ticker'].sort_values('expectancy_pct', ascending=False).head(20))
@@ -0,0 +1,273 @@
+"""
+Bar Archive
+Append-only, memory-mapped columnar store for long OHLCV histories
+"""
+
+import json
+import os
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+import config
+
+ARCHIVE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class BarArchive:
+    """
+    Months of intraday bars for many tickers, kept on disk
+
+    Layout (per interval):
+        <root>/archive/<interval>/<Field>.f64   one float64 column per OHLCV field
+        <root>/archive/<interval>/time.i64      UTC timestamps (int64 ns)
+        <root>/archive/<interval>/index.csv     ticker,date,start,stop row ranges
+        <root>/archive/<interval>/meta.json     exchange timezone used for dates
+
+    Rows are only ever appended. Every append adds one index line per
+    (ticker, date) it touches, so a ticker-date slice is a dictionary lookup
+    plus a contiguous read from each column file, and full-column scans are
+    sequential reads of memory-mapped files.
+    """
+
+    def __init__(self, root: str = None):
+        """
+        Initialize the archive
+
+        Args:
+            root: Cache directory (defaults to config.CACHE_DIRECTORY)
+        """
+        self.root = root or config.CACHE_DIRECTORY
+        self._indexes = {}  # interval -> in-memory index, see _index()
+        self._columns = {}  # (interval, field) -> read-only memmap
+
+    def _dir(self, interval: str) -> str:
+        return os.path.join(self.root, 'archive', interval)
+
+    def _index(self, interval: str) -> Dict:
+        """
+        Load index lines appended since the last call (possibly by another
+        process) into the in-memory index
+        """
+        index = self._indexes.get(interval)
+        if index is None:
+            index = {'segments': {}, 'days': {}, 'last': {}, 'rows': 0,
+                     'offset': 0, 'tz': None}
+            self._indexes[interval] = index
+
+        directory = self._dir(interval)
+        meta_path = os.path.join(directory, 'meta.json')
+        if index['tz'] is None and os.path.isfile(meta_path):
+            with open(meta_path) as f:
+                index['tz'] = json.load(f)['tz']
+
+        index_path = os.path.join(directory, 'index.csv')
+        if not os.path.isfile(index_path) or os.path.getsize(index_path) == index['offset']:
+            return index
+
+        with open(index_path) as f:
+            f.seek(index['offset'])
+            lines = f.readlines()
+            index['offset'] = f.tell()
+
+        for line in lines:
+            ticker, date, start, stop = line.rstrip('\n').split(',')
+            start, stop = int(start), int(stop)
+            index['segments'].setdefault((ticker, date), []).append((start, stop))
+            days = index['days'].setdefault(ticker, [])
+            if not days or days[-1] != date:
+                days.append(date)
+            index['last'][ticker] = stop - 1
+            index['rows'] = max(index['rows'], stop)
+
+        return index
+
+    def column(self, field: str, interval: str = "5m") -> np.ndarray:
+        """
+        Read-only memory map of a whole column (a field, or 'time')
+
+        Args:
+            field: OHLCV field name or 'time'
+            interval: Bar interval
+
+        Returns:
+            float64 array (int64 for 'time') over every archived row
+        """
+        rows = self._index(interval)['rows']
+        cached = self._columns.get((interval, field))
+        if cached is not None and len(cached) == rows:
+            return cached
+
+        if field == 'time':
+            path, dtype = os.path.join(self._dir(interval), 'time.i64'), np.int64
+        else:
+            path, dtype = os.path.join(self._dir(interval), f'{field}.f64'), np.float64
+
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+
+        column = np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+        self._columns[(interval, field)] = column
+        return column
+
+    def append(self, ticker: str, df: pd.DataFrame, interval: str = "5m") -> int:
+        """
+        Append bars newer than the ticker's last archived bar
+
+        Args:
+            ticker: Stock ticker symbol
+            df: OHLCV bars (any overlap with the archive is skipped)
+            interval: Bar interval
+
+        Returns:
+            Number of rows appended
+        """
+        if df is None or df.empty:
+            return 0
+
+        index = self._index(interval)
+        directory = self._dir(interval)
+        os.makedirs(directory, exist_ok=True)
+
+        if index['tz'] is None:
+            tz = pd.DatetimeIndex(df.index).tz
+            index['tz'] = str(tz) if tz else 'UTC'
+            with open(os.path.join(directory, 'meta.json'), 'w') as f:
+                json.dump({'tz': index['tz']}, f)
+
+        times = pd.DatetimeIndex(df.index).as_unit('ns')
+        if times.tz is None:
+            times = times.tz_localize(index['tz'])
+        utc_ns = times.tz_convert('UTC').asi8
+
+        if ticker in index['last']:
+            last_ns = self.column('time', interval)[index['last'][ticker]]
+            keep = utc_ns > last_ns
+            df, times, utc_ns = df[keep], times[keep], utc_ns[keep]
+        if not len(df):
+            return 0
+
+        start = index['rows']
+        for field in ARCHIVE_FIELDS:
+            with open(os.path.join(directory, f'{field}.f64'), 'ab') as f:
+                f.write(df[field].to_numpy(dtype=np.float64).tobytes())
+        with open(os.path.join(directory, 'time.i64'), 'ab') as f:
+            f.write(utc_ns.astype(np.int64).tobytes())
+
+        # The index is written last, so readers never see rows that are
+        # not fully on disk
+        dates = times.tz_convert(index['tz']).strftime('%Y-%m-%d')
+        boundaries = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+        lines = []
+        for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, len(dates)]):
+            lines.append(f"{ticker},{dates[lo]},{start + lo},{start + hi}\n")
+        with open(os.path.join(directory, 'index.csv'), 'a') as f:
+            f.writelines(lines)
+
+        self._index(interval)
+        return len(df)
+
+    def _frame(self, ranges: List[tuple], interval: str) -> pd.DataFrame:
+        """Build a DataFrame from archived row ranges"""
+        def gather(column):
+            if not ranges:
+                return column[:0].copy()
+            return np.concatenate([column[s:e] for s, e in ranges])
+
+        data = {field: gather(self.column(field, interval)) for field in ARCHIVE_FIELDS}
+        tz = self._index(interval)['tz'] or 'UTC'
+        times = pd.DatetimeIndex(gather(self.column('time', interval)), tz='UTC')
+
+        return pd.DataFrame(data, index=times.tz_convert(tz))
+
+    def load_day(self, ticker: str, date, interval: str = "5m") -> pd.DataFrame:
+        """
+        Bars for one ticker on one exchange date
+
+        Args:
+            ticker: Stock ticker symbol
+            date: Date (string, date or Timestamp)
+            interval: Bar interval
+
+        Returns:
+            OHLCV DataFrame (empty if nothing is archived for that day)
+        """
+        key = (ticker, pd.Timestamp(date).strftime('%Y-%m-%d'))
+        return self._frame(self._index(interval)['segments'].get(key, []), interval)
+
+    def load(self, ticker: str, interval: str = "5m", start=None,
+             end=None) -> pd.DataFrame:
+        """
+        Bars for one ticker over a date range
+
+        Args:
+            ticker: Stock ticker symbol
+            interval: Bar interval
+            start: First date to include (all history if omitted)
+            end: Last date to include (inclusive)
+
+        Returns:
+            OHLCV DataFrame, or None if the ticker is not archived
+        """
+        index = self._index(interval)
+        days = index['days'].get(ticker)
+        if not days:
+            return None
+
+        start = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else None
+        end = pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else None
+
+        ranges = []
+        for day in days:
+            if (start is None or day >= start) and (end is None or day <= end):
+                ranges.extend(index['segments'][(ticker, day)])
+
+        return self._frame(ranges, interval)
+
+    def tickers(self, interval: str = "5m") -> List[str]:
+        """List archived tickers for an interval"""
+        return sorted(self._index(interval)['days'])
+
+    def dates(self, ticker: str, interval: str = "5m") -> List[str]:
+        """List archived dates for a ticker"""
+        return list(self._index(interval)['days'].get(ticker, []))
+
+    def scan(self, interval: str = "5m", fields: List[str] = None,
+             chunk_rows: int = 1_000_000) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Sequentially read whole columns in fixed-size chunks
+
+        Rows come in archive (append) order, not grouped by ticker.
+
+        Args:
+            interval: Bar interval
+            fields: Columns to read (OHLCV fields and/or 'time')
+            chunk_rows: Rows per chunk
+
+        Yields:
+            Dictionary of field -> array view for each chunk
+        """
+        fields = fields or ARCHIVE_FIELDS + ['time']
+        columns = {field: self.column(field, interval) for field in fields}
+        rows = self._index(interval)['rows']
+
+        for start in range(0, rows, chunk_rows):
+            yield {field: column[start:start + chunk_rows]
+                   for field, column in columns.items()}
+
+    def ingest_cache(self, bar_cache, interval: str = "5m",
+                     tickers: List[str] = None) -> int:
+        """
+        Append everything in a BarCache that is not archived yet
+
+        Args:
+            bar_cache: BarCache to read
+            interval: Bar interval
+            tickers: Tickers to ingest (all cached by default)
+
+        Returns:
+            Number of rows appended
+        """
+        tickers = tickers if tickers is not None else bar_cache.tickers(interval)
+        return sum(self.append(t, bar_cache.load(t, interval), interval) for t in tickers)
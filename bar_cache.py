@@ -0,0 +1,133 @@
+"""
+Bar Cache
+On-disk per-ticker OHLCV cache that fetched bars are merged into
+"""
+
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+import config
+
+# Parquet is used when pyarrow is installed, pickle otherwise
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+FRAME_EXTENSION = '.parquet' if HAS_PYARROW else '.pkl'
+
+
+def write_frame(path: str, df: pd.DataFrame):
+    """Write a DataFrame in the cache's columnar format (atomic replace)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    if HAS_PYARROW:
+        df.to_parquet(tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_frame(path: str) -> Optional[pd.DataFrame]:
+    """Read a DataFrame written by write_frame(), or None if missing"""
+    if not os.path.isfile(path):
+        return None
+    if HAS_PYARROW:
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def safe_name(ticker: str) -> str:
+    """File-system safe name for a ticker symbol"""
+    return ticker.replace('/', '_')
+
+
+class BarCache:
+    """
+    Per-ticker, per-interval OHLCV store
+
+    Layout: <root>/bars/<interval>/<TICKER>.<ext>
+
+    New fetches are merged into the cached history (newer rows win), so the
+    cache grows beyond the 5d/1mo window a single yfinance call returns.
+    """
+
+    def __init__(self, root: str = None, archive=None):
+        """
+        Initialize the cache
+
+        Args:
+            root: Cache directory (defaults to config.CACHE_DIRECTORY)
+            archive: Optional BarArchive that new bars are also appended to
+                (a BarArchive under root when config.ARCHIVE_BARS is set)
+        """
+        self.root = root or config.CACHE_DIRECTORY
+        self.hits = 0
+        self.misses = 0
+        if archive is None and config.ARCHIVE_BARS:
+            from bar_archive import BarArchive
+            archive = BarArchive(self.root)
+        self.archive = archive
+
+    def path(self, ticker: str, interval: str = "5m") -> str:
+        return os.path.join(self.root, 'bars', interval,
+                            safe_name(ticker) + FRAME_EXTENSION)
+
+    def load(self, ticker: str, interval: str = "5m") -> Optional[pd.DataFrame]:
+        """
+        Load cached bars for a ticker
+
+        Args:
+            ticker: Stock ticker symbol
+            interval: Bar interval
+
+        Returns:
+            DataFrame with OHLCV data, or None if not cached
+        """
+        df = read_frame(self.path(ticker, interval))
+        if df is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return df
+
+    def update(self, ticker: str, df: pd.DataFrame,
+               interval: str = "5m") -> pd.DataFrame:
+        """
+        Merge freshly fetched bars into the cache
+
+        Args:
+            ticker: Stock ticker symbol
+            df: Newly fetched OHLCV bars
+            interval: Bar interval
+
+        Returns:
+            The merged bar history
+        """
+        if df is None or df.empty:
+            return self.load(ticker, interval)
+
+        ohlcv = df[['Open', 'High', 'Low', 'Close', 'Volume']]
+        existing = read_frame(self.path(ticker, interval))
+
+        if existing is not None and not existing.empty:
+            merged = pd.concat([existing[existing.index < ohlcv.index[0]], ohlcv])
+            merged = merged[~merged.index.duplicated(keep='last')]
+        else:
+            merged = ohlcv
+
+        write_frame(self.path(ticker, interval), merged)
+        if self.archive is not None:
+            self.archive.append(ticker, ohlcv, interval)
+        return merged
+
+    def tickers(self, interval: str = "5m") -> List[str]:
+        """List tickers cached for an interval"""
+        directory = os.path.join(self.root, 'bars', interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(FRAME_EXTENSION)] for name in os.listdir(directory)
+                      if name.endswith(FRAME_EXTENSION))
@@ -0,0 +1,183 @@
+"""
+Shared Bar Panel
+The universe's OHLCV bars in one shared memory block or memory-mapped file,
+attachable read-only from other processes without copying
+"""
+
+import json
+import os
+from multiprocessing import shared_memory
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class SharedBarPanel:
+    """
+    Packed OHLCV bars for many tickers
+
+    Storage is one buffer holding a float64 (rows x 5) OHLCV block followed
+    by an int64 UTC timestamp axis. A small index maps each ticker to its
+    (start, stop) row range. The buffer is either:
+
+      - a multiprocessing.shared_memory block (create(bars)), for pool
+        workers started by the creating process, or
+      - a memory-mapped file with a JSON index next to it
+        (create(bars, path=...)), which any process can open by path.
+
+    Attached panels are read-only, and frame() returns DataFrames that view
+    the shared buffer instead of copying it.
+    """
+
+    def __init__(self, handle: Dict, buffer, owner=None):
+        self.handle = handle
+        self._owner = owner  # SharedMemory or np.memmap keeping the buffer alive
+        rows = handle['rows']
+
+        self.values = np.ndarray((rows, len(OHLCV_COLUMNS)), dtype=np.float64,
+                                 buffer=buffer)
+        self.times = np.ndarray((rows,), dtype=np.int64, buffer=buffer,
+                                offset=self.values.nbytes)
+        if handle.get('read_only'):
+            self.values.flags.writeable = False
+            self.times.flags.writeable = False
+
+    @staticmethod
+    def _nbytes(rows: int) -> int:
+        return max(rows, 1) * (len(OHLCV_COLUMNS) + 1) * 8
+
+    @classmethod
+    def create(cls, bars: Dict[str, pd.DataFrame], path: str = None) -> 'SharedBarPanel':
+        """
+        Pack bars into a new panel
+
+        Args:
+            bars: Dictionary of ticker -> OHLCV DataFrame
+            path: Memory-mapped file to write (shared memory if omitted)
+
+        Returns:
+            Writable panel owning the storage; call unlink() when done
+        """
+        frames = {t: df for t, df in bars.items() if df is not None and not df.empty}
+        rows = sum(len(df) for df in frames.values())
+        size = cls._nbytes(rows)
+
+        offsets = {}
+        start = 0
+        tz = None
+        for ticker, df in frames.items():
+            offsets[ticker] = (start, start + len(df))
+            start += len(df)
+            tz = tz or pd.DatetimeIndex(df.index).tz
+
+        handle = {'rows': rows, 'tz': str(tz) if tz else None, 'offsets': offsets}
+        if path is None:
+            owner = shared_memory.SharedMemory(create=True, size=size)
+            handle['shm_name'] = owner.name
+            buffer = owner.buf
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            owner = np.memmap(path, dtype=np.uint8, mode='w+', shape=(size,))
+            handle['path'] = path
+            buffer = owner
+
+        panel = cls(handle, buffer, owner)
+        for ticker, df in frames.items():
+            start, stop = offsets[ticker]
+            panel.values[start:stop] = df[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+            index = pd.DatetimeIndex(df.index).as_unit('ns')
+            panel.times[start:stop] = (index.tz_convert('UTC') if index.tz else index).asi8
+
+        if path is not None:
+            owner.flush()
+            with open(path + '.index.json', 'w') as f:
+                json.dump(handle, f)
+
+        return panel
+
+    @classmethod
+    def attach(cls, handle) -> 'SharedBarPanel':
+        """
+        Open an existing panel read-only
+
+        Args:
+            handle: The creating panel's .handle, or the path of a
+                memory-mapped panel file
+
+        Returns:
+            Read-only panel viewing the shared storage
+        """
+        if isinstance(handle, str):
+            with open(handle + '.index.json') as f:
+                handle = json.load(f)
+            handle['offsets'] = {t: tuple(o) for t, o in handle['offsets'].items()}
+
+        handle = {**handle, 'read_only': True}
+        if 'shm_name' in handle:
+            owner = shared_memory.SharedMemory(name=handle['shm_name'])
+            return cls(handle, owner.buf, owner)
+
+        owner = np.memmap(handle['path'], dtype=np.uint8, mode='r')
+        return cls(handle, owner, owner)
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self.handle['offsets'])
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.handle['offsets']
+
+    def __len__(self) -> int:
+        return len(self.handle['offsets'])
+
+    def index(self, ticker: str) -> pd.DatetimeIndex:
+        """Timestamp axis of one ticker's bars"""
+        start, stop = self.handle['offsets'][ticker]
+        index = pd.DatetimeIndex(self.times[start:stop])
+        if self.handle['tz']:
+            index = index.tz_localize('UTC').tz_convert(self.handle['tz'])
+        return index
+
+    def frame(self, ticker: str, copy: bool = False) -> pd.DataFrame:
+        """
+        One ticker's bars as an OHLCV DataFrame
+
+        Args:
+            ticker: Stock ticker symbol
+            copy: Return a private copy instead of a view of the panel
+
+        Returns:
+            DataFrame whose OHLCV columns view the shared buffer (unless copy)
+        """
+        start, stop = self.handle['offsets'][ticker]
+        return pd.DataFrame(self.values[start:stop], index=self.index(ticker),
+                            columns=OHLCV_COLUMNS, copy=copy)
+
+    def frames(self, tickers: List[str] = None) -> Dict[str, pd.DataFrame]:
+        """Dictionary of ticker -> bars, for tickers in the panel"""
+        tickers = self.tickers if tickers is None else tickers
+        return {t: self.frame(t) for t in tickers if t in self}
+
+    def close(self):
+        """Release this process's mapping of the panel"""
+        self.values = self.times = None
+        if isinstance(self._owner, shared_memory.SharedMemory):
+            self._owner.close()
+        self._owner = None
+
+    def unlink(self):
+        """Close and delete the underlying storage (creator only)"""
+        owner = self._owner
+        self.close()
+        if 'shm_name' in self.handle:
+            if owner is not None:
+                owner.unlink()
+            else:
+                shared_memory.SharedMemory(name=self.handle['shm_name']).unlink()
+        else:
+            for path in (self.handle['path'], self.handle['path'] + '.index.json'):
+                if os.path.exists(path):
+                    os.remove(path)
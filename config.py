@@ -28,6 +28,72 @@ DATA_INTERVAL = "5m"     # Options: "1m", "5m", "15m", "30m", "1h"
 # Number of top stocks to return
 TOP_N_STOCKS = 20
 
+# Prefilter stage (batched daily snapshot before full analysis)
+USE_PREFILTER = True
+PREFILTER_PERIOD = "3mo"         # Daily history used for price/avg volume
+PREFILTER_BATCH_SIZE = 100       # Tickers per batched download
+PREFILTER_CACHE_SECONDS = 900    # Reuse snapshot data for 15 minutes
+
+# On-disk cache for fetched bars and computed ML features
+CACHE_DIRECTORY = ".screener_cache"
+ARCHIVE_BARS = False             # Also append fetched bars to the long-history archive
+
+# Coarse daily screen (only the top-K get the intraday pipeline)
+USE_COARSE_SCREEN = False
+COARSE_SCREEN_TOP_K = 100
+COARSE_SCREEN_WEIGHTS = {
+    'gap_pct': 0.25,       # Overnight gap magnitude
+    'atr_pct': 0.25,       # Daily range as % of price
+    'rel_volume': 0.30,    # Latest volume vs. 20-day average
+    'trend_pct': 0.20      # Distance from 20-day SMA
+}
+
+# Cross-sectional stage: relative strength vs. benchmarks and sector ETFs
+# (cross_sectional.py). Reference bars are fetched once per scan.
+USE_CROSS_SECTION = False
+CROSS_SECTION_BENCHMARKS = ['SPY', 'QQQ']   # The first one is the market for beta/regime
+SECTOR_ETFS = {                             # yfinance sector name -> SPDR sector ETF
+    'Technology': 'XLK',
+    'Financial Services': 'XLF',
+    'Healthcare': 'XLV',
+    'Consumer Cyclical': 'XLY',
+    'Consumer Defensive': 'XLP',
+    'Energy': 'XLE',
+    'Industrials': 'XLI',
+    'Utilities': 'XLU',
+    'Basic Materials': 'XLB',
+    'Real Estate': 'XLRE',
+    'Communication Services': 'XLC',
+}
+RS_LOOKBACK_BARS = 78            # Relative-strength horizon (one session of 5m bars)
+BETA_WINDOW_BARS = 390           # 5m returns used for beta (five sessions)
+REGIME_BREADTH_THRESHOLD = 0.6   # Share of advancing stocks needed for BULL (1 - x for BEAR)
+RS_CONFIDENCE_WEIGHT = 10        # Max confidence points from the RS percentile
+REGIME_COUNTER_TREND_PENALTY = 5 # Confidence points off for trades against the regime
+
+# Cluster-aware top-N: cap the picks from groups of co-moving stocks (correlation.py)
+DIVERSIFY_TOP_N = False
+CORRELATION_WINDOW_BARS = 390    # 5m returns used for the correlation matrix
+CORRELATION_SHRINKAGE = 0.1     # 0 (none), "ledoit_wolf", or a fixed 0-1 intensity
+CLUSTER_CORRELATION_THRESHOLD = 0.7    # Average correlation that makes a cluster
+MAX_PICKS_PER_CLUSTER = 1
+
+# Indicator/signal stage on a process pool (bars shared via shared memory)
+CPU_WORKERS = None               # None = one per CPU core
+
+# Streaming scan pipeline (scan_pipeline.py)
+PIPELINE_FETCH_WORKERS = 1       # Concurrent fetch threads (each sleeps 2-3s per request)
+PIPELINE_QUEUE_SIZE = 50         # Capacity of each queue between stages
+LEADERBOARD_PRINT_EVERY = 25     # Print the live top-N every N scored stocks (0 = off)
+
+# Sharded scans on a SQLite work queue (distributed_scan.py)
+DISTRIBUTED_QUEUE_PATH = ".screener_cache/work_queue.sqlite"  # Share this file between hosts
+SHARD_SIZE = 25                  # Tickers per shard
+SHARD_LEASE_SECONDS = 300        # A shard is re-queued if its worker goes quiet this long
+SHARD_MAX_ATTEMPTS = 3           # Leases per shard before it is marked failed
+SHARD_POLL_SECONDS = 2           # Idle polling interval for workers and the coordinator
+SHARD_WORKER_RESPAWNS = 2        # Restarts of the local workers if they all die mid-scan
+
 # =============================================================================
 # TECHNICAL INDICATORS
 # =============================================================================
@@ -58,6 +124,13 @@ ATR_PERIOD = 14
 # Volume settings
 VOLUME_PERIOD = 20
 HIGH_VOLUME_THRESHOLD = 1.5  # Multiple of average volume
+ABOVE_AVERAGE_VOLUME_THRESHOLD = 1.2  # Half-strength volume signal
+
+# Momentum settings (% move over the last 20 bars)
+MOMENTUM_THRESHOLD = 2.0
+
+# Bollinger squeeze: width below this quantile of its history
+BB_SQUEEZE_QUANTILE = 0.2
 
 # Stochastic Oscillator (Advanced)
 STOCH_PERIOD = 14
@@ -135,9 +208,29 @@ ML_MAX_DEPTH = 10
 ML_TEST_SIZE = 0.2
 ML_RANDOM_STATE = 42
 
+# Universe-wide training
+ML_N_JOBS = -1           # Parallel tree-building jobs (-1 = all cores)
+ML_MAX_SAMPLES = None    # Fraction of rows per tree (None = all; lower = less memory)
+
+# Online updates (python ml_training.py --online)
+ML_ONLINE_TREES_PER_UPDATE = 10   # Trees added per update
+ML_ONLINE_MAX_TREES = 300         # Oldest trees are dropped beyond this
+DRIFT_WINDOW_BATCHES = 5          # Recent updates averaged by the drift monitor
+DRIFT_ACCURACY_DROP = 0.05        # Refit if accuracy falls this far below baseline
+DRIFT_FEATURE_SHIFT = 0.5         # Refit if features shift this many std devs
+
+# Walk-forward validation (walk_forward.py)
+WALK_FORWARD_FOLDS = 5
+WALK_FORWARD_EMBARGO = "5min"     # Gap between train and test (one 5m bar)
+WALK_FORWARD_WORKERS = None       # None = one per CPU core
+
 # ML weight in final confidence score
 ML_WEIGHT = 0.3
 
+# Model registry (trained models are loaded from here, never trained at scan time)
+MODEL_REGISTRY_DIR = "models"
+ML_MODEL_VERSION = None  # None = latest registered version
+
 # =============================================================================
 # OUTPUT SETTINGS
 # =============================================================================
@@ -151,21 +244,46 @@ OUTPUT_FILENAME_PREFIX = "day_trading_opportunities"
 SHOW_PROGRESS = True
 VERBOSE = True
 
+# Scan telemetry (scan_telemetry.py)
+PROGRESS_EVERY = 25              # Print progress every N stocks
+ETA_EWMA_ALPHA = 0.1             # Weight of the latest stock in the ETA pace
+TELEMETRY_MAX_SAMPLES = 10_000   # Timing samples kept per stage
+WRITE_RUN_SUMMARY = True         # Dump a JSON run summary after each scan
+RUN_SUMMARY_PREFIX = "scan_summary"  # In OUTPUT_DIRECTORY
+
+# Prometheus metrics (metrics_export.py)
+METRICS_EXPORT = None        # None, "textfile" (node_exporter textfile collector) or "http"
+METRICS_TEXTFILE_PATH = "metrics/screener.prom"
+METRICS_WRITE_SECONDS = 15   # Textfile rewrite interval
+METRICS_HOST = "127.0.0.1"   # /metrics bind address for "http"
+METRICS_PORT = 9108
+METRICS_PREFIX = "screener"
+
 # Report format
 INCLUDE_TECHNICAL_DETAILS = True
 INCLUDE_DISCLAIMER = True
 
 # =============================================================================
-# TRADING RULES (Educational - Not Implemented)
+# TRADING RULES
 # =============================================================================
 
-# These are reference values for your trading plan
+# Position sizing and order selection (portfolio.py) and the backtest
 MAX_POSITION_SIZE = 0.20     # Max 20% of portfolio per position
 MAX_RISK_PER_TRADE = 0.02    # Max 2% risk per trade
 STOP_LOSS_PERCENTAGE = 0.02  # 2% stop loss
 MAX_DAILY_TRADES = 5         # Maximum trades per day
 MAX_DAILY_LOSS = 0.06        # Stop trading at 6% daily loss
 
+# Position sizing (portfolio.py)
+PLAN_ORDERS = False          # Print a sized order list after each scan
+ACCOUNT_VALUE = 25_000       # Account equity the sizes are computed for
+ATR_STOP_MULTIPLE = 1.5      # Stop distance in ATRs (STOP_LOSS_PERCENTAGE without an ATR)
+REWARD_RISK_RATIO = 2.0      # Target distance as a multiple of the stop distance
+
+# Backtesting (backtest.py)
+BACKTEST_HOLD_BARS = 12      # Time exit after this many bars (1 hour on 5m bars)
+SWEEP_WORKERS = None         # Parameter sweep processes (None = one per CPU core)
+
 # =============================================================================
 # TIME SETTINGS
 # =============================================================================
@@ -182,6 +300,29 @@ BEST_TRADING_END = (11, 0)     # 11:00 AM ET
 AFTERNOON_START = (14, 0)      # 2:00 PM ET
 AFTERNOON_END = (16, 0)        # 4:00 PM ET
 
+# Live watch mode (watch_mode.py)
+MARKET_TIMEZONE = "America/New_York"
+WATCH_INTERVAL_MINUTES = 5     # Rescan at every bar close
+WATCH_SETTLE_SECONDS = 15      # Wait after the bar close for the data provider
+WATCH_WINDOW_BARS = 390        # Bars kept per ticker for indicators (5 days of 5m)
+WATCH_BATCH_SIZE = 100         # Tickers per batched bar download
+
+# Tiered refresh scheduling for watch mode (tiered_scheduler.py)
+USE_TIERED_SCHEDULER = False
+SCHEDULER_REQUEST_BUDGET = 2   # Download requests per bar close
+SCHEDULER_WARM_EVERY_BARS = 3  # Warm tickers refresh every N bars
+SCHEDULER_DEMOTE_AFTER = 3     # Weak refreshes in a row before dropping a tier
+HOT_CONFIDENCE = 75            # Promote to hot at this confidence score...
+HOT_VOLUME_RATIO = 2.5         # ...or this volume ratio
+WARM_CONFIDENCE = 60
+WARM_VOLUME_RATIO = 1.5
+HOT_WATCHLIST = ['AAPL', 'MSFT', 'GOOGL', 'NVDA', 'TSLA',   # Always hot
+                 'AMD', 'META', 'AMZN', 'JPM', 'BAC']
+
+# Scan service daemon with an HTTP/JSON API (scan_service.py)
+SERVICE_HOST = "127.0.0.1"     # Use "0.0.0.0" to serve other machines
+SERVICE_PORT = 8765
+
 # =============================================================================
 # SENTIMENT ANALYSIS (Optional Integration)
 # =============================================================================
@@ -189,6 +330,11 @@ AFTERNOON_END = (16, 0)        # 4:00 PM ET
 USE_SENTIMENT = False
 SENTIMENT_WEIGHT = 0.3       # Weight of sentiment in final score
 SENTIMENT_API_KEY = None     # Add your API key if using sentiment
+SENTIMENT_PROVIDER = "fixture"   # "fixture" (local file) or "http" (sentiment.py)
+SENTIMENT_API_URL = None         # Batch endpoint for the "http" provider
+SENTIMENT_FIXTURE_PATH = "sentiment_fixture.json"  # {"AAPL": 0.4, ...} or CSV
+SENTIMENT_BATCH_SIZE = 50        # Tickers per provider request
+SENTIMENT_TTL_MINUTES = 60       # Cached scores are reused for this long
 
 # =============================================================================
 # ADVANCED FEATURES
@@ -204,7 +350,26 @@ ENABLE_PATTERN_DETECTION = False
 # Alert settings
 ENABLE_ALERTS = False
 ALERT_CONFIDENCE_THRESHOLD = 80
-ALERT_METHOD = "console"     # Options: "console", "email", "discord", "slack"
+ALERT_METHOD = "console"     # Options: "console", "file", "webhook", "discord", "slack"
+                             # (comma-separate to use several)
+ALERT_COOLDOWN_MINUTES = 30  # Minimum time between repeats of a rule for one ticker
+ALERT_VOLUME_SPIKE_RATIO = 3.0
+ALERT_FILENAME = "alerts.jsonl"  # In OUTPUT_DIRECTORY, for the "file" method
+ALERT_WEBHOOK_URL = None     # Endpoint for the "webhook", "discord" and "slack" methods
+
+# Alert rules, evaluated on every score update (alert_engine.py)
+#   cross_above / cross_below: field crosses a threshold
+#   transition: field changes from one of 'from' to one of 'to'
+ALERT_RULES = [
+    {'name': 'score_cross', 'type': 'cross_above', 'field': 'confidence_score',
+     'threshold': ALERT_CONFIDENCE_THRESHOLD},
+    {'name': 'direction_flip', 'type': 'transition', 'field': 'trade_direction',
+     'from': ['LONG', 'SHORT'], 'to': ['LONG', 'SHORT']},
+    {'name': 'volume_spike', 'type': 'cross_above', 'field': 'volume_ratio',
+     'threshold': ALERT_VOLUME_SPIKE_RATIO},
+    {'name': 'vwap_reclaim', 'type': 'transition', 'field': 'vwap_signal',
+     'from': [-1, 0], 'to': [1]},
+]
 
 # =============================================================================
 # VALIDATION RULES
@@ -0,0 +1,141 @@
+"""
+Correlation Clustering
+Intraday return correlation across the scanned universe, clusters of
+co-moving names, and a top-N that caps the picks per cluster
+"""
+
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+from sklearn.covariance import ledoit_wolf
+
+import config
+
+
+def aligned_returns(closes: Dict[str, pd.Series], window: int = None) -> pd.DataFrame:
+    """
+    Bar-to-bar log returns of every ticker on one time axis
+
+    Args:
+        closes: Dictionary of ticker -> closes
+        window: Most recent bars to keep (defaults to config.CORRELATION_WINDOW_BARS)
+
+    Returns:
+        bars x tickers DataFrame; a bar a ticker did not trade is a zero return
+    """
+    window = window or config.CORRELATION_WINDOW_BARS
+    panel = pd.DataFrame({t: c for t, c in closes.items() if c is not None and len(c) > 1})
+    panel = panel.sort_index().iloc[-(window + 1):]
+    return np.log(panel.ffill()).diff().iloc[1:].fillna(0.0)
+
+
+def correlation_matrix(closes: Dict[str, pd.Series], window: int = None,
+                       shrinkage: Union[str, float] = None) -> pd.DataFrame:
+    """
+    Correlation matrix of intraday returns for the whole universe
+
+    Args:
+        closes: Dictionary of ticker -> closes
+        window: Most recent bars to use
+        shrinkage: 0 for the sample correlation, a float in (0, 1] to
+            shrink off-diagonal entries toward zero by that amount, or
+            'ledoit_wolf' for the Ledoit-Wolf estimate of the intensity
+            (defaults to config.CORRELATION_SHRINKAGE). With more tickers
+            than bars Ledoit-Wolf shrinks hard, so lower the cluster
+            threshold along with it
+
+    Returns:
+        tickers x tickers correlation DataFrame
+    """
+    shrinkage = config.CORRELATION_SHRINKAGE if shrinkage is None else shrinkage
+    returns = aligned_returns(closes, window)
+    X = returns.to_numpy(dtype=np.float64)
+
+    # Standardize once; the correlation is then a single matrix product
+    std = X.std(axis=0)
+    active = std > 0
+    Z = np.zeros_like(X)
+    Z[:, active] = (X[:, active] - X[:, active].mean(axis=0)) / std[active]
+
+    if shrinkage == 'ledoit_wolf':
+        # On standardized returns the Ledoit-Wolf target is (nearly) the
+        # identity, i.e. the off-diagonal correlations are shrunk to zero
+        corr, _ = ledoit_wolf(Z[:, active], assume_centered=True)
+        d = np.sqrt(np.diag(corr))
+        full = np.zeros((X.shape[1], X.shape[1]))
+        full[np.ix_(active, active)] = corr / np.outer(d, d)
+        corr = full
+    else:
+        corr = Z.T @ Z / max(len(Z), 1)
+        if shrinkage:
+            corr = corr * (1 - float(shrinkage))
+
+    # Tickers that never moved keep zero correlation with all others
+    np.fill_diagonal(corr, 1.0)
+    return pd.DataFrame(corr, index=returns.columns, columns=returns.columns)
+
+
+def cluster_tickers(corr: pd.DataFrame, threshold: float = None) -> pd.Series:
+    """
+    Group tickers whose returns move together
+
+    Average-linkage hierarchical clustering on the distance 1 - correlation,
+    cut where the average correlation within a cluster falls below
+    `threshold`.
+
+    Args:
+        corr: Output of correlation_matrix()
+        threshold: Minimum average correlation within a cluster (defaults to
+            config.CLUSTER_CORRELATION_THRESHOLD)
+
+    Returns:
+        Series of ticker -> cluster id (1-based)
+    """
+    threshold = config.CLUSTER_CORRELATION_THRESHOLD if threshold is None else threshold
+    if len(corr) < 2:
+        return pd.Series(np.arange(1, len(corr) + 1), index=corr.index, name='cluster')
+
+    distance = np.clip(1.0 - corr.to_numpy(), 0.0, 2.0)
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0.0)
+    tree = linkage(squareform(distance, checks=False), method='average')
+    labels = fcluster(tree, t=1.0 - threshold, criterion='distance')
+
+    return pd.Series(labels, index=corr.index, name='cluster')
+
+
+def diversified_top_n(results: pd.DataFrame, clusters: pd.Series, top_n: int = None,
+                      max_per_cluster: int = None,
+                      score_column: str = 'confidence_score') -> pd.DataFrame:
+    """
+    Best results with at most `max_per_cluster` names from each cluster
+
+    Args:
+        results: Scan results with 'ticker' and the score column
+        clusters: Output of cluster_tickers(); tickers missing from it count
+            as their own cluster
+        top_n: Number of results to return (defaults to config.TOP_N_STOCKS)
+        max_per_cluster: Picks allowed per cluster (defaults to
+            config.MAX_PICKS_PER_CLUSTER)
+        score_column: Column to rank by
+
+    Returns:
+        Top results, best first, with a 'cluster' column
+    """
+    top_n = top_n or config.TOP_N_STOCKS
+    max_per_cluster = config.MAX_PICKS_PER_CLUSTER if max_per_cluster is None \
+        else max_per_cluster
+
+    ranked = results.sort_values(score_column, ascending=False).copy()
+    cluster_ids = ranked['ticker'].map(clusters).to_numpy(dtype=np.float64)
+    # Unclustered tickers get unique negative ids so they never collide
+    missing = np.isnan(cluster_ids)
+    cluster_ids[missing] = -np.arange(1, missing.sum() + 1)
+    ranked['cluster'] = cluster_ids.astype(int)
+
+    # Rank of each result within its cluster, in score order
+    within_cluster = ranked.groupby('cluster').cumcount()
+    return ranked[within_cluster < max_per_cluster].head(top_n)
@@ -0,0 +1,222 @@
+"""
+Cross-Sectional Features
+Relative strength against benchmarks and sector ETFs, beta-adjusted
+returns, percentile ranks and a market-regime flag, computed once per scan
+for the whole universe
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+import config
+from universe_filters import download_intraday_bars
+
+# Return horizon, in bars, of the per-bar relative-strength ML features
+RELATIVE_STRENGTH_LOOKBACK = 20
+
+# Market regimes, from the benchmark trend and the universe's breadth
+BULL = 'BULL'
+BEAR = 'BEAR'
+MIXED = 'MIXED'
+
+
+def reference_tickers() -> List[str]:
+    """Benchmarks followed by the distinct sector ETFs"""
+    return list(dict.fromkeys(config.CROSS_SECTION_BENCHMARKS +
+                              list(config.SECTOR_ETFS.values())))
+
+
+def sector_etf(sector: str) -> str:
+    """Sector ETF for a yfinance sector name (the first benchmark if unknown)"""
+    return config.SECTOR_ETFS.get(sector, config.CROSS_SECTION_BENCHMARKS[0])
+
+
+def fetch_reference_bars(period: str = "5d", interval: str = "5m") -> Dict[str, pd.DataFrame]:
+    """
+    Fetch benchmark and sector-ETF bars with one batched download
+
+    Args:
+        period: History period
+        interval: Bar interval
+
+    Returns:
+        Dictionary of reference ticker -> OHLCV DataFrame
+    """
+    tickers = reference_tickers()
+    return download_intraday_bars(tickers, period=period, interval=interval,
+                                  batch_size=len(tickers))
+
+
+def relative_strength_columns(lookback: int = RELATIVE_STRENGTH_LOOKBACK) -> List[str]:
+    """
+    Names of the relative-strength ML feature columns
+
+    One column per configured benchmark (the first two of
+    CROSS_SECTION_BENCHMARKS) plus the sector ETF, named after the symbol
+    and the horizon, so changing either changes the model's feature schema
+
+    Args:
+        lookback: Return horizon in bars
+
+    Returns:
+        Column names, e.g. ['rs_spy_20', 'rs_qqq_20', 'rs_sector_20']
+    """
+    benchmarks = config.CROSS_SECTION_BENCHMARKS[:2]
+    return [f"rs_{symbol.lower()}_{lookback}" for symbol in benchmarks] + \
+        [f"rs_sector_{lookback}"]
+
+
+def relative_strength_series(close: pd.Series, reference: Dict[str, pd.DataFrame],
+                             sector: str = None,
+                             lookback: int = RELATIVE_STRENGTH_LOOKBACK) -> pd.DataFrame:
+    """
+    Per-bar relative strength of one ticker (ML feature columns)
+
+    Each column is the ticker's `lookback`-bar return minus the reference's
+    return over the same bars. Reference closes are aligned to the ticker's
+    timestamps, so bars outside the reference history are NaN.
+
+    Args:
+        close: The ticker's closes
+        reference: Output of fetch_reference_bars()
+        sector: The ticker's sector (the sector column falls back to the
+            first benchmark when the sector has no ETF)
+        lookback: Return horizon in bars
+
+    Returns:
+        DataFrame with relative_strength_columns(lookback) on the ticker's index
+    """
+    returns = close.pct_change(lookback)
+
+    def relative_to(symbol):
+        bars = reference.get(symbol)
+        if bars is None or bars.empty:
+            return pd.Series(np.nan, index=close.index)
+        aligned = bars['Close'].reindex(close.index, method='ffill')
+        return returns - aligned.pct_change(lookback)
+
+    symbols = config.CROSS_SECTION_BENCHMARKS[:2] + [sector_etf(sector)]
+    return pd.DataFrame({column: relative_to(symbol) for column, symbol in
+                         zip(relative_strength_columns(lookback), symbols)},
+                        index=close.index)
+
+
+def _masked_beta(returns: np.ndarray, market: np.ndarray) -> np.ndarray:
+    """
+    Beta of every column of `returns` (bars x tickers) to `market` (bars),
+    each over the bars where both are present
+    """
+    valid = ~np.isnan(returns) & ~np.isnan(market)[:, None]
+    counts = valid.sum(axis=0)
+    r = np.where(valid, returns, 0.0)
+    m = np.where(valid, market[:, None], 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r_mean = r.sum(axis=0) / counts
+        m_mean = m.sum(axis=0) / counts
+        covariance = (valid * (r - r_mean) * (m - m_mean)).sum(axis=0)
+        variance = (valid * (m - m_mean) ** 2).sum(axis=0)
+        beta = covariance / variance
+
+    beta[counts < 2] = np.nan
+    return beta
+
+
+def market_regime(benchmark_return: float, breadth: float) -> str:
+    """
+    Classify the market from the benchmark's return and the universe's breadth
+
+    Args:
+        benchmark_return: First benchmark's return over the lookback
+        breadth: Fraction of the universe with a positive return
+
+    Returns:
+        BULL, BEAR or MIXED
+    """
+    if pd.isna(benchmark_return) or pd.isna(breadth):
+        return MIXED
+    if benchmark_return > 0 and breadth >= config.REGIME_BREADTH_THRESHOLD:
+        return BULL
+    if benchmark_return < 0 and breadth <= 1 - config.REGIME_BREADTH_THRESHOLD:
+        return BEAR
+    return MIXED
+
+
+def compute_cross_section(closes: Dict[str, pd.Series], sectors: Dict[str, str],
+                          reference: Dict[str, pd.DataFrame], lookback: int = None,
+                          beta_window: int = None) -> pd.DataFrame:
+    """
+    Relative-strength table for the whole universe
+
+    Universe and reference closes are aligned into one bars x tickers panel,
+    so every metric is a single vectorized operation over the universe.
+
+    Args:
+        closes: Dictionary of ticker -> closes (e.g. the scan's 5m bars)
+        sectors: Dictionary of ticker -> sector
+        reference: Output of fetch_reference_bars()
+        lookback: Return horizon in bars (defaults to config.RS_LOOKBACK_BARS)
+        beta_window: Bars of returns used for beta (defaults to
+            config.BETA_WINDOW_BARS)
+
+    Returns:
+        DataFrame indexed by ticker with return_pct, rs_spy, rs_qqq,
+        rs_sector (percentage points), intraday_beta, beta_adj_return,
+        rs_percentile, beta_adj_percentile, market_regime and
+        market_breadth
+    """
+    lookback = lookback or config.RS_LOOKBACK_BARS
+    beta_window = beta_window or config.BETA_WINDOW_BARS
+    columns = ['return_pct', 'rs_spy', 'rs_qqq', 'rs_sector', 'intraday_beta', 'beta_adj_return',
+               'rs_percentile', 'beta_adj_percentile', 'market_regime', 'market_breadth']
+
+    closes = {t: c for t, c in closes.items() if c is not None and len(c) > 1}
+    if not closes:
+        return pd.DataFrame(columns=columns)
+
+    universe = pd.DataFrame(closes)
+    references = pd.DataFrame({t: df['Close'] for t, df in reference.items()
+                               if df is not None and not df.empty and t not in closes})
+    panel = pd.concat([universe, references], axis=1).sort_index()
+    panel = panel[~panel.index.duplicated(keep='last')]
+    panel = panel.iloc[-(max(lookback, beta_window) + 1):]
+
+    # Forward-fill so a ticker without a print in the latest bar still
+    # gets a return; the lookback start is the same bar for everyone
+    filled = panel.ffill()
+    start = filled.iloc[-(lookback + 1)] if len(filled) > lookback else filled.iloc[0]
+    period_return = filled.iloc[-1] / start - 1
+
+    tickers = list(universe.columns)
+    returns = period_return.reindex(tickers)
+    benchmark_return = lambda symbol: period_return.get(symbol, np.nan)
+    spy, qqq = (config.CROSS_SECTION_BENCHMARKS + [None, None])[:2]
+    sector_returns = np.array([benchmark_return(sector_etf(sectors.get(t))) for t in tickers])
+
+    bar_returns = panel.pct_change(fill_method=None).iloc[-beta_window:]
+    if spy in bar_returns:
+        beta = _masked_beta(bar_returns[tickers].to_numpy(), bar_returns[spy].to_numpy())
+    else:
+        beta = np.full(len(tickers), np.nan)
+
+    table = pd.DataFrame({
+        'return_pct': returns * 100,
+        'rs_spy': (returns - benchmark_return(spy)) * 100,
+        'rs_qqq': (returns - benchmark_return(qqq)) * 100,
+        'rs_sector': (returns - sector_returns) * 100,
+        'intraday_beta': beta,
+        # Return left over after the part explained by the market move
+        'beta_adj_return': (returns - beta * benchmark_return(spy)) * 100,
+    }, index=pd.Index(tickers, name='ticker'))
+    table = table.replace([np.inf, -np.inf], np.nan)
+
+    table['rs_percentile'] = table['rs_spy'].rank(pct=True) * 100
+    table['beta_adj_percentile'] = table['beta_adj_return'].rank(pct=True) * 100
+
+    breadth = (returns.dropna() > 0).mean() if returns.notna().any() else np.nan
+    table['market_regime'] = market_regime(benchmark_return(spy), breadth)
+    table['market_breadth'] = round(breadth, 3) if pd.notna(breadth) else np.nan
+
+    return table[columns].round({c: 3 for c in columns[:8]})
@@ -7,13 +7,23 @@ Now automatically scans all S&P 500 stocks!
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Dict, Tuple
 import warnings
 import time
 import random
 warnings.filterwarnings('ignore')
 
+import config
+from bar_cache import BarCache
+from correlation import cluster_tickers, correlation_matrix, diversified_top_n
+from metrics_export import cache_collector, start_metrics_export
+from parallel_analysis import AnalysisPool, analyze_bars_parallel
+from portfolio import build_order_list, format_order_list
+from scan_telemetry import ScanTelemetry
+from universe_filters import prefilter_universe, coarse_screen
+from vectorized_scoring import default_params
+
 # Try to import cached S&P 500 list
 try:
     from sp500_cached_list import get_cached_sp500
@@ -27,7 +37,7 @@ class DayTradingScreener:
     """
     
     def __init__(self, min_price: float = 5.0, max_price: float = 500.0, 
-                 min_volume: int = 1000000):
+                 min_volume: int = 1000000, bar_cache: BarCache = None):
         """
         Initialize the screener with filtering criteria
         
@@ -35,11 +45,16 @@ class DayTradingScreener:
             min_price: Minimum stock price to consider
             max_price: Maximum stock price to consider
             min_volume: Minimum average volume required
+            bar_cache: Optional on-disk cache that fetched bars are merged into
         """
         self.min_price = min_price
         self.max_price = max_price
         self.min_volume = min_volume
         self.sp500_tickers = None  # Cache S&P 500 list
+        self.snapshot = None  # Last prefilter snapshot (daily price/volume)
+        self.bar_cache = bar_cache
+        self.daily_metrics = None  # Last coarse screen metrics (gap, ATR%, etc.)
+        self.telemetry = ScanTelemetry()  # Stage timers and counters, reset per scan
         
     def fetch_sp500_tickers(self) -> List[str]:
         """
@@ -149,14 +164,22 @@ class DayTradingScreener:
             DataFrame with OHLCV data
         """
         try:
-            stock = yf.Ticker(ticker)
-            df = stock.history(period=period, interval=interval)
+            with self.telemetry.stage('fetch'):
+                stock = yf.Ticker(ticker)
+                df = stock.history(period=period, interval=interval)
             
             if df.empty:
+                self.telemetry.count('fetch_errors', type='empty')
                 return None
+            
+            if self.bar_cache is not None:
+                self.bar_cache.update(ticker, df, interval=interval)
                 
             return df
         except Exception as e:
+            self.telemetry.count('fetch_errors', type=type(e).__name__)
+            if "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
+                self.telemetry.count('rate_limit_events')
             print(f"Error fetching data for {ticker}: {e}")
             return None
     
@@ -266,11 +289,35 @@ class DayTradingScreener:
         # Fetch data
         df = self.fetch_stock_data(ticker, period="5d", interval="5m")
         
+        return self.analyze_bars(ticker, df)
+    
+    def analyze_bars(self, ticker: str, df: pd.DataFrame) -> Dict:
+        """
+        Run the indicator and signal stages on already-fetched bars
+        
+        Args:
+            ticker: Stock ticker symbol
+            df: DataFrame with 5m OHLCV data
+            
+        Returns:
+            Dictionary with analysis results
+        """
         if df is None or df.empty or len(df) < 50:
             return None
         
+        # Filter by price and volume on the raw bars, before any indicator math
+        current_price = df['Close'].iloc[-1]
+        avg_volume = df['Volume'].mean()
+        
+        if current_price < self.min_price or current_price > self.max_price:
+            return None
+        
+        if avg_volume < self.min_volume:
+            return None
+        
         # Calculate indicators
-        df = self.calculate_technical_indicators(df)
+        with self.telemetry.stage('indicators'):
+            df = self.calculate_technical_indicators(df)
         
         if df is None:
             return None
@@ -279,18 +326,6 @@ class DayTradingScreener:
         latest = df.iloc[-1]
         prev = df.iloc[-2] if len(df) > 1 else latest
         
-        # Get current price and volume info
-        current_price = latest['Close']
-        current_volume = latest['Volume']
-        avg_volume = df['Volume'].mean()
-        
-        # Filter by price and volume
-        if current_price < self.min_price or current_price > self.max_price:
-            return None
-        
-        if avg_volume < self.min_volume:
-            return None
-        
         # Calculate signals and scores
         analysis = {
             'ticker': ticker,
@@ -299,15 +334,17 @@ class DayTradingScreener:
                                       df.iloc[0]['Close']) * 100, 2),
         }
         
-        # Technical signals
-        signals = self._generate_signals(df, latest, prev)
-        analysis.update(signals)
-        
-        # Calculate confidence score and predicted move
-        analysis['confidence_score'] = self._calculate_confidence_score(signals)
-        analysis['predicted_move_pct'] = self._predict_price_move(df, signals)
-        analysis['trade_direction'] = self._determine_direction(signals)
-        analysis['risk_level'] = self._calculate_risk_level(df, latest)
+        with self.telemetry.stage('signals'):
+            # Technical signals
+            signals = self._generate_signals(df, latest, prev)
+            analysis.update(signals)
+            
+            # Calculate confidence score and predicted move
+            analysis['confidence_score'] = self._calculate_confidence_score(signals)
+            analysis['predicted_move_pct'] = self._predict_price_move(df, signals)
+            analysis['trade_direction'] = self._determine_direction(signals)
+            analysis['risk_level'] = self._calculate_risk_level(df, latest)
+            analysis['atr'] = round(latest['ATR'], 4) if pd.notna(latest['ATR']) else None
         
         return analysis
     
@@ -316,16 +353,20 @@ class DayTradingScreener:
         """
         Generate trading signals from technical indicators
         
+        Thresholds come from vectorized_scoring.default_params(), so the
+        live scan and the vectorized scorer agree bar for bar
+        
         Returns:
             Dictionary of signal scores
         """
+        p = default_params()
         signals = {}
         
         # RSI signals
         if pd.notna(latest['RSI']):
-            if latest['RSI'] < 30:
+            if latest['RSI'] < p['rsi_oversold']:
                 signals['rsi_signal'] = 1  # Oversold - bullish
-            elif latest['RSI'] > 70:
+            elif latest['RSI'] > p['rsi_overbought']:
                 signals['rsi_signal'] = -1  # Overbought - bearish
             else:
                 signals['rsi_signal'] = 0  # Neutral
@@ -360,7 +401,7 @@ class DayTradingScreener:
             
             # BB squeeze (low volatility - potential breakout)
             signals['bb_width'] = round(latest['BB_Width'], 4)
-            if latest['BB_Width'] < df['BB_Width'].quantile(0.2):
+            if latest['BB_Width'] < df['BB_Width'].quantile(p['bb_squeeze_quantile']):
                 signals['bb_squeeze'] = True
             else:
                 signals['bb_squeeze'] = False
@@ -394,9 +435,9 @@ class DayTradingScreener:
         
         # Volume signals
         if pd.notna(latest['Volume_Ratio']):
-            if latest['Volume_Ratio'] > 1.5:
+            if latest['Volume_Ratio'] > p['high_volume_threshold']:
                 signals['volume_signal'] = 1  # High volume
-            elif latest['Volume_Ratio'] > 1.2:
+            elif latest['Volume_Ratio'] > p['above_average_volume_threshold']:
                 signals['volume_signal'] = 0.5  # Above average
             else:
                 signals['volume_signal'] = 0
@@ -411,9 +452,9 @@ class DayTradingScreener:
                             recent_data.iloc[0]['Close']) * 100
             signals['momentum_pct'] = round(price_momentum, 2)
             
-            if price_momentum > 2:
+            if price_momentum > p['momentum_threshold']:
                 signals['momentum_signal'] = 1
-            elif price_momentum < -2:
+            elif price_momentum < -p['momentum_threshold']:
                 signals['momentum_signal'] = -1
             else:
                 signals['momentum_signal'] = 0
@@ -433,15 +474,8 @@ class DayTradingScreener:
             Confidence score
         """
         # Weighted signal scoring
-        weights = {
-            'rsi_signal': 0.15,
-            'macd_signal': 0.20,
-            'bb_signal': 0.10,
-            'vwap_signal': 0.20,
-            'ma_signal': 0.15,
-            'volume_signal': 0.10,
-            'momentum_signal': 0.10
-        }
+        p = default_params()
+        weights = p['confidence_weights']
         
         # Calculate weighted sum of absolute signal values
         total_score = 0
@@ -465,11 +499,11 @@ class DayTradingScreener:
         if signal_values:
             if all(s > 0 for s in signal_values if s != 0) or \
                all(s < 0 for s in signal_values if s != 0):
-                confidence = min(100, confidence * 1.2)  # 20% bonus
+                confidence = min(100, confidence * p['signal_alignment_bonus'])
         
         # Bonus for BB squeeze (volatility expansion expected)
         if signals.get('bb_squeeze', False):
-            confidence = min(100, confidence * 1.1)  # 10% bonus
+            confidence = min(100, confidence * p['bb_squeeze_bonus'])
         
         return round(confidence, 2)
     
@@ -542,6 +576,7 @@ class DayTradingScreener:
     
     def _calculate_risk_level(self, df: pd.DataFrame, latest: pd.Series) -> str:
         """Calculate risk level (LOW/MEDIUM/HIGH)"""
+        p = default_params()
         # Based on volatility and volume
         if pd.notna(latest['ATR']):
             volatility = (latest['ATR'] / latest['Close']) * 100
@@ -551,75 +586,194 @@ class DayTradingScreener:
         volume_ratio = latest.get('Volume_Ratio', 1.0)
         
         # Combined risk score
-        if volatility < 2 and volume_ratio < 1.5:
+        if volatility < p['low_volatility'] and volume_ratio < p['high_volume_threshold']:
             return 'LOW'
-        elif volatility > 5 or volume_ratio > 2.5:
+        elif volatility > p['high_volatility'] or volume_ratio > p['high_volume_ratio']:
             return 'HIGH'
         else:
             return 'MEDIUM'
     
+    def prefilter_universe(self, tickers: List[str]) -> List[str]:
+        """
+        Drop tickers that fail price/volume criteria using a batched
+        daily snapshot, before any intraday fetch
+        
+        Args:
+            tickers: List of stock tickers
+            
+        Returns:
+            List of tickers that survive the prefilter
+        """
+        survivors, self.snapshot = prefilter_universe(
+            tickers, self.min_price, self.max_price, self.min_volume
+        )
+        return survivors
+    
+    def coarse_screen(self, tickers: List[str], top_k: int = 100) -> List[str]:
+        """
+        Rank tickers on daily bars (gap %, ATR %, relative volume, trend)
+        and keep only the top-K for the intraday pipeline
+        
+        Args:
+            tickers: List of stock tickers
+            top_k: Number of tickers to keep
+            
+        Returns:
+            List of the top-K tickers, best first
+        """
+        survivors, self.daily_metrics = coarse_screen(tickers, top_k)
+        return survivors
+    
+    def analyze_many(self, bars: Dict[str, pd.DataFrame], 
+                     n_workers: int = None) -> List[Dict]:
+        """
+        Run analyze_bars() for many tickers on a process pool
+        
+        Args:
+            bars: Dictionary of ticker -> 5m OHLCV DataFrame
+            n_workers: Worker processes (defaults to config.CPU_WORKERS)
+            
+        Returns:
+            List of analyses, in completion order
+        """
+        screener_kwargs = {'min_price': self.min_price, 
+                           'max_price': self.max_price, 
+                           'min_volume': self.min_volume}
+        return list(analyze_bars_parallel(bars, n_workers, screener_kwargs))
+    
     def scan_all_stocks(self, custom_tickers: List[str] = None, 
-                       top_n: int = 20) -> pd.DataFrame:
+                       top_n: int = 20, prefilter: bool = None,
+                       coarse_top_k: int = None, 
+                       cpu_workers: int = None,
+                       diversify: bool = None) -> pd.DataFrame:
         """
         Scan all stocks and return top opportunities
         
         Args:
             custom_tickers: Optional list of specific tickers
             top_n: Number of top stocks to return
+            prefilter: Drop ineligible tickers with a batched daily
+                snapshot before the full analysis (defaults to
+                config.USE_PREFILTER)
+            coarse_top_k: If set, only the top-K tickers from the daily
+                coarse screen get the intraday analysis (defaults to
+                config.COARSE_SCREEN_TOP_K with USE_COARSE_SCREEN; 0 skips
+                the coarse screen)
+            cpu_workers: If set, only fetch in the scan loop and run the
+                indicator/signal stage on this many worker processes,
+                each ticker as soon as its bars arrive
+            diversify: Cap the picks per cluster of correlated stocks
+                (defaults to config.DIVERSIFY_TOP_N)
             
         Returns:
             DataFrame with ranked opportunities
         """
-        universe = self.get_stock_universe(custom_tickers)
+        prefilter = config.USE_PREFILTER if prefilter is None else prefilter
+        if coarse_top_k is None and config.USE_COARSE_SCREEN:
+            coarse_top_k = config.COARSE_SCREEN_TOP_K
+        
+        telemetry = self.telemetry
+        telemetry.start()
+        
+        with telemetry.stage('universe'):
+            universe = self.get_stock_universe(custom_tickers)
+        
+        if prefilter:
+            with telemetry.stage('prefilter'):
+                universe = self.prefilter_universe(universe)
+        
+        if coarse_top_k:
+            with telemetry.stage('coarse_screen'):
+                universe = self.coarse_screen(universe, coarse_top_k)
+        
+        diversify = config.DIVERSIFY_TOP_N if diversify is None else diversify
+        
         results = []
+        pool = AnalysisPool(cpu_workers, {'min_price': self.min_price,
+                                          'max_price': self.max_price,
+                                          'min_volume': self.min_volume}) if cpu_workers else None
+        fetched_closes = {}  # Closes of tickers handed to the pool
+        closes = {}  # Closes of analyzed stocks, for the correlation clusters
         
         total_stocks = len(universe)
         print(f"\n{'='*80}")
         print(f"🔍 SCANNING {total_stocks} STOCKS FOR DAY TRADING OPPORTUNITIES")
         print(f"{'='*80}\n")
         
-        start_time = datetime.now()
+        telemetry.total = total_stocks
         
-        for i, ticker in enumerate(universe):
-            # Progress indicator every 25 stocks
-            if (i + 1) % 25 == 0 or i == 0:
-                elapsed = (datetime.now() - start_time).seconds
-                stocks_per_sec = (i + 1) / max(elapsed, 1)
-                remaining = (total_stocks - i - 1) / max(stocks_per_sec, 0.1)
-                print(f"Progress: {i + 1}/{total_stocks} stocks "
-                      f"({((i+1)/total_stocks*100):.1f}%) - "
-                      f"~{int(remaining/60)}min {int(remaining%60)}sec remaining")
-            
-            try:
-                analysis = self.analyze_stock(ticker)
-                
-                if analysis:
-                    results.append(analysis)
-                
-                # Add delay to avoid rate limiting (2-3 seconds between requests)
-                time.sleep(random.uniform(2.0, 3.0))
-                
-            except Exception as e:
-                # Handle rate limiting
-                if "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
-                    print(f"   ⚠️  Rate limit hit, pausing 30 seconds...")
-                    time.sleep(30)
-                    # Retry this stock
-                    try:
-                        analysis = self.analyze_stock(ticker)
+        for ticker in universe:
+            with telemetry.ticker(ticker):
+                try:
+                    bars = self.fetch_stock_data(ticker, period="5d", interval="5m")
+                    if pool is not None:
+                        # Analyzed in the background while the next tickers download
+                        if pool.submit(ticker, bars) and diversify:
+                            fetched_closes[ticker] = bars['Close']
+                    else:
+                        analysis = self.analyze_bars(ticker, bars)
+                        
                         if analysis:
                             results.append(analysis)
-                    except:
-                        pass
-                # Continue on other errors
-                pass
-        
-        elapsed_time = (datetime.now() - start_time).seconds
+                            if diversify:
+                                closes[ticker] = bars['Close']
+                    
+                    # Add delay to avoid rate limiting (2-3 seconds between requests)
+                    with telemetry.stage('throttle'):
+                        time.sleep(random.uniform(2.0, 3.0))
+                    
+                except Exception as e:
+                    telemetry.count('analysis_errors', type=type(e).__name__)
+                    # Handle rate limiting
+                    if "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
+                        telemetry.count('rate_limit_events')
+                        print(f"   ⚠️  Rate limit hit, pausing 30 seconds...")
+                        with telemetry.stage('rate_limit_wait'):
+                            time.sleep(30)
+                        # Retry this stock
+                        try:
+                            analysis = self.analyze_stock(ticker)
+                            if analysis:
+                                results.append(analysis)
+                        except:
+                            pass
+                    # Continue on other errors
+                    pass
+            
+            if telemetry.should_report():
+                print(telemetry.progress())
+        
+        if pool is not None:
+            with telemetry.stage('analyze_parallel'):
+                with pool:
+                    pooled = list(pool.results())
+            results.extend(pooled)
+            closes.update({a['ticker']: fetched_closes[a['ticker']] for a in pooled
+                           if a['ticker'] in fetched_closes})
+        
+        if results:
+            with telemetry.stage('output'):
+                # Top N with at most MAX_PICKS_PER_CLUSTER from each correlated group
+                df = pd.DataFrame(results)
+                if diversify and len(closes) > 1:
+                    clusters = cluster_tickers(correlation_matrix(closes))
+                    df = diversified_top_n(df, clusters, top_n)
+                else:
+                    df = df.sort_values('confidence_score', ascending=False).head(top_n)
+        
+        telemetry.count('tickers_scanned', total_stocks)
+        telemetry.count('opportunities', len(results))
+        
+        elapsed_time = telemetry.elapsed
         print(f"\n{'='*80}")
         print(f"✅ Scan Complete!")
-        print(f"   Total time: {int(elapsed_time/60)}min {elapsed_time%60}sec")
+        print(f"   Total time: {int(elapsed_time // 60)}min {elapsed_time % 60:.1f}sec")
         print(f"   Stocks analyzed: {total_stocks}")
         print(f"   Viable opportunities: {len(results)}")
+        if config.VERBOSE:
+            print(telemetry.format_stages())
+        if config.WRITE_RUN_SUMMARY:
+            print(f"   Run summary: {telemetry.write_summary()}")
         print(f"{'='*80}\n")
         
         if not results:
@@ -627,14 +781,7 @@ class DayTradingScreener:
             print("   Try adjusting filters in config.py (lower min_volume or min_price)")
             return pd.DataFrame()
         
-        # Convert to DataFrame
-        df = pd.DataFrame(results)
-        
-        # Sort by confidence score
-        df = df.sort_values('confidence_score', ascending=False)
-        
-        # Return top N
-        return df.head(top_n)
+        return df
     
     def generate_report(self, results_df: pd.DataFrame) -> str:
         """
@@ -693,14 +840,23 @@ def main():
     # You can specify custom tickers or use default universe
     # custom_tickers = ['AAPL', 'TSLA', 'NVDA', 'AMD', 'META']
     
+    # Prometheus metrics while the scan runs (config.METRICS_EXPORT)
+    exporter = start_metrics_export(screener.telemetry,
+                                    [cache_collector('bars', screener.bar_cache)])
+    
     # Scan stocks
     results = screener.scan_all_stocks(custom_tickers=None, top_n=15)
+    if exporter:
+        exporter.stop()
     
     # Generate and print report
     if not results.empty:
         report = screener.generate_report(results)
         print(report)
         
+        if config.PLAN_ORDERS:
+            print(format_order_list(build_order_list(results)))
+        
         # Save to CSV
         output_file = f"day_trading_opportunities_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         results.to_csv(output_file, index=False)
@@ -0,0 +1,458 @@
+"""
+Distributed Scan
+Splits a universe into shards on a SQLite work queue so any number of
+worker processes (or hosts sharing the file) can scan it, then merges
+their results into one ranking
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sqlite3
+import time
+import uuid
+import zlib
+from importlib import import_module
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+from metrics_export import shard_queue_collector, start_metrics_export
+from scan_telemetry import ScanTelemetry
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _json_default(value):
+    """Serialize numpy scalars found in analysis dictionaries"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class ShardQueue:
+    """
+    SQLite-backed queue of ticker shards with time-limited leases
+
+    A worker claims a shard by taking a lease until `now + lease_seconds`,
+    extends it with heartbeat() while scanning, and completes it by writing
+    its results. Shards whose lease expires (crashed or stuck workers) are
+    handed out again, up to SHARD_MAX_ATTEMPTS times. Results are keyed by
+    (scan, ticker), so a re-run shard overwrites rather than duplicates.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Open (and create if needed) the queue database
+
+        Args:
+            path: SQLite file (defaults to config.DISTRIBUTED_QUEUE_PATH)
+        """
+        self.path = path or config.DISTRIBUTED_QUEUE_PATH
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS shards (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scan_id TEXT NOT NULL,
+                    tickers TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS shards_by_scan ON shards (scan_id, status);
+                CREATE TABLE IF NOT EXISTS results (
+                    scan_id TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    shard_id INTEGER NOT NULL,
+                    analysis TEXT NOT NULL,
+                    PRIMARY KEY (scan_id, ticker)
+                );
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def create_scan(self, tickers: List[str], shard_size: int = None) -> str:
+        """
+        Split a universe into shards and queue them
+
+        Args:
+            tickers: Universe to scan
+            shard_size: Tickers per shard
+
+        Returns:
+            Scan identifier
+        """
+        shard_size = shard_size or config.SHARD_SIZE
+        scan_id = time.strftime('%Y%m%d_%H%M%S_') + uuid.uuid4().hex[:6]
+        shards = [(scan_id, json.dumps(tickers[i:i + shard_size]), PENDING)
+                  for i in range(0, len(tickers), shard_size)]
+
+        with self._connect() as conn:
+            conn.executemany("INSERT INTO shards (scan_id, tickers, status) VALUES (?, ?, ?)",
+                             shards)
+        return scan_id
+
+    def latest_scan(self) -> Optional[str]:
+        """Most recently created scan, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT scan_id FROM shards ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def expire_leases(self, scan_id: str = None) -> int:
+        """
+        Mark shards whose lease expired on their last attempt as failed
+
+        Args:
+            scan_id: Only expire shards of this scan (any scan if omitted)
+
+        Returns:
+            Number of shards marked failed
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET status = ? WHERE status = ? AND lease_expires < ? "
+                "AND attempts >= ? AND (? IS NULL OR scan_id = ?)",
+                (FAILED, LEASED, time.time(), config.SHARD_MAX_ATTEMPTS, scan_id, scan_id))
+        return cursor.rowcount
+
+    def fail_unfinished(self, scan_id: str) -> int:
+        """Mark every pending or leased shard of a scan as failed"""
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE shards SET status = ? WHERE scan_id = ? AND "
+                                  "status IN (?, ?)", (FAILED, scan_id, PENDING, LEASED))
+        return cursor.rowcount
+
+    def claim(self, worker: str, scan_id: str = None,
+              lease_seconds: float = None) -> Optional[tuple]:
+        """
+        Lease the next pending (or expired) shard
+
+        Args:
+            worker: Worker identifier
+            scan_id: Only claim shards of this scan (any scan if omitted)
+            lease_seconds: Lease length
+
+        Returns:
+            (shard_id, tickers), or None if nothing is claimable
+        """
+        lease_seconds = lease_seconds or config.SHARD_LEASE_SECONDS
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so two workers can
+            # never claim the same shard
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE shards SET status = ? WHERE status = ? AND lease_expires < ? "
+                         "AND attempts >= ?", (FAILED, LEASED, now, config.SHARD_MAX_ATTEMPTS))
+            row = conn.execute(
+                "SELECT id, tickers FROM shards WHERE (status = ? OR "
+                "(status = ? AND lease_expires < ?)) AND (? IS NULL OR scan_id = ?) "
+                "ORDER BY id LIMIT 1",
+                (PENDING, LEASED, now, scan_id, scan_id)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute("UPDATE shards SET status = ?, worker = ?, lease_expires = ?, "
+                         "attempts = attempts + 1 WHERE id = ?",
+                         (LEASED, worker, now + lease_seconds, row[0]))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, shard_id: int, worker: str, lease_seconds: float = None) -> bool:
+        """
+        Extend a lease
+
+        Returns:
+            False if the lease was lost (expired and claimed by another worker)
+        """
+        lease_seconds = lease_seconds or config.SHARD_LEASE_SECONDS
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET lease_expires = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + lease_seconds, shard_id, worker, LEASED))
+        return cursor.rowcount == 1
+
+    def complete(self, shard_id: int, worker: str, analyses: List[Dict]) -> bool:
+        """
+        Store a shard's results and mark it done
+
+        Returns:
+            False if the lease was lost; the results are discarded
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT scan_id FROM shards WHERE id = ? AND worker = ? "
+                               "AND status = ?", (shard_id, worker, LEASED)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return False
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (scan_id, ticker, shard_id, analysis) "
+                "VALUES (?, ?, ?, ?)",
+                [(row[0], a['ticker'], shard_id, json.dumps(a, default=_json_default))
+                 for a in analyses])
+            conn.execute("UPDATE shards SET status = ?, lease_expires = NULL WHERE id = ?",
+                         (DONE, shard_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return True
+
+    def progress(self, scan_id: str) -> Dict[str, int]:
+        """Shard counts by status for a scan"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM shards WHERE scan_id = ? "
+                                "GROUP BY status", (scan_id,)).fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def is_finished(self, scan_id: str) -> bool:
+        counts = self.progress(scan_id)
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+    def results(self, scan_id: str) -> pd.DataFrame:
+        """All stored analyses of a scan, best confidence first"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT analysis FROM results WHERE scan_id = ?",
+                                (scan_id,)).fetchall()
+        if not rows:
+            return pd.DataFrame()
+
+        df = pd.DataFrame([json.loads(r[0]) for r in rows])
+        return df.sort_values('confidence_score', ascending=False).reset_index(drop=True)
+
+
+def fake_provider(ticker: str, bars: int = 390) -> pd.DataFrame:
+    """
+    Deterministic synthetic 5m bars for a ticker (no network access)
+
+    Prices and volumes fall inside the default MIN/MAX_PRICE and
+    MIN_VOLUME filters, so every ticker reaches the signal stage.
+
+    Use as the worker provider to exercise the queue, leases and merge
+    locally: python distributed_scan.py worker --provider distributed_scan:fake_provider
+    """
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    index = pd.date_range(end=pd.Timestamp.now(tz=config.MARKET_TIMEZONE).floor('5min'),
+                          periods=bars, freq='5min')
+    close = rng.uniform(20, 300) * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = rng.uniform(0, 0.002, (2, bars))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * (1 + spread[0]),
+        'Low': np.minimum(open_, close) * (1 - spread[1]),
+        'Close': close,
+        # Average bar volume 1.5-5x MIN_VOLUME, so the default filters pass
+        'Volume': rng.uniform(0.5, 1.5, bars) * rng.uniform(1.5, 5) * max(config.MIN_VOLUME, 1),
+    }, index=index)
+
+
+def load_provider(spec: str) -> Callable:
+    """Import a bar provider given as 'module:function'"""
+    module, _, name = spec.partition(':')
+    return getattr(import_module(module), name)
+
+
+def run_worker(queue_path: str = None, scan_id: str = None, advanced: bool = False,
+               provider: str = None, worker_id: str = None, idle_exit: bool = True) -> int:
+    """
+    Claim and scan shards until the queue is drained
+
+    Args:
+        queue_path: SQLite queue file
+        scan_id: Only work on this scan
+        advanced: Use AdvancedDayTradingScreener.analyze_with_sentiment()
+            instead of DayTradingScreener.analyze_stock()
+        provider: 'module:function' returning bars for a ticker; replaces
+            the yfinance fetch (basic screener only)
+        worker_id: Worker identifier (defaults to host:pid)
+        idle_exit: Exit when nothing is claimable and nothing is leased
+
+    Returns:
+        Number of shards completed
+    """
+    queue = ShardQueue(queue_path)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    bar_provider = load_provider(provider) if provider else None
+
+    if advanced:
+        from advanced_screener import AdvancedDayTradingScreener
+        screener = AdvancedDayTradingScreener(config.MIN_PRICE, config.MAX_PRICE,
+                                              config.MIN_VOLUME)
+        analyze = lambda ticker: screener.analyze_with_sentiment(ticker)
+    else:
+        from day_trading_screener import DayTradingScreener
+        screener = DayTradingScreener(config.MIN_PRICE, config.MAX_PRICE, config.MIN_VOLUME)
+        if bar_provider is not None:
+            analyze = lambda ticker: screener.analyze_bars(ticker, bar_provider(ticker))
+        else:
+            analyze = screener.analyze_stock
+
+    completed = 0
+    while True:
+        claimed = queue.claim(worker_id, scan_id)
+        if claimed is None:
+            if idle_exit and (scan_id is None or queue.is_finished(scan_id)):
+                break
+            time.sleep(config.SHARD_POLL_SECONDS)
+            continue
+
+        shard_id, tickers = claimed
+        analyses = []
+        for ticker in tickers:
+            try:
+                analysis = analyze(ticker)
+                if analysis:
+                    analyses.append(analysis)
+            except Exception as e:
+                print(f"⚠️  [{worker_id}] {ticker} failed: {str(e)[:100]}")
+
+            if bar_provider is None:
+                # Add delay to avoid rate limiting (2-3 seconds between requests)
+                time.sleep(random.uniform(2.0, 3.0))
+            if not queue.heartbeat(shard_id, worker_id):
+                print(f"⚠️  [{worker_id}] Lost lease on shard {shard_id}, dropping it")
+                break
+        else:
+            if queue.complete(shard_id, worker_id, analyses):
+                completed += 1
+
+    return completed
+
+
+def run_coordinator(tickers: List[str], queue_path: str = None, shard_size: int = None,
+                    local_workers: int = 0, provider: str = None,
+                    advanced: bool = False) -> pd.DataFrame:
+    """
+    Queue a sharded scan, optionally start local workers, and merge results
+
+    Workers on other hosts join by running `python distributed_scan.py
+    worker` against the same queue file.
+
+    The coordinator fails shards whose lease expires on their last attempt
+    itself, so a scan finishes even when no worker is left to claim them.
+    If every local worker has died with work left, they are restarted up
+    to SHARD_WORKER_RESPAWNS times; after that the unfinished shards are
+    marked failed and the partial ranking is returned.
+
+    Args:
+        tickers: Universe to scan
+        queue_path: SQLite queue file
+        shard_size: Tickers per shard
+        local_workers: Worker processes to start on this machine
+        provider: Bar provider passed to local workers
+        advanced: Local workers use the advanced screener
+
+    Returns:
+        Merged ranking of every scanned ticker, best first
+    """
+    queue = ShardQueue(queue_path)
+    scan_id = queue.create_scan(tickers, shard_size)
+    print(f"📦 Scan {scan_id}: {len(tickers)} stocks in "
+          f"{queue.progress(scan_id)[PENDING]} shards on {queue.path}")
+
+    def start_workers() -> List[multiprocessing.Process]:
+        started = [multiprocessing.Process(target=run_worker,
+                                           args=(queue.path, scan_id, advanced, provider))
+                   for _ in range(local_workers)]
+        for process in started:
+            process.start()
+        return started
+
+    processes = start_workers()
+    respawns = 0
+
+    # Shard counts by status as Prometheus gauges (config.METRICS_EXPORT)
+    telemetry = ScanTelemetry(len(tickers))
+    exporter = start_metrics_export(telemetry, [shard_queue_collector(queue, scan_id)])
+
+    start = time.time()
+    last = None
+    while True:
+        queue.expire_leases(scan_id)
+        if queue.is_finished(scan_id):
+            break
+
+        if processes and not any(process.is_alive() for process in processes):
+            if respawns >= config.SHARD_WORKER_RESPAWNS:
+                failed = queue.fail_unfinished(scan_id)
+                print(f"⚠️  All local workers exited; marking {failed} unfinished shards failed")
+                break
+            respawns += 1
+            print(f"⚠️  All local workers exited with work left; restarting them "
+                  f"({respawns}/{config.SHARD_WORKER_RESPAWNS})")
+            processes += start_workers()
+
+        counts = queue.progress(scan_id)
+        if counts != last:
+            print(f"   {counts[DONE]} done, {counts[LEASED]} leased, "
+                  f"{counts[PENDING]} pending, {counts[FAILED]} failed "
+                  f"({time.time() - start:.0f}s)")
+            last = counts
+        time.sleep(config.SHARD_POLL_SECONDS)
+
+    for process in processes:
+        process.join()
+
+    results = queue.results(scan_id)
+    counts = queue.progress(scan_id)
+    telemetry.count('tickers_scanned', len(tickers))
+    telemetry.count('opportunities', len(results))
+    if exporter:
+        exporter.stop()
+    print(f"✅ Scan {scan_id} complete in {time.time() - start:.1f}s: "
+          f"{len(results)} results from {counts[DONE]} shards"
+          + (f", {counts[FAILED]} shards failed" if counts[FAILED] else ""))
+
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python distributed_scan.py coordinator [local_workers] [--provider module:function]
+    # python distributed_scan.py worker [--provider module:function]
+    args = sys.argv[1:]
+    provider = None
+    if '--provider' in args:
+        provider = args[args.index('--provider') + 1]
+        args = [a for a in args if a not in ('--provider', provider)]
+
+    if args and args[0] == 'worker':
+        done = run_worker(provider=provider, idle_exit=False)
+        print(f"Worker finished {done} shards")
+    else:
+        from day_trading_screener import DayTradingScreener
+
+        n_workers = int(args[1]) if len(args) > 1 else 0
+        universe = DayTradingScreener().get_stock_universe()
+        ranking = run_coordinator(universe, local_workers=n_workers, provider=provider)
+        print(ranking.head(config.TOP_N_STOCKS).to_string())
@@ -0,0 +1,173 @@
+"""
+Feature Store
+Persists ML feature rows per ticker so they are computed only for new bars
+"""
+
+import os
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+from bar_cache import FRAME_EXTENSION, read_frame, write_frame, safe_name
+
+
+LATEST_NAME = 'latest'  # Sidecar partition holding the most recent row
+
+
+class FeatureStore:
+    """
+    Per-ticker store of create_ml_features() rows, partitioned by day
+
+    Layout: <root>/features/<interval>/<TICKER>/<YYYY-MM-DD>.<ext>
+            <root>/features/<interval>/<TICKER>/latest.<ext>
+
+    update() only runs the feature function over the bars that are new since
+    the last stored row (plus a warmup window for the rolling features), and
+    re-computes the last stored row so its next-bar target gets filled in.
+    Only the day partitions the new rows fall in are rewritten, and the
+    one-row `latest` sidecar is what update() and latest() read, so the IO
+    per scan does not grow with the stored history.
+    """
+
+    def __init__(self, root: str = None):
+        """
+        Initialize the store
+
+        Args:
+            root: Cache directory (defaults to config.CACHE_DIRECTORY)
+        """
+        self.root = root or config.CACHE_DIRECTORY
+
+    def directory(self, ticker: str, interval: str = "5m") -> str:
+        return os.path.join(self.root, 'features', interval, safe_name(ticker))
+
+    def path(self, ticker: str, interval: str = "5m", day: str = LATEST_NAME) -> str:
+        """Path of one day partition (or of the `latest` sidecar)"""
+        return os.path.join(self.directory(ticker, interval), day + FRAME_EXTENSION)
+
+    def _migrate(self, ticker: str, interval: str):
+        """Split a single-file history from before day partitioning"""
+        legacy = self.directory(ticker, interval) + FRAME_EXTENSION
+        features = read_frame(legacy)
+        if features is not None:
+            if not features.empty:
+                self._write(ticker, features, interval)
+            os.remove(legacy)
+
+    def _write(self, ticker: str, rows: pd.DataFrame, interval: str):
+        """Merge rows into their day partitions and refresh the sidecar"""
+        for day, day_rows in rows.groupby(rows.index.strftime('%Y-%m-%d'), sort=True):
+            path = self.path(ticker, interval, day)
+            stored = read_frame(path)
+            if stored is not None:
+                day_rows = pd.concat([stored[stored.index < day_rows.index[0]], day_rows])
+            write_frame(path, day_rows)
+
+        latest = read_frame(self.path(ticker, interval))
+        if latest is None or rows.index[-1] >= latest.index[-1]:
+            write_frame(self.path(ticker, interval), rows.iloc[-1:])
+
+    def load(self, ticker: str, interval: str = "5m") -> Optional[pd.DataFrame]:
+        """
+        Load all stored feature rows for a ticker
+
+        Args:
+            ticker: Stock ticker symbol
+            interval: Bar interval
+
+        Returns:
+            DataFrame of feature rows (with 'target'), or None if not stored
+        """
+        self._migrate(ticker, interval)
+        directory = self.directory(ticker, interval)
+        if not os.path.isdir(directory):
+            return None
+
+        days = sorted(name for name in os.listdir(directory)
+                      if name.endswith(FRAME_EXTENSION) and
+                      not name.startswith(LATEST_NAME))
+        if not days:
+            return None
+        return pd.concat([read_frame(os.path.join(directory, day)) for day in days])
+
+    def update(self, ticker: str, df: pd.DataFrame,
+               feature_fn: Callable[[pd.DataFrame], pd.DataFrame],
+               warmup: int, interval: str = "5m") -> pd.DataFrame:
+        """
+        Compute features for bars not yet in the store and append them
+
+        Args:
+            ticker: Stock ticker symbol
+            df: Bars with indicator columns already computed
+            feature_fn: Function mapping indicator bars to feature rows
+                (AdvancedDayTradingScreener.create_ml_features)
+            warmup: Bars of history the feature function needs per row
+            interval: Bar interval
+
+        Returns:
+            The rows computed by this update, ending with the latest row
+            (just the stored latest row when there are no new bars)
+        """
+        self._migrate(ticker, interval)
+        latest = read_frame(self.path(ticker, interval))
+
+        if latest is None or latest.empty:
+            features = feature_fn(df)
+            if not features.empty:
+                self._write(ticker, features, interval)
+            return features
+
+        # Re-compute from the last stored bar so its target can be filled in
+        last_stored = latest.index[-1]
+        if df.index[-1] <= last_stored:
+            return latest
+
+        first_new = int(np.argmax(df.index >= last_stored))
+        start = max(0, first_new - warmup + 1)
+        computed = feature_fn(df.iloc[start:])
+        computed = computed[computed.index >= last_stored]
+        if not computed.empty:
+            self._write(ticker, computed, interval)
+
+        return computed
+
+    def latest(self, ticker: str, interval: str = "5m") -> Optional[pd.Series]:
+        """Return the most recent stored feature row for a ticker"""
+        self._migrate(ticker, interval)
+        latest = read_frame(self.path(ticker, interval))
+        if latest is None or latest.empty:
+            return None
+        return latest.iloc[-1]
+
+    def load_many(self, tickers: List[str] = None,
+                  interval: str = "5m") -> Dict[str, pd.DataFrame]:
+        """
+        Load stored features for many tickers (all stored tickers by default)
+
+        Args:
+            tickers: Stock ticker symbols
+            interval: Bar interval
+
+        Returns:
+            Dictionary of ticker -> feature DataFrame
+        """
+        tickers = tickers if tickers is not None else self.tickers(interval)
+        frames = {}
+        for ticker in tickers:
+            features = self.load(ticker, interval)
+            if features is not None and not features.empty:
+                frames[ticker] = features
+        return frames
+
+    def tickers(self, interval: str = "5m") -> List[str]:
+        """List tickers with stored features for an interval"""
+        directory = os.path.join(self.root, 'features', interval)
+        if not os.path.isdir(directory):
+            return []
+        # Ticker directories, plus single-file histories not yet migrated
+        return sorted({name[:-len(FRAME_EXTENSION)] if name.endswith(FRAME_EXTENSION) else name
+                       for name in os.listdir(directory)
+                       if name.endswith(FRAME_EXTENSION) or
+                       os.path.isdir(os.path.join(directory, name))})
@@ -0,0 +1,285 @@
+"""
+Metrics Export
+Scan telemetry in the Prometheus text exposition format, written for the
+node_exporter textfile collector or served on a local /metrics endpoint
+"""
+
+import math
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+import config
+from scan_telemetry import PERCENTILES, ScanTelemetry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# HELP text for the metrics the screeners record; others get a generic line
+HELP = {
+    'tickers_scanned': 'Tickers processed by scans',
+    'opportunities': 'Analyses that passed the screener filters',
+    'fetch_errors': 'Failed bar downloads by error type',
+    'analysis_errors': 'Tickers whose analysis raised, by error type',
+    'rate_limit_events': 'Rate-limit responses from the data provider',
+    'cache_hits': 'Cache lookups served from the cache',
+    'cache_misses': 'Cache lookups that had to fetch',
+    'cache_hit_ratio': 'Fraction of cache lookups served from the cache',
+    'queue_depth': 'Items waiting in a scan queue',
+    'shards': 'Distributed scan shards by status',
+}
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def _format_value(value) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    escape = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{_metric_name(k)}="{escape(v)}"' for k, v in labels) + '}'
+
+
+def cache_collector(name: str, cache) -> Callable[[ScanTelemetry], None]:
+    """
+    Collector for anything with `hits` and `misses` counts (BarCache,
+    SentimentCache); a None cache is skipped
+    """
+    def collect(telemetry: ScanTelemetry):
+        if cache is None:
+            return
+        lookups = cache.hits + cache.misses
+        telemetry.set_gauge('cache_hits', cache.hits, cache=name)
+        telemetry.set_gauge('cache_misses', cache.misses, cache=name)
+        telemetry.set_gauge('cache_hit_ratio', cache.hits / lookups if lookups else math.nan,
+                            cache=name)
+    return collect
+
+
+def pipeline_collector(pipeline) -> Callable[[ScanTelemetry], None]:
+    """Collector for the depth of a ScanPipeline's inter-stage queues"""
+    def collect(telemetry: ScanTelemetry):
+        for name, q in pipeline.queues.items():
+            telemetry.set_gauge('queue_depth', q.qsize(), queue=name)
+    return collect
+
+
+def shard_queue_collector(queue, scan_id: str) -> Callable[[ScanTelemetry], None]:
+    """Collector for a distributed scan's shard counts by status"""
+    def collect(telemetry: ScanTelemetry):
+        for status, count in queue.progress(scan_id).items():
+            telemetry.set_gauge('shards', count, status=status)
+    return collect
+
+
+def render(telemetry: ScanTelemetry, prefix: str = None) -> str:
+    """
+    Telemetry in the Prometheus text format
+
+    Counters are exported with a _total suffix, gauges as they are, stage
+    timings as one summary labelled by stage (ML inference time is the
+    ml_inference stage) and per-ticker latency as a second summary.
+    Counters restart from zero with each scan (ScanTelemetry.start()),
+    which rate() and increase() treat as a counter reset.
+
+    Args:
+        telemetry: ScanTelemetry to export
+        prefix: Metric name prefix (defaults to config.METRICS_PREFIX)
+
+    Returns:
+        Exposition text
+    """
+    prefix = _metric_name(prefix or config.METRICS_PREFIX)
+    summary = telemetry.summary()
+    counters, gauges = telemetry.series()
+
+    lines = []
+
+    def family(name: str, kind: str, samples: List[tuple], help_text: str = None):
+        """samples: (suffix, labels, value)"""
+        lines.append(f"# HELP {name} {help_text or name.replace('_', ' ')}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+    def grouped(series: dict) -> dict:
+        names = {}
+        for (name, labels), value in sorted(series.items()):
+            names.setdefault(name, []).append(('', labels, value))
+        return names
+
+    for name, samples in grouped(counters).items():
+        family(f"{prefix}_{_metric_name(name)}_total", 'counter', samples, HELP.get(name))
+    for name, samples in grouped(gauges).items():
+        family(f"{prefix}_{_metric_name(name)}", 'gauge', samples, HELP.get(name))
+
+    family(f"{prefix}_scan_tickers", 'gauge',
+           [('', (('state', 'done'),), summary['tickers_done']),
+            ('', (('state', 'total'),), summary['tickers_total'])],
+           'Tickers done and planned in the current scan')
+    family(f"{prefix}_scan_elapsed_seconds", 'gauge',
+           [('', (), summary['elapsed_seconds'])], 'Time since the current scan started')
+    eta = telemetry.eta()
+    family(f"{prefix}_scan_eta_seconds", 'gauge',
+           [('', (), math.nan if eta is None else eta)],
+           'Estimated time to finish the current scan')
+    family(f"{prefix}_scan_throughput_tickers_per_second", 'gauge',
+           [('', (), summary['tickers_per_second'] or 0)], 'Tickers per second this scan')
+
+    def quantiles(histogram: dict, labels: tuple) -> List[tuple]:
+        if not histogram.get('count'):
+            return []
+        samples = [('', labels + (('quantile', str(p / 100)),), histogram[f"p{p}"])
+                   for p in PERCENTILES]
+        return samples + [('_sum', labels, histogram['total']),
+                          ('_count', labels, histogram['count'])]
+
+    stage_samples = []
+    for stage, histogram in sorted(summary['stages'].items()):
+        stage_samples += quantiles(histogram, (('stage', stage),))
+    family(f"{prefix}_stage_duration_seconds", 'summary', stage_samples,
+           'Time spent per call of each scan stage')
+    family(f"{prefix}_ticker_duration_seconds", 'summary',
+           quantiles(summary['ticker_latency'], ()),
+           'End-to-end time per ticker in the current scan')
+
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.exporter.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    """
+    Publishes a ScanTelemetry in the Prometheus text format
+
+    Collectors are called before each render to refresh gauges that live
+    outside the telemetry (cache hit ratios, queue depths). In 'textfile'
+    mode a background thread rewrites the file every
+    METRICS_WRITE_SECONDS (atomically, as the textfile collector
+    requires); in 'http' mode /metrics is rendered per scrape.
+    """
+
+    def __init__(self, telemetry: ScanTelemetry, collectors: List[Callable] = None,
+                 mode: Optional[str] = 'config', path: str = None, host: str = None,
+                 port: int = None):
+        """
+        Initialize the exporter
+
+        Args:
+            telemetry: ScanTelemetry to export
+            collectors: Callables taking the telemetry and setting gauges
+            mode: 'textfile', 'http' or None to only render on demand
+                (defaults to config.METRICS_EXPORT)
+            path: Textfile path (defaults to config.METRICS_TEXTFILE_PATH)
+            host: HTTP bind address (defaults to config.METRICS_HOST)
+            port: HTTP port (defaults to config.METRICS_PORT; 0 picks a free port)
+        """
+        self.telemetry = telemetry
+        self.collectors = list(collectors or [])
+        self.mode = config.METRICS_EXPORT if mode == 'config' else mode
+        if self.mode not in (None, 'textfile', 'http'):
+            raise ValueError(f"Unknown metrics export '{self.mode}' (use textfile or http)")
+        self.path = path or config.METRICS_TEXTFILE_PATH
+        self.host = host or config.METRICS_HOST
+        self.port = config.METRICS_PORT if port is None else port
+        self.server = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_collector(self, collector: Callable):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """Run the collectors and render the exposition text"""
+        for collect in self.collectors:
+            try:
+                collect(self.telemetry)
+            except Exception as e:
+                self.telemetry.count('metrics_collector_errors', type=type(e).__name__)
+        return render(self.telemetry)
+
+    def write_textfile(self) -> str:
+        """Write the metrics to the textfile path via an atomic rename"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp, self.path)
+        return self.path
+
+    def _write_loop(self):
+        while not self._stop.wait(config.METRICS_WRITE_SECONDS):
+            try:
+                self.write_textfile()
+            except OSError as e:
+                print(f"⚠️  Metrics textfile write failed: {str(e)[:100]}")
+
+    def start(self) -> 'MetricsExporter':
+        """Start the textfile writer or the HTTP endpoint (per mode)"""
+        if self.mode == 'textfile':
+            self._thread = threading.Thread(target=self._write_loop, name="metrics-writer",
+                                            daemon=True)
+            self._thread.start()
+        elif self.mode == 'http':
+            self.server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+            self.server.daemon_threads = True
+            self.server.exporter = self
+            self._thread = threading.Thread(target=self.server.serve_forever,
+                                            name="metrics-http", daemon=True)
+            self._thread.start()
+            host, port = self.server.server_address[:2]
+            print(f"📊 Metrics on http://{host}:{port}/metrics")
+        return self
+
+    def stop(self):
+        """Stop publishing; textfile mode writes the final values first"""
+        self._stop.set()
+        if self.mode == 'textfile':
+            self.write_textfile()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def start_metrics_export(telemetry: ScanTelemetry,
+                         collectors: List[Callable] = None) -> Optional[MetricsExporter]:
+    """
+    Start an exporter when config.METRICS_EXPORT is set
+
+    Args:
+        telemetry: ScanTelemetry to export
+        collectors: Extra gauge collectors
+
+    Returns:
+        The running exporter, or None when metrics export is off
+    """
+    if not config.METRICS_EXPORT:
+        return None
+    return MetricsExporter(telemetry, collectors).start()
@@ -0,0 +1,257 @@
+"""
+ML Training
+Universe-wide training dataset builder and parallel model fitting
+"""
+
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import config
+from feature_store import FeatureStore
+
+
+def build_training_dataset(feature_store: FeatureStore = None,
+                           tickers: List[str] = None,
+                           feature_names: List[str] = None,
+                           interval: str = "5m",
+                           out_dir: str = None,
+                           since: pd.Timestamp = None) -> Dict:
+    """
+    Stream stored feature rows for many tickers into one float32 matrix
+
+    Runs two passes over the feature store: the first counts usable rows so
+    the matrix can be allocated once, the second fills it ticker by ticker.
+    Only one ticker's features are held as a DataFrame at a time. With
+    `out_dir`, the matrix is written to a memory-mapped .npy file that can
+    be reopened later without rebuilding.
+
+    Args:
+        feature_store: Feature store to read (defaults to config.CACHE_DIRECTORY)
+        tickers: Tickers to include (all stored tickers by default)
+        feature_names: Feature columns, in model order (defaults to the
+            columns of the first stored ticker)
+        interval: Bar interval
+        out_dir: Optional directory for memory-mapped X.npy / y.npy
+        since: Only include rows strictly after this timestamp
+
+    Returns:
+        Dictionary with X (float32), y (int8), index (ticker, time),
+        feature_names
+    """
+    feature_store = feature_store or FeatureStore()
+    tickers = tickers if tickers is not None else feature_store.tickers(interval)
+    since = pd.Timestamp(since) if since is not None else None
+
+    # Pass 1: count complete rows per ticker
+    counts = {}
+    for ticker in tickers:
+        features = feature_store.load(ticker, interval)
+        if features is not None and since is not None:
+            features = features[features.index > since]
+        if features is None or features.empty:
+            continue
+        if feature_names is None:
+            feature_names = [c for c in features.columns if c != 'target']
+        if not set(feature_names).issubset(features.columns):
+            print(f"⚠️  Skipping {ticker}: stored features do not match the schema")
+            continue
+        n_rows = int(features[feature_names + ['target']].notna().all(axis=1).sum())
+        if n_rows:
+            counts[ticker] = n_rows
+
+    n_total = sum(counts.values())
+    n_features = len(feature_names or [])
+
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        X = np.lib.format.open_memmap(os.path.join(out_dir, 'X.npy'), mode='w+',
+                                      dtype=np.float32, shape=(n_total, n_features))
+        y = np.lib.format.open_memmap(os.path.join(out_dir, 'y.npy'), mode='w+',
+                                      dtype=np.int8, shape=(n_total,))
+    else:
+        X = np.empty((n_total, n_features), dtype=np.float32)
+        y = np.empty(n_total, dtype=np.int8)
+    ticker_codes = np.empty(n_total, dtype=np.int32)
+    timestamps = np.empty(n_total, dtype='datetime64[ns]')
+
+    # Pass 2: fill the preallocated arrays
+    included = list(counts)
+    offset = 0
+    for code, ticker in enumerate(included):
+        features = feature_store.load(ticker, interval)
+        if since is not None:
+            features = features[features.index > since]
+        features = features[feature_names + ['target']].dropna()
+        n_rows = len(features)
+
+        X[offset:offset + n_rows] = features[feature_names].to_numpy(dtype=np.float32)
+        y[offset:offset + n_rows] = (features['target'].to_numpy() > 0)
+        ticker_codes[offset:offset + n_rows] = code
+        times = pd.DatetimeIndex(features.index)
+        if times.tz is not None:
+            times = times.tz_convert('UTC').tz_localize(None)
+        timestamps[offset:offset + n_rows] = times.to_numpy()
+        offset += n_rows
+
+    index = pd.MultiIndex.from_arrays(
+        [pd.Categorical.from_codes(ticker_codes, categories=included),
+         pd.DatetimeIndex(timestamps, tz='UTC')],
+        names=['ticker', 'time']
+    )
+
+    if out_dir:
+        X.flush()
+        y.flush()
+        pd.DataFrame({'ticker_code': ticker_codes, 'time': timestamps}).to_pickle(
+            os.path.join(out_dir, 'index.pkl'))
+        pd.Series(included).to_pickle(os.path.join(out_dir, 'tickers.pkl'))
+        pd.Series(feature_names or []).to_pickle(os.path.join(out_dir, 'feature_names.pkl'))
+
+    print(f"✅ Training dataset: {n_total:,} rows x {n_features} features "
+          f"from {len(included)} tickers ({X.nbytes / 1e6:.1f} MB)")
+
+    return {'X': X, 'y': y, 'index': index, 'feature_names': feature_names or []}
+
+
+def load_training_dataset(out_dir: str) -> Dict:
+    """
+    Reopen a dataset written by build_training_dataset(out_dir=...)
+
+    The matrix is memory-mapped read-only, so reopening is near-instant.
+
+    Args:
+        out_dir: Dataset directory
+
+    Returns:
+        Dictionary with X, y, index, feature_names
+    """
+    X = np.load(os.path.join(out_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(out_dir, 'y.npy'), mmap_mode='r')
+    index_df = pd.read_pickle(os.path.join(out_dir, 'index.pkl'))
+    tickers = pd.read_pickle(os.path.join(out_dir, 'tickers.pkl')).tolist()
+    feature_names = pd.read_pickle(os.path.join(out_dir, 'feature_names.pkl')).tolist()
+
+    index = pd.MultiIndex.from_arrays(
+        [pd.Categorical.from_codes(index_df['ticker_code'].to_numpy(), categories=tickers),
+         pd.DatetimeIndex(index_df['time'], tz='UTC')],
+        names=['ticker', 'time']
+    )
+
+    return {'X': X, 'y': y, 'index': index, 'feature_names': feature_names}
+
+
+def time_split(index: pd.MultiIndex, test_size: float = None) -> tuple:
+    """
+    Split rows into train/test by a single time cutoff (no shuffling)
+
+    Args:
+        index: Dataset (ticker, time) index
+        test_size: Fraction of the time range held out at the end
+
+    Returns:
+        Tuple of (train row indices, test row indices)
+    """
+    test_size = config.ML_TEST_SIZE if test_size is None else test_size
+    times = index.get_level_values('time').asi8
+    cutoff = np.quantile(times, 1 - test_size)
+
+    return np.flatnonzero(times < cutoff), np.flatnonzero(times >= cutoff)
+
+
+def train_universe_model(dataset: Dict, n_jobs: int = None,
+                         max_samples: float = None) -> Dict:
+    """
+    Fit the screener's RandomForest on a universe-wide dataset using all cores
+
+    Memory stays bounded: the float32 matrix is never up-cast, and
+    `max_samples` caps the bootstrap sample each tree is grown on.
+
+    Args:
+        dataset: Output of build_training_dataset() / load_training_dataset()
+        n_jobs: Parallel tree-building jobs (-1 = all cores)
+        max_samples: Fraction of rows drawn per tree (None = all rows)
+
+    Returns:
+        Dictionary with model, scaler, feature_names, training_window, metrics
+    """
+    n_jobs = config.ML_N_JOBS if n_jobs is None else n_jobs
+    max_samples = config.ML_MAX_SAMPLES if max_samples is None else max_samples
+
+    X, y, index = dataset['X'], dataset['y'], dataset['index']
+    if len(X) < config.ML_MIN_TRAINING_SAMPLES:
+        raise ValueError(f"Not enough data to train ML model ({len(X)} rows)")
+
+    train_idx, test_idx = time_split(index)
+
+    start = time.time()
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_idx]).astype(np.float32, copy=False)
+
+    model = RandomForestClassifier(
+        n_estimators=config.ML_N_ESTIMATORS,
+        max_depth=config.ML_MAX_DEPTH,
+        max_samples=max_samples,
+        n_jobs=n_jobs,
+        random_state=config.ML_RANDOM_STATE
+    )
+    model.fit(X_train, y[train_idx])
+    train_score = model.score(X_train, y[train_idx])
+    del X_train
+
+    X_test = scaler.transform(X[test_idx]).astype(np.float32, copy=False)
+    test_score = model.score(X_test, y[test_idx]) if len(test_idx) else float('nan')
+    fit_seconds = time.time() - start
+
+    times = index.get_level_values('time')
+    training_window = {
+        'start': str(times.min()),
+        'end': str(times.max()),
+        'test_start': str(times[test_idx].min()) if len(test_idx) else None,
+        'n_samples': int(len(X)),
+        'n_tickers': int(index.get_level_values('ticker').nunique()),
+    }
+    metrics = {
+        'train_accuracy': round(float(train_score), 4),
+        'test_accuracy': round(float(test_score), 4),
+        'fit_seconds': round(fit_seconds, 1),
+    }
+
+    print(f"ML Model trained on {len(train_idx):,} rows in {fit_seconds:.1f}s - "
+          f"Train accuracy: {train_score:.3f}, Test accuracy: {test_score:.3f}")
+
+    return {
+        'model': model,
+        'scaler': scaler,
+        'feature_names': dataset['feature_names'],
+        'training_window': training_window,
+        'metrics': metrics,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    from advanced_screener import AdvancedDayTradingScreener
+
+    screener = AdvancedDayTradingScreener(use_ml=True, feature_store=FeatureStore())
+
+    # --online: add trees for the newest bars, full refit only on drift
+    if len(sys.argv) > 1 and sys.argv[1] == '--online' and screener.load_ml_model():
+        stats = screener.update_ml_model_online()
+        if stats['needs_full_refit']:
+            print("⚠️  Drift detected - running a full refit")
+            screener.train_ml_model_universe()
+    else:
+        # Full retraining: every ticker in the feature store, including
+        # the archived history when the bar archive is enabled
+        if config.ARCHIVE_BARS:
+            from bar_archive import BarArchive
+            screener.backfill_feature_store(BarArchive())
+        screener.train_ml_model_universe()
+
+    screener.save_ml_model()
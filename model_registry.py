@@ -0,0 +1,166 @@
+"""
+Model Registry
+Versioned on-disk storage for the advanced screener's ML model
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List
+
+import joblib
+
+import config
+
+
+class SchemaMismatchError(ValueError):
+    """Raised when a stored model was trained on a different feature schema"""
+
+
+def schema_hash(feature_names: List[str]) -> str:
+    """Stable hash of an ordered list of feature names"""
+    return hashlib.sha256("\n".join(feature_names).encode()).hexdigest()
+
+
+class ModelRegistry:
+    """
+    Saves fitted model + scaler pairs with their metadata and loads them back
+
+    Layout:
+        <root>/<version>/model.joblib
+        <root>/<version>/scaler.joblib
+        <root>/<version>/metadata.json
+        <root>/LATEST                   (name of the newest version)
+
+    Artifacts are stored uncompressed so they can be loaded memory-mapped.
+    """
+
+    def __init__(self, root: str = None):
+        """
+        Initialize the registry
+
+        Args:
+            root: Registry directory (defaults to config.MODEL_REGISTRY_DIR)
+        """
+        self.root = root or config.MODEL_REGISTRY_DIR
+
+    def _version_dir(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def save(self, model, scaler, feature_names: List[str],
+             training_window: Dict = None, metrics: Dict = None,
+             drift: Dict = None) -> str:
+        """
+        Store a fitted model and scaler as a new version
+
+        Args:
+            model: Fitted classifier
+            scaler: Fitted feature scaler
+            feature_names: Ordered feature columns the model was trained on
+            training_window: Dict describing the training data (start, end, ...)
+            metrics: Evaluation metrics (accuracy, ...)
+            drift: Drift monitor window carried between online updates
+
+        Returns:
+            Version identifier
+        """
+        feature_hash = schema_hash(feature_names)
+        base = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{feature_hash[:8]}"
+        version, suffix = base, 1
+        # Never overwrite an existing version: it may be memory-mapped by a
+        # running process
+        while os.path.exists(self._version_dir(version)):
+            suffix += 1
+            version = f"{base}_{suffix}"
+        version_dir = self._version_dir(version)
+        os.makedirs(version_dir)
+
+        joblib.dump(model, os.path.join(version_dir, 'model.joblib'))
+        joblib.dump(scaler, os.path.join(version_dir, 'scaler.joblib'))
+
+        metadata = {
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'model_type': type(model).__name__,
+            'feature_names': list(feature_names),
+            'feature_schema_hash': feature_hash,
+            'training_window': training_window or {},
+            'metrics': metrics or {},
+        }
+        if drift:
+            metadata['drift'] = drift
+        with open(os.path.join(version_dir, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2, default=str)
+
+        with open(os.path.join(self.root, 'LATEST'), 'w') as f:
+            f.write(version)
+
+        return version
+
+    def list_versions(self) -> List[Dict]:
+        """
+        List stored versions, oldest first
+
+        Returns:
+            List of metadata dictionaries
+        """
+        if not os.path.isdir(self.root):
+            return []
+
+        versions = []
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name, 'metadata.json')
+            if os.path.isfile(path):
+                with open(path) as f:
+                    versions.append(json.load(f))
+
+        return versions
+
+    def latest_version(self) -> str:
+        """Return the newest version, or None if the registry is empty"""
+        path = os.path.join(self.root, 'LATEST')
+        if os.path.isfile(path):
+            with open(path) as f:
+                return f.read().strip() or None
+
+        versions = self.list_versions()
+        return versions[-1]['version'] if versions else None
+
+    def load(self, version: str = None, feature_names: List[str] = None) -> Dict:
+        """
+        Load a stored model, scaler and metadata
+
+        Args:
+            version: Version to load (defaults to the latest)
+            feature_names: Expected feature schema; loading is refused if the
+                stored model was trained on a different one
+
+        Returns:
+            Dictionary with 'model', 'scaler' and 'metadata'
+        """
+        version = version or self.latest_version()
+        if version is None:
+            raise FileNotFoundError(f"No models registered in {self.root}")
+
+        version_dir = self._version_dir(version)
+        if not os.path.isfile(os.path.join(version_dir, 'metadata.json')):
+            raise FileNotFoundError(f"Model version {version} not found in {self.root}")
+        with open(os.path.join(version_dir, 'metadata.json')) as f:
+            metadata = json.load(f)
+
+        if feature_names is not None and \
+                metadata['feature_schema_hash'] != schema_hash(feature_names):
+            stored = set(metadata['feature_names'])
+            expected = set(feature_names)
+            raise SchemaMismatchError(
+                f"Model {version} feature schema does not match "
+                f"(missing: {sorted(expected - stored)}, "
+                f"unexpected: {sorted(stored - expected)})"
+            )
+
+        # Memory-map the fitted arrays instead of copying them into memory
+        model = joblib.load(os.path.join(version_dir, 'model.joblib'), mmap_mode='r')
+        scaler = joblib.load(os.path.join(version_dir, 'scaler.joblib'), mmap_mode='r')
+
+        return {'model': model, 'scaler': scaler, 'metadata': metadata}
@@ -0,0 +1,165 @@
+"""
+Online Learning
+Incremental updates for the screener's RandomForest and a drift monitor
+that decides when a full refit is needed
+"""
+
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+import config
+
+
+class DriftMonitor:
+    """
+    Tracks model accuracy and feature distribution shift on new data
+
+    Accuracy is measured prequentially: each batch is scored by the model
+    *before* the model is updated with it. Feature shift is the mean absolute
+    shift of the batch's feature means, in units of the training scaler's
+    standard deviation.
+
+    Each online update usually runs in a new process, so the window is
+    carried between runs with state() / restore() (stored in the model's
+    registry metadata).
+    """
+
+    def __init__(self, baseline_accuracy: float, scaler,
+                 window: int = None, accuracy_drop: float = None,
+                 feature_shift: float = None):
+        """
+        Initialize the monitor
+
+        Args:
+            baseline_accuracy: Holdout accuracy of the fully trained model
+            scaler: Fitted scaler holding the training feature means/scales
+            window: Number of recent batches to average over
+            accuracy_drop: Accuracy drop (vs. baseline) that triggers a refit
+            feature_shift: Mean standardized feature shift that triggers a refit
+        """
+        self.baseline_accuracy = baseline_accuracy
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.accuracy_drop = config.DRIFT_ACCURACY_DROP if accuracy_drop is None else accuracy_drop
+        self.feature_shift = config.DRIFT_FEATURE_SHIFT if feature_shift is None else feature_shift
+
+        window = window or config.DRIFT_WINDOW_BATCHES
+        self.accuracies = deque(maxlen=window)
+        self.shifts = deque(maxlen=window)
+
+    def observe(self, X: np.ndarray, y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
+        """
+        Record one batch of newly labeled data
+
+        Args:
+            X: Unscaled feature matrix of the batch
+            y_true: True labels
+            y_pred: Labels predicted before the model saw the batch
+
+        Returns:
+            Dictionary with the batch accuracy and feature shift
+        """
+        accuracy = float(np.mean(y_true == y_pred))
+        shift = float(np.mean(np.abs(X.mean(axis=0) - self.mean) / self.scale))
+
+        self.accuracies.append(accuracy)
+        self.shifts.append(shift)
+
+        return {'batch_accuracy': round(accuracy, 4), 'feature_shift': round(shift, 4)}
+
+    def state(self) -> Dict:
+        """Baseline and recent batches, JSON-serializable"""
+        return {'baseline_accuracy': self.baseline_accuracy,
+                'accuracies': list(self.accuracies),
+                'shifts': list(self.shifts)}
+
+    def restore(self, state: Dict):
+        """Reload a window saved by state() (the newest batches if it is longer)"""
+        self.baseline_accuracy = state.get('baseline_accuracy', self.baseline_accuracy)
+        self.accuracies.extend(state.get('accuracies', []))
+        self.shifts.extend(state.get('shifts', []))
+
+    def needs_full_refit(self) -> bool:
+        """True when recent accuracy or feature drift crosses the thresholds"""
+        if not self.accuracies:
+            return False
+
+        recent_accuracy = float(np.mean(self.accuracies))
+        recent_shift = float(np.mean(self.shifts))
+
+        return (recent_accuracy < self.baseline_accuracy - self.accuracy_drop or
+                recent_shift > self.feature_shift)
+
+
+class OnlineModelUpdater:
+    """
+    Grows a fitted RandomForest with extra trees trained on new bars only
+
+    The scaler stays frozen so existing trees keep seeing the same feature
+    space. Each update warm-starts the forest with `trees_per_update` new
+    trees, and the oldest trees are dropped once the forest exceeds
+    `max_trees`, so the ensemble tracks recent data at constant size.
+    """
+
+    def __init__(self, model, scaler, baseline_accuracy: float = 0.5,
+                 trees_per_update: int = None, max_trees: int = None,
+                 drift_state: Dict = None):
+        """
+        Initialize the updater
+
+        Args:
+            model: Fitted RandomForestClassifier
+            scaler: Fitted scaler used when the model was trained
+            baseline_accuracy: Holdout accuracy of the fully trained model
+            trees_per_update: Trees added per update
+            max_trees: Maximum forest size (oldest trees are dropped)
+            drift_state: DriftMonitor.state() saved by a previous run
+        """
+        self.model = model
+        self.scaler = scaler
+        self.trees_per_update = trees_per_update or config.ML_ONLINE_TREES_PER_UPDATE
+        self.max_trees = max_trees or config.ML_ONLINE_MAX_TREES
+        self.drift_monitor = DriftMonitor(baseline_accuracy, scaler)
+        if drift_state:
+            self.drift_monitor.restore(drift_state)
+        self.updates = 0
+
+    def update(self, X: np.ndarray, y: np.ndarray) -> Dict:
+        """
+        Score the new batch, then add trees fitted on it
+
+        Args:
+            X: Unscaled feature matrix of newly labeled bars
+            y: Binary labels (1 = next bar up)
+
+        Returns:
+            Dictionary with drift stats, forest size and refit recommendation
+        """
+        if len(X) == 0:
+            return {'rows': 0, 'n_trees': len(self.model.estimators_),
+                    'needs_full_refit': self.drift_monitor.needs_full_refit()}
+
+        X_scaled = self.scaler.transform(X).astype(np.float32, copy=False)
+        stats = self.drift_monitor.observe(X, y, self.model.predict(X_scaled))
+
+        # A single-class batch would reset the forest's classes_; score only
+        if len(np.unique(y)) == len(self.model.classes_):
+            self.model.warm_start = True
+            self.model.n_estimators = len(self.model.estimators_) + self.trees_per_update
+            self.model.fit(X_scaled, y)
+
+            if len(self.model.estimators_) > self.max_trees:
+                self.model.estimators_ = self.model.estimators_[-self.max_trees:]
+                self.model.n_estimators = self.max_trees
+
+            self.updates += 1
+
+        stats.update({
+            'rows': int(len(X)),
+            'n_trees': len(self.model.estimators_),
+            'needs_full_refit': self.drift_monitor.needs_full_refit(),
+        })
+
+        return stats
@@ -0,0 +1,197 @@
+"""
+Parallel Analysis
+Runs the indicator/signal stage for many tickers on a process pool, with
+bars passed through shared memory instead of pickled DataFrames
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator
+
+import pandas as pd
+
+import config
+from bar_panel import SharedBarPanel
+
+# Per-process state, set once by the pool initializer
+_WORKER_PANEL = None
+_WORKER_SCREENER = None
+_WORKER_FEATURES = None
+_WORKER_REFERENCE = None
+
+
+def _init_worker(panel_handle: Dict, screener_kwargs: Dict, with_features: bool,
+                 reference: Dict = None):
+    """Attach the bar panel (if any) and build a screener once per worker process"""
+    global _WORKER_PANEL, _WORKER_SCREENER, _WORKER_FEATURES, _WORKER_REFERENCE
+    from day_trading_screener import DayTradingScreener
+
+    if panel_handle is not None:
+        _WORKER_PANEL = SharedBarPanel.attach(panel_handle)
+    _WORKER_SCREENER = DayTradingScreener(**screener_kwargs)
+
+    if with_features:
+        from advanced_screener import AdvancedDayTradingScreener
+        _WORKER_FEATURES = AdvancedDayTradingScreener(use_ml=False)
+        _WORKER_REFERENCE = reference
+
+
+def _analyze(panel: SharedBarPanel, ticker: str) -> Dict:
+    """Indicators, signals and (optionally) ML features for one ticker"""
+    # Indicator columns are added to this frame; the OHLCV columns stay
+    # views of the read-only panel
+    df = panel.frame(ticker)
+
+    analysis = _WORKER_SCREENER.analyze_bars(ticker, df)
+    if analysis is None or _WORKER_FEATURES is None:
+        return analysis
+
+    indicators = _WORKER_FEATURES.calculate_advanced_indicators(panel.frame(ticker))
+    analysis['ml_features'] = _WORKER_FEATURES.latest_ml_features(indicators, ticker,
+                                                                  _WORKER_REFERENCE)
+    return analysis
+
+
+def _analyze_ticker(ticker: str) -> Dict:
+    """Analyze a ticker of the panel attached at worker start"""
+    return _analyze(_WORKER_PANEL, ticker)
+
+
+def _analyze_own_panel(panel_handle: Dict, ticker: str) -> Dict:
+    """Analyze a ticker packed into its own panel (AnalysisPool.submit)"""
+    panel = SharedBarPanel.attach(panel_handle)
+    try:
+        return _analyze(panel, ticker)
+    finally:
+        panel.close()
+
+
+def analyze_bars_parallel(bars, n_workers: int = None,
+                          screener_kwargs: Dict = None,
+                          with_features: bool = False,
+                          reference: Dict = None) -> Iterator[Dict]:
+    """
+    Analyze many tickers' bars on a process pool
+
+    Bars live in a SharedBarPanel; workers attach to it once and each task
+    only sends a ticker symbol, so no DataFrame is pickled on the way in.
+    Results are yielded as workers finish them, not in input order.
+
+    Args:
+        bars: Dictionary of ticker -> OHLCV DataFrame (packed into a
+            temporary panel), or an existing SharedBarPanel
+        n_workers: Worker processes (defaults to config.CPU_WORKERS)
+        screener_kwargs: DayTradingScreener arguments (price/volume filters)
+        with_features: Also attach the advanced screener's latest ML feature
+            vector as 'ml_features'
+        reference: Benchmark/sector ETF bars for the relative strength
+            features (sent to each worker once)
+
+    Yields:
+        Analysis dictionaries from DayTradingScreener.analyze_bars()
+    """
+    n_workers = n_workers or config.CPU_WORKERS or os.cpu_count()
+    owns_panel = not isinstance(bars, SharedBarPanel)
+    panel = SharedBarPanel.create(bars) if owns_panel else bars
+
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(panel.handle, screener_kwargs or {},
+                                           with_features, reference)) as pool:
+            futures = {pool.submit(_analyze_ticker, t): t for t in panel.tickers}
+            for future in as_completed(futures):
+                try:
+                    analysis = future.result()
+                except Exception as e:
+                    print(f"⚠️  Analysis failed for {futures[future]}: {str(e)[:100]}")
+                    continue
+                if analysis:
+                    yield analysis
+    finally:
+        if owns_panel:
+            panel.unlink()
+
+
+class AnalysisPool:
+    """
+    Process pool that analyzes each ticker as soon as its bars arrive
+
+    analyze_bars_parallel() needs every ticker's bars up front; this pool
+    lets a fetch loop submit() each ticker right after its download, so the
+    CPU stage runs while later tickers are still being fetched. Each
+    submission packs its bars into a small shared memory panel of its own
+    (still no pickled DataFrame), unlinked once the result is back.
+    """
+
+    def __init__(self, n_workers: int = None, screener_kwargs: Dict = None,
+                 with_features: bool = False, reference: Dict = None):
+        """
+        Start the worker processes
+
+        Args:
+            n_workers: Worker processes (defaults to config.CPU_WORKERS)
+            screener_kwargs: DayTradingScreener arguments (price/volume filters)
+            with_features: Also attach the advanced screener's latest ML
+                feature vector as 'ml_features'
+            reference: Benchmark/sector ETF bars for the relative strength
+                features (sent to each worker once)
+        """
+        n_workers = n_workers or config.CPU_WORKERS or os.cpu_count()
+        self.pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                        initargs=(None, screener_kwargs or {}, with_features,
+                                                  reference))
+        self.futures = {}  # future -> (ticker, panel)
+
+    def submit(self, ticker: str, df: pd.DataFrame) -> bool:
+        """
+        Queue one ticker's bars for analysis
+
+        Args:
+            ticker: Stock ticker symbol
+            df: OHLCV DataFrame; None or empty (a failed fetch) is skipped
+
+        Returns:
+            Whether the ticker was queued
+        """
+        if df is None or df.empty:
+            return False
+        panel = SharedBarPanel.create({ticker: df})
+        try:
+            future = self.pool.submit(_analyze_own_panel, panel.handle, ticker)
+        except Exception:
+            panel.unlink()
+            raise
+        self.futures[future] = (ticker, panel)
+        return True
+
+    def results(self) -> Iterator[Dict]:
+        """
+        Wait for everything submitted so far
+
+        Yields:
+            Analysis dictionaries, in completion order
+        """
+        futures, self.futures = self.futures, {}
+        for future in as_completed(futures):
+            ticker, panel = futures[future]
+            panel.unlink()
+            try:
+                analysis = future.result()
+            except Exception as e:
+                print(f"⚠️  Analysis failed for {ticker}: {str(e)[:100]}")
+                continue
+            if analysis:
+                yield analysis
+
+    def close(self):
+        """Stop the workers and free any panels still outstanding"""
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        for _, panel in self.futures.values():
+            panel.unlink()
+        self.futures = {}
+
+    def __enter__(self) -> 'AnalysisPool':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,185 @@
+"""
+Parameter Sweep
+Grid or random search over scoring thresholds, backtested on cached bars
+"""
+
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import pandas as pd
+
+import config
+from backtest import max_drawdown, simulate_trades
+from bar_cache import BarCache
+from day_trading_screener import DayTradingScreener
+from vectorized_scoring import SCORING_PARAMS, score_bars
+
+# Parameters passed to simulate_trades rather than score_bars
+TRADE_PARAMS = ['min_confidence', 'stop_loss', 'max_daily_trades', 'hold_bars']
+
+# Per-process indicator frames, set once by the pool initializer
+_WORKER_INDICATORS = None
+
+
+def _check_keys(keys) -> None:
+    unknown = set(keys) - set(SCORING_PARAMS) - set(TRADE_PARAMS)
+    if unknown:
+        raise ValueError(f"Cannot sweep {sorted(unknown)}: only scoring and trade "
+                         f"parameters are supported ({SCORING_PARAMS + TRADE_PARAMS})")
+
+
+def grid_search_params(grid: Dict[str, List]) -> List[Dict]:
+    """
+    Expand a parameter grid into every combination
+
+    Args:
+        grid: Dictionary of parameter name -> list of values
+
+    Returns:
+        List of parameter sets
+    """
+    _check_keys(grid)
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def random_search_params(space: Dict, n_samples: int, seed: int = None) -> List[Dict]:
+    """
+    Draw random parameter sets
+
+    Args:
+        space: Dictionary of parameter name -> list of choices, or a
+            (low, high) tuple sampled uniformly (integers if both are ints)
+        n_samples: Number of parameter sets to draw
+        seed: Random seed
+
+    Returns:
+        List of parameter sets
+    """
+    _check_keys(space)
+    rng = random.Random(seed)
+
+    def draw(values):
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return round(rng.uniform(low, high), 4)
+        return rng.choice(values)
+
+    return [{name: draw(values) for name, values in space.items()}
+            for _ in range(n_samples)]
+
+
+def _init_worker(indicators: Dict[str, pd.DataFrame]):
+    """Receive the precomputed indicator frames once per worker process"""
+    global _WORKER_INDICATORS
+    _WORKER_INDICATORS = indicators
+
+
+def _evaluate(params: Dict) -> Dict:
+    """Backtest one parameter set against the worker's indicator frames"""
+    scoring = {k: v for k, v in params.items() if k in SCORING_PARAMS}
+    trade_options = {k: v for k, v in params.items() if k in TRADE_PARAMS}
+
+    all_trades = []
+    for ticker, df in _WORKER_INDICATORS.items():
+        trades = simulate_trades(df, score_bars(df, scoring), **trade_options)
+        if not trades.empty:
+            all_trades.append(trades)
+
+    result = dict(params)
+    if not all_trades:
+        result['trades'] = 0
+        return result
+
+    returns = pd.concat(all_trades).sort_values('entry_time')['return_pct']
+    losses = -returns[returns < 0].sum()
+    result.update({
+        'trades': len(returns),
+        'hit_rate': round((returns > 0).mean() * 100, 2),
+        'expectancy_pct': round(returns.mean(), 4),
+        'total_return_pct': round(returns.sum(), 3),
+        'max_drawdown_pct': round(max_drawdown(returns), 3),
+        'profit_factor': round(returns[returns > 0].sum() / losses, 3) if losses else None,
+    })
+
+    return result
+
+
+def run_sweep(param_sets: List[Dict], bars: Dict[str, pd.DataFrame] = None,
+              tickers: List[str] = None, bar_cache: BarCache = None,
+              interval: str = "5m", n_workers: int = None,
+              rank_by: str = 'expectancy_pct', min_trades: int = 20) -> pd.DataFrame:
+    """
+    Backtest many parameter sets over the same historical bars
+
+    Indicators don't depend on any sweepable parameter, so they are computed
+    once per ticker in this process and shipped to each worker once; every
+    parameter set then only re-runs signal scoring and trade simulation.
+
+    Args:
+        param_sets: Parameter sets from grid_search_params/random_search_params
+        bars: Dictionary of ticker -> OHLCV bars (read from the bar cache if omitted)
+        tickers: Tickers to load from the bar cache (all cached by default)
+        bar_cache: Bar cache to replay (defaults to config.CACHE_DIRECTORY)
+        interval: Bar interval to load from the cache
+        n_workers: Worker processes (defaults to config.SWEEP_WORKERS)
+        rank_by: Metric column to rank by (descending)
+        min_trades: Parameter sets with fewer trades are ranked last
+
+    Returns:
+        DataFrame with one row per parameter set, best first
+    """
+    for params in param_sets:
+        _check_keys(params)
+
+    if bars is None:
+        bar_cache = bar_cache or BarCache()
+        tickers = tickers if tickers is not None else bar_cache.tickers(interval)
+        bars = {t: bar_cache.load(t, interval) for t in tickers}
+
+    screener = DayTradingScreener()
+    indicators = {ticker: screener.calculate_technical_indicators(df.copy())
+                  for ticker, df in bars.items() if df is not None and len(df) >= 50}
+
+    n_workers = n_workers or config.SWEEP_WORKERS or os.cpu_count()
+    print(f"Sweeping {len(param_sets)} parameter sets over {len(indicators)} tickers, "
+          f"{n_workers} workers...")
+
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(indicators,)) as pool:
+        chunksize = max(1, len(param_sets) // (n_workers * 4))
+        results = list(pool.map(_evaluate, param_sets, chunksize=chunksize))
+
+    table = pd.DataFrame(results)
+    if rank_by in table.columns:
+        table['eligible'] = table['trades'] >= min_trades
+        table = table.sort_values(['eligible', rank_by], ascending=False, na_position='last')
+        table = table.drop(columns='eligible')
+    table = table.reset_index(drop=True)
+    table.index += 1
+    table.index.name = 'rank'
+
+    print(f"✅ Sweep complete in {time.time() - start:.1f}s")
+
+    return table
+
+
+if __name__ == "__main__":
+    grid = {
+        'rsi_oversold': [25, 30, 35],
+        'rsi_overbought': [65, 70, 75],
+        'high_volume_threshold': [1.3, 1.5, 2.0],
+        'min_confidence': [50, 60, 70],
+    }
+    ranked = run_sweep(grid_search_params(grid))
+
+    print("\nTOP PARAMETER SETS")
+    print("-" * 80)
+    print(ranked.head(20).to_string())
@@ -0,0 +1,158 @@
+"""
+Portfolio Stage
+Sizes every scored candidate with array operations and selects the day's
+trades under the trade-count, risk and capital limits
+"""
+
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+import config
+
+ORDER_COLUMNS = ['ticker', 'side', 'shares', 'entry_price', 'stop_price', 'target_price',
+                 'stop_distance', 'risk_dollars', 'notional', 'confidence_score',
+                 'trade_direction']
+
+
+def size_positions(candidates: Union[pd.DataFrame, List[Dict]], account_value: float = None,
+                   min_confidence: float = None) -> pd.DataFrame:
+    """
+    Stop distances and share counts for every candidate at once
+
+    The stop is ATR_STOP_MULTIPLE x ATR away from the entry (the
+    STOP_LOSS_PERCENTAGE of the price when a candidate has no ATR). Shares
+    are the fewer of what MAX_RISK_PER_TRADE of the account can lose at
+    the stop and what MAX_POSITION_SIZE of the account can buy.
+
+    Args:
+        candidates: Scan results with ticker, current_price,
+            trade_direction, confidence_score and (optionally) atr
+        account_value: Account equity (defaults to config.ACCOUNT_VALUE)
+        min_confidence: Candidates below this score are dropped
+
+    Returns:
+        Sized LONG/SHORT candidates (NEUTRAL and unsizeable ones dropped),
+        best confidence first
+    """
+    account_value = account_value or config.ACCOUNT_VALUE
+    min_confidence = config.MIN_CONFIDENCE_SCORE if min_confidence is None else min_confidence
+
+    df = pd.DataFrame(candidates)
+    if df.empty:
+        return pd.DataFrame(columns=ORDER_COLUMNS)
+
+    direction = df['trade_direction'].astype(str)
+    side = np.select([direction.str.contains('LONG'), direction.str.contains('SHORT')],
+                     [1, -1], 0)
+    price = df['current_price'].to_numpy(dtype=np.float64)
+    atr = df['atr'].to_numpy(dtype=np.float64) if 'atr' in df else np.full(len(df), np.nan)
+
+    stop_distance = np.where(np.isfinite(atr) & (atr > 0), atr * config.ATR_STOP_MULTIPLE,
+                             price * config.STOP_LOSS_PERCENTAGE)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        by_risk = np.floor(account_value * config.MAX_RISK_PER_TRADE / stop_distance)
+        by_size = np.floor(account_value * config.MAX_POSITION_SIZE / price)
+    shares = np.nan_to_num(np.fmin(by_risk, by_size), nan=0.0)
+
+    sized = df.assign(
+        side_sign=side,
+        side=np.select([side > 0, side < 0], ['BUY', 'SELL_SHORT'], ''),
+        shares=shares.astype(np.int64),
+        entry_price=price,
+        stop_distance=np.round(stop_distance, 4),
+        stop_price=np.round(price - side * stop_distance, 2),
+        target_price=np.round(price + side * stop_distance * config.REWARD_RISK_RATIO, 2),
+    )
+    sized['risk_dollars'] = np.round(sized['shares'] * stop_distance, 2)
+    sized['notional'] = np.round(sized['shares'] * price, 2)
+
+    keep = (side != 0) & (sized['shares'] > 0) & (sized['confidence_score'] >= min_confidence)
+    return sized[keep].sort_values('confidence_score', ascending=False,
+                                   kind='stable').reset_index(drop=True)
+
+
+def select_trades(sized: pd.DataFrame, account_value: float = None, max_trades: int = None,
+                  risk_budget: float = None, capital: float = None) -> pd.DataFrame:
+    """
+    Greedy trade selection under the daily limits
+
+    Candidates are taken in confidence order. A candidate that no longer
+    fits is shrunk to the remaining risk budget and capital, and skipped
+    if not even one share fits; selection stops at `max_trades`. The scan
+    is a single pass over pre-sized arrays, so thousands of candidates
+    take milliseconds.
+
+    Args:
+        sized: Output of size_positions()
+        account_value: Account equity (defaults to config.ACCOUNT_VALUE)
+        max_trades: Trades allowed (defaults to config.MAX_DAILY_TRADES)
+        risk_budget: Total dollars at risk if every stop is hit (defaults
+            to MAX_DAILY_LOSS of the account)
+        capital: Total notional allowed (defaults to the account value)
+
+    Returns:
+        Order list with ORDER_COLUMNS
+    """
+    account_value = account_value or config.ACCOUNT_VALUE
+    max_trades = config.MAX_DAILY_TRADES if max_trades is None else max_trades
+    risk_budget = account_value * config.MAX_DAILY_LOSS if risk_budget is None else risk_budget
+    capital = account_value if capital is None else capital
+
+    shares = sized['shares'].to_numpy(dtype=np.int64).copy()
+    stop_distance = sized['stop_distance'].to_numpy(dtype=np.float64)
+    price = sized['entry_price'].to_numpy(dtype=np.float64)
+
+    chosen = []
+    for i in range(len(sized)):
+        if len(chosen) >= max_trades:
+            break
+        fit = min(shares[i], int(risk_budget // stop_distance[i]), int(capital // price[i]))
+        if fit < 1:
+            continue
+        shares[i] = fit
+        risk_budget -= fit * stop_distance[i]
+        capital -= fit * price[i]
+        chosen.append(i)
+
+    orders = sized.iloc[chosen].copy()
+    orders['shares'] = shares[chosen]
+    orders['risk_dollars'] = np.round(orders['shares'] * orders['stop_distance'], 2)
+    orders['notional'] = np.round(orders['shares'] * orders['entry_price'], 2)
+    return orders[ORDER_COLUMNS].reset_index(drop=True)
+
+
+def build_order_list(candidates: Union[pd.DataFrame, List[Dict]],
+                     account_value: float = None) -> pd.DataFrame:
+    """
+    Size all candidates and select the day's orders
+
+    Args:
+        candidates: Scan results
+        account_value: Account equity (defaults to config.ACCOUNT_VALUE)
+
+    Returns:
+        Order list with ORDER_COLUMNS, best confidence first
+    """
+    return select_trades(size_positions(candidates, account_value), account_value)
+
+
+def format_order_list(orders: pd.DataFrame, account_value: float = None) -> str:
+    """Printable summary of an order list"""
+    account_value = account_value or config.ACCOUNT_VALUE
+    if orders.empty:
+        return "No orders: no candidate fits the risk limits."
+
+    lines = [f"📋 ORDER LIST (account ${account_value:,.0f}, "
+             f"max {config.MAX_DAILY_TRADES} trades, "
+             f"{config.MAX_DAILY_LOSS:.0%} daily loss budget)"]
+    for _, order in orders.iterrows():
+        lines.append(f"   {order['side']:<10} {order['shares']:>6} {order['ticker']:<6} "
+                     f"@ ${order['entry_price']:.2f}  stop ${order['stop_price']:.2f}  "
+                     f"target ${order['target_price']:.2f}  "
+                     f"risk ${order['risk_dollars']:,.2f}")
+    lines.append(f"   Total risk ${orders['risk_dollars'].sum():,.2f}, "
+                 f"notional ${orders['notional'].sum():,.2f}")
+    return "\n".join(lines)
@@ -4,6 +4,10 @@ Scans all 503 S&P 500 stocks with advanced indicators
 """
 
 from advanced_screener import AdvancedDayTradingScreener
+from metrics_export import cache_collector, start_metrics_export
+from portfolio import build_order_list, format_order_list
+from sentiment import SentimentCache, make_sentiment_provider
+import config
 from datetime import datetime
 import pandas as pd
 import time
@@ -21,13 +25,43 @@ def main():
         min_price=5.0,
         max_price=500.0,
         min_volume=1000000,
-        use_ml=False  # Set to False (no ML training needed)
+        use_ml=config.USE_ML  # Uses a registered model, never trains here
     )
+    if screener.use_ml:
+        metadata = screener.load_ml_model(config.ML_MODEL_VERSION)
+        if metadata:
+            print(f"✅ Loaded ML model {metadata['version']}")
+        else:
+            print(f"⚠️  No ML model in {config.MODEL_REGISTRY_DIR}/, continuing without ML")
+            screener.use_ml = False
+    if config.USE_SENTIMENT:
+        screener.sentiment = SentimentCache(make_sentiment_provider())
     print("✅ Screener initialized!\n")
     
+    telemetry = screener.telemetry
+    telemetry.start()
+    collectors = [cache_collector('bars', screener.bar_cache),
+                  cache_collector('sentiment', screener.sentiment)]
+    exporter = start_metrics_export(telemetry, collectors)
+    
     # Fetch S&P 500 list
     print("Fetching S&P 500 stock list...")
-    sp500_tickers = screener.fetch_sp500_tickers()
+    with telemetry.stage('universe'):
+        sp500_tickers = screener.fetch_sp500_tickers()
+    
+    # Drop ineligible stocks with one batched daily snapshot before the
+    # per-ticker fetches
+    if config.USE_PREFILTER:
+        print()
+        with telemetry.stage('prefilter'):
+            sp500_tickers = screener.prefilter_universe(sp500_tickers)
+    
+    # Only the strongest daily setups get the intraday pipeline
+    if config.USE_COARSE_SCREEN:
+        print()
+        with telemetry.stage('coarse_screen'):
+            sp500_tickers = screener.coarse_screen(sp500_tickers,
+                                                   config.COARSE_SCREEN_TOP_K)
     
     print(f"\n{'=' * 80}")
     print(f"🔍 SCANNING {len(sp500_tickers)} S&P 500 STOCKS")
@@ -35,55 +69,85 @@ def main():
     print(f"\n⏱️  Estimated time: 25-30 minutes")
     print(f"☕ Grab a coffee and relax...\n")
     
+    # Benchmark and sector ETF bars, once for the whole scan
+    if config.USE_CROSS_SECTION:
+        with telemetry.stage('reference_bars'):
+            screener.load_reference_bars()
+    
+    # Sentiment for the whole universe is fetched in batches on a
+    # background thread while the loop below fetches bars
+    if screener.sentiment is not None:
+        screener.sentiment.prefetch(sp500_tickers)
+    
     results = []
     total = len(sp500_tickers)
-    start_time = datetime.now()
-    
-    for i, ticker in enumerate(sp500_tickers, 1):
-        # Progress updates every 25 stocks
-        if i % 25 == 0 or i == 1:
-            elapsed = (datetime.now() - start_time).seconds
-            stocks_per_sec = i / max(elapsed, 1)
-            remaining = (total - i) / max(stocks_per_sec, 0.1)
-            
-            print(f"Progress: {i}/{total} stocks ({i/total*100:.1f}%) - "
-                  f"~{int(remaining/60)}min {int(remaining%60)}sec remaining")
-        
-        try:
-            analysis = screener.analyze_with_sentiment(
-                ticker=ticker,
-                sentiment_score=None  # No sentiment for now
-            )
-            
-            if analysis:
-                results.append(analysis)
+    telemetry.total = total
+    
+    for ticker in sp500_tickers:
+        with telemetry.ticker(ticker):
+            try:
+                analysis = screener.analyze_with_sentiment(
+                    ticker=ticker,
+                    sentiment_score=None,  # From screener.sentiment when enabled
+                    defer_ml=True  # Scored in one batch after the loop
+                )
+                
+                if analysis:
+                    results.append(analysis)
+                
+                # Add delay to avoid rate limiting (2-3 seconds between requests)
+                with telemetry.stage('throttle'):
+                    time.sleep(random.uniform(2.0, 3.0))
             
-            # Add delay to avoid rate limiting (2-3 seconds between requests)
-            time.sleep(random.uniform(2.0, 3.0))
+            except Exception as e:
+                telemetry.count('analysis_errors', type=type(e).__name__)
+                # Silently continue on errors (some stocks may have insufficient data)
+                if "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
+                    telemetry.count('rate_limit_events')
+                    print(f"   ⚠️  Rate limit hit at {ticker}, pausing 30 seconds...")
+                    with telemetry.stage('rate_limit_wait'):
+                        time.sleep(30)
+                    # Retry this stock
+                    try:
+                        analysis = screener.analyze_with_sentiment(ticker, defer_ml=True)
+                        if analysis:
+                            results.append(analysis)
+                    except:
+                        pass
+                pass
         
-        except Exception as e:
-            # Silently continue on errors (some stocks may have insufficient data)
-            if "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
-                print(f"   ⚠️  Rate limit hit at {ticker}, pausing 30 seconds...")
-                time.sleep(30)
-                # Retry this stock
-                try:
-                    analysis = screener.analyze_with_sentiment(ticker)
-                    if analysis:
-                        results.append(analysis)
-                except:
-                    pass
-            pass
-    
-    elapsed_time = (datetime.now() - start_time).seconds
+        if telemetry.should_report():
+            print(telemetry.progress())
+    
+    # Batched ML inference for every analyzed stock in one model call
+    results = screener.apply_ml_batch(results)
+    
+    # Relative strength and percentile ranks across everything analyzed
+    with telemetry.stage('cross_section'):
+        results = screener.apply_cross_section(results)
+    if results and 'market_regime' in results[0]:
+        print(f"\n📈 Market regime: {results[0]['market_regime']} "
+              f"(breadth {results[0]['market_breadth']:.0%})")
+    
+    telemetry.count('tickers_scanned', total)
+    telemetry.count('opportunities', len(results))
+    for collect in collectors:  # Cache hit ratios into the run summary
+        collect(telemetry)
+    elapsed_time = telemetry.elapsed
     
     print(f"\n{'=' * 80}")
     print(f"✅ SCAN COMPLETE!")
     print(f"{'=' * 80}")
-    print(f"   Total time: {int(elapsed_time/60)}min {elapsed_time%60}sec")
+    print(f"   Total time: {int(elapsed_time // 60)}min {elapsed_time % 60:.1f}sec")
     print(f"   Stocks analyzed: {total}")
     print(f"   Viable opportunities: {len(results)}")
+    if config.VERBOSE:
+        print(telemetry.format_stages())
+    if config.WRITE_RUN_SUMMARY:
+        print(f"   Run summary: {telemetry.write_summary()}")
     print(f"{'=' * 80}\n")
+    if exporter:
+        exporter.stop()
     
     if not results:
         print("⚠️  No trading opportunities found matching criteria.")
@@ -151,6 +215,10 @@ def main():
             print(f"  {sector}: {count} stocks")
         print()
     
+    if config.PLAN_ORDERS:
+        print(format_order_list(build_order_list(df)))
+        print()
+    
     print("=" * 80)
     print("NEXT STEPS:")
     print("=" * 80)
@@ -162,12 +230,12 @@ def main():
 5. Set up charts and alerts
 
 For sentiment integration:
-  - Add your sentiment agent
-  - Pass sentiment_score to analyze_with_sentiment()
+  - Set USE_SENTIMENT = True and pick SENTIMENT_PROVIDER in config.py
+  - Or pass sentiment_score to analyze_with_sentiment()
   
 For machine learning:
-  - Set use_ml=True in initialization
-  - Train model with historical data first
+  - Train once: screener.train_ml_model(data); screener.save_ml_model()
+  - Set USE_ML = True in config.py to load the registered model
 """)
 
 
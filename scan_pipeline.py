@@ -0,0 +1,337 @@
+"""
+Scan Pipeline
+Streaming universe -> prefilter -> fetch -> analyze -> sink pipeline with
+bounded queues, so results are visible while the scan is still running
+"""
+
+import heapq
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import pandas as pd
+
+import config
+from bar_cache import HAS_PYARROW
+from universe_filters import build_snapshot, fetch_daily_bars, prefilter_snapshot
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class ConsoleSink:
+    """Prints one line per scored ticker above a confidence threshold"""
+
+    def __init__(self, min_confidence: float = None):
+        self.min_confidence = config.MIN_CONFIDENCE_SCORE if min_confidence is None \
+            else min_confidence
+
+    def write(self, analysis: Dict):
+        if analysis['confidence_score'] < self.min_confidence:
+            return
+        print(f"   {analysis['ticker']:<6} {analysis['trade_direction']:<7} "
+              f"confidence {analysis['confidence_score']:5.1f}  "
+              f"move {analysis['predicted_move_pct']:+.2f}%  "
+              f"risk {analysis['risk_level']}")
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """
+    Appends scored tickers to a CSV or Parquet file as they arrive
+
+    The columns are fixed by the first row written. CSV rows are flushed
+    immediately; Parquet rows are written as a row group every
+    `batch_size` rows (and on close).
+    """
+
+    def __init__(self, path: str, batch_size: int = 50):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        if self.parquet and not HAS_PYARROW:
+            raise ImportError("Writing Parquet requires pyarrow (pip install pyarrow)")
+
+        self.batch_size = batch_size
+        self.columns = None
+        self.buffer = []
+        self.writer = None
+        self.rows = 0
+
+    def write(self, analysis: Dict):
+        if self.columns is None:
+            self.columns = list(analysis)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        if self.parquet:
+            self.buffer.append(analysis)
+            if len(self.buffer) >= self.batch_size:
+                self._flush_parquet()
+        else:
+            pd.DataFrame([analysis]).reindex(columns=self.columns).to_csv(
+                self.path, mode='a' if self.rows else 'w',
+                header=not self.rows, index=False)
+        self.rows += 1
+
+    def _flush_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = pd.DataFrame(self.buffer).reindex(columns=self.columns)
+        self.buffer = []
+        if self.writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.parquet:
+            if self.buffer:
+                self._flush_parquet()
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+
+
+class LeaderboardSink:
+    """
+    Live top-N of the tickers scored so far
+
+    top() can be called from other threads while the scan runs. The board
+    is printed every `print_every` results (0 disables printing).
+    """
+
+    def __init__(self, top_n: int = None, print_every: int = None):
+        self.top_n = top_n or config.TOP_N_STOCKS
+        self.print_every = config.LEADERBOARD_PRINT_EVERY if print_every is None \
+            else print_every
+        self.analyses = {}
+        self.lock = threading.Lock()
+
+    def write(self, analysis: Dict):
+        with self.lock:
+            self.analyses[analysis['ticker']] = analysis
+            count = len(self.analyses)
+
+        if self.print_every and count % self.print_every == 0:
+            self.print_board()
+
+    def remove(self, ticker: str):
+        """Drop a ticker that no longer qualifies"""
+        with self.lock:
+            self.analyses.pop(ticker, None)
+
+    def top(self, n: int = None) -> List[Dict]:
+        """Best analyses by confidence score, best first"""
+        with self.lock:
+            return heapq.nlargest(n or self.top_n, self.analyses.values(),
+                                  key=lambda a: a['confidence_score'])
+
+    def print_board(self):
+        board = self.top()
+        print(f"\n🏆 LEADERBOARD (top {len(board)} of {len(self.analyses)} scored)")
+        for rank, a in enumerate(board, 1):
+            print(f"   #{rank:<3} {a['ticker']:<6} {a['trade_direction']:<7} "
+                  f"{a['confidence_score']:5.1f}  {a['predicted_move_pct']:+.2f}%")
+        print()
+
+    def close(self):
+        pass
+
+
+class ScanPipeline:
+    """
+    Runs a scan as concurrent stages connected by bounded queues
+
+        universe -> prefilter (batched daily snapshot) -> fetch (N threads)
+                 -> analyze (indicators + score) -> sinks
+
+    A full queue blocks the stage feeding it, so fetching never runs far
+    ahead of analysis. Sinks get each analysis as soon as it is scored.
+    """
+
+    def __init__(self, screener, sinks: List = None, fetch_workers: int = None,
+                 queue_size: int = None, prefilter: bool = True):
+        """
+        Initialize the pipeline
+
+        Args:
+            screener: DayTradingScreener providing fetch and analysis
+            sinks: Objects with write(analysis) and close()
+            fetch_workers: Concurrent fetch threads
+            queue_size: Capacity of each inter-stage queue
+            prefilter: Drop ineligible tickers with batched daily snapshots
+        """
+        self.screener = screener
+        self.sinks = sinks if sinks is not None else [ConsoleSink(), LeaderboardSink()]
+        self.fetch_workers = fetch_workers or config.PIPELINE_FETCH_WORKERS
+        self.queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+        self.prefilter = prefilter
+        self.stats = {}
+        self.queues = {}  # stage name -> inter-stage queue of the running scan
+        self._stop = threading.Event()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the pipeline is stopped"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _prefilter_stage(self, tickers: List[str], out: queue.Queue):
+        batch_size = config.PREFILTER_BATCH_SIZE
+        try:
+            for start in range(0, len(tickers), batch_size):
+                batch = tickers[start:start + batch_size]
+                if self.prefilter:
+                    snapshot = build_snapshot(fetch_daily_bars(batch, config.PREFILTER_PERIOD))
+                    kept = prefilter_snapshot(batch, snapshot, self.screener.min_price,
+                                              self.screener.max_price,
+                                              self.screener.min_volume)
+                    # Only tickers past the prefilter count toward the ETA
+                    self.screener.telemetry.total -= len(batch) - len(kept)
+                    batch = kept
+                self.stats['prefiltered'] += len(batch)
+                for ticker in batch:
+                    if not self._put(out, ticker):
+                        return
+        finally:
+            for _ in range(self.fetch_workers):
+                self._put(out, _DONE)
+
+    def _fetch_stage(self, inbox: queue.Queue, out: queue.Queue):
+        try:
+            while not self._stop.is_set():
+                ticker = inbox.get()
+                if ticker is _DONE:
+                    break
+                with self.screener.telemetry.ticker(ticker):
+                    df = self.screener.fetch_stock_data(ticker, period="5d", interval="5m")
+                if df is not None and not self._put(out, (ticker, df)):
+                    break
+                # Add delay to avoid rate limiting (2-3 seconds between requests)
+                with self.screener.telemetry.stage('throttle'):
+                    time.sleep(random.uniform(2.0, 3.0))
+        finally:
+            self._put(out, _DONE)
+
+    def _analyze_stage(self, inbox: queue.Queue, out: queue.Queue):
+        remaining = self.fetch_workers
+        try:
+            while remaining and not self._stop.is_set():
+                item = inbox.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                ticker, df = item
+                try:
+                    analysis = self.screener.analyze_bars(ticker, df)
+                except Exception as e:
+                    self.screener.telemetry.count('analysis_errors', type=type(e).__name__)
+                    print(f"⚠️  Analysis failed for {ticker}: {str(e)[:100]}")
+                    continue
+                if analysis and not self._put(out, analysis):
+                    break
+        finally:
+            self._put(out, _DONE)
+
+    def run(self, tickers: List[str]) -> pd.DataFrame:
+        """
+        Scan tickers, streaming each scored ticker to the sinks
+
+        Args:
+            tickers: Universe to scan
+
+        Returns:
+            DataFrame of every analysis, sorted by confidence score
+        """
+        self._stop.clear()
+        self.stats = {'universe': len(tickers), 'prefiltered': 0, 'scored': 0,
+                      'first_result_seconds': None}
+
+        ticker_q = queue.Queue(self.queue_size)
+        bars_q = queue.Queue(self.queue_size)
+        results_q = queue.Queue(self.queue_size)
+        self.queues = {'tickers': ticker_q, 'bars': bars_q, 'results': results_q}
+        self.screener.telemetry.start(len(tickers))
+
+        threads = [threading.Thread(target=self._prefilter_stage, args=(tickers, ticker_q),
+                                    daemon=True),
+                   threading.Thread(target=self._analyze_stage, args=(bars_q, results_q),
+                                    daemon=True)]
+        threads += [threading.Thread(target=self._fetch_stage, args=(ticker_q, bars_q),
+                                     daemon=True) for _ in range(self.fetch_workers)]
+
+        print(f"🔍 Streaming scan of {len(tickers)} stocks "
+              f"({self.fetch_workers} fetch workers)...\n")
+        start = time.time()
+        for thread in threads:
+            thread.start()
+
+        results = []
+        try:
+            while True:
+                analysis = results_q.get()
+                if analysis is _DONE:
+                    break
+                if not results:
+                    self.stats['first_result_seconds'] = round(time.time() - start, 1)
+                results.append(analysis)
+                self.stats['scored'] += 1
+                for sink in self.sinks:
+                    sink.write(analysis)
+        finally:
+            self._stop.set()
+            for sink in self.sinks:
+                sink.close()
+
+        self.stats['total_seconds'] = round(time.time() - start, 1)
+        self.screener.telemetry.count('tickers_scanned', self.stats['prefiltered'])
+        self.screener.telemetry.count('opportunities', self.stats['scored'])
+        print(f"\n✅ Streaming scan complete: {self.stats['scored']} scored of "
+              f"{self.stats['prefiltered']} past the prefilter in {self.stats['total_seconds']}s "
+              f"(first result after {self.stats['first_result_seconds']}s)")
+
+        if not results:
+            return pd.DataFrame()
+
+        return pd.DataFrame(results).sort_values('confidence_score', ascending=False)
+
+
+if __name__ == "__main__":
+    from day_trading_screener import DayTradingScreener
+    from metrics_export import pipeline_collector, start_metrics_export
+
+    screener = DayTradingScreener(min_price=config.MIN_PRICE, max_price=config.MAX_PRICE,
+                                  min_volume=config.MIN_VOLUME)
+    output_file = os.path.join(
+        config.OUTPUT_DIRECTORY,
+        f"{config.OUTPUT_FILENAME_PREFIX}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+
+    leaderboard = LeaderboardSink()
+    sinks = [ConsoleSink(), leaderboard]
+    if config.SAVE_TO_CSV:
+        sinks.append(FileSink(output_file))
+    if config.ENABLE_ALERTS:
+        from alert_engine import AlertEngine
+        sinks.append(AlertEngine())
+
+    pipeline = ScanPipeline(screener, sinks, prefilter=config.USE_PREFILTER)
+    exporter = start_metrics_export(screener.telemetry, [pipeline_collector(pipeline)])
+    pipeline.run(screener.get_stock_universe())
+    if exporter:
+        exporter.stop()
+    leaderboard.print_board()
+
+    if config.SAVE_TO_CSV:
+        print(f"💾 Results streamed to: {output_file}")
@@ -0,0 +1,410 @@
+"""
+Scan Service
+Daemon that keeps the latest scored universe and its bar windows warm in
+memory and serves them over a local HTTP/JSON API
+
+    GET /top?n=20          best analyses by confidence score
+    GET /ticker/{sym}      latest analysis for one ticker (?refresh=1 rescans it)
+    GET /scan/status       refresh cycle, timings and universe coverage
+    GET /metrics           Prometheus metrics (scan telemetry, cache hit ratio)
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+import config
+from metrics_export import CONTENT_TYPE, MetricsExporter, cache_collector
+from tiered_scheduler import COLD
+from watch_mode import BarWatcher, next_bar_close
+
+
+def _encode(payload) -> bytes:
+    """JSON-encode a response body (numpy scalars become Python values)"""
+    default = lambda v: v.item() if isinstance(v, np.generic) else str(v)
+    return json.dumps(payload, default=default).encode()
+
+
+class ScanService:
+    """
+    Long-running scan shared by many clients
+
+    A background thread refreshes the universe on every bar close through a
+    BarWatcher (so only tickers with a new bar are rescored). After each
+    refresh the ranking and every ticker's response body are encoded once
+    and swapped in as an immutable snapshot; requests only read the current
+    snapshot, without locks or recomputation.
+
+    Tickers requested through /ticker that are not in the universe are
+    analyzed on demand from the watcher's window or the bar cache (fetching
+    only if neither has recent bars) and are watched from then on. The
+    lookup runs outside the lock and the result is merged under it, or
+    handed to a running refresh to merge, so a request never waits for a
+    refresh's download. Tickers known not to
+    qualify (they have bars but fail the filters, or have no bars) are part
+    of the snapshot and answered without any work until the next refresh.
+    """
+
+    def __init__(self, screener, tickers: List[str], scheduler=None, fetch_fn=None,
+                 interval: str = "5m", sinks: List = None):
+        """
+        Initialize the service
+
+        Args:
+            screener: DayTradingScreener providing analyze_bars()
+            tickers: Universe to keep scored
+            scheduler: Optional TieredScheduler for the refresh cycles
+            fetch_fn: fetch_fn(tickers, period) -> {ticker: bars}
+                (defaults to batched yfinance downloads)
+            interval: Bar interval
+            sinks: Sinks that also receive each rescored analysis
+                (e.g. an AlertEngine)
+        """
+        self.screener = screener
+        self.watcher = BarWatcher(screener, tickers, sinks=sinks or [], fetch_fn=fetch_fn,
+                                  interval=interval, scheduler=scheduler)
+        self.started = time.time()
+        self.status = {'state': 'starting', 'cycles': 0, 'last_refresh': None,
+                       'last_refresh_seconds': None, 'last_changed': 0,
+                       'next_refresh': None, 'errors': 0}
+        self.requests = 0
+        self.metrics = MetricsExporter(screener.telemetry, mode=None, collectors=[
+            cache_collector('bars', screener.bar_cache), self._collect_metrics])
+
+        self._ranking = []  # analyses, best first
+        self._top = _encode([])  # encoded top config.TOP_N_STOCKS
+        self._tickers = {}  # ticker -> encoded /ticker body
+        self._unqualified = frozenset()  # tickers known to have no analysis
+        self._no_bars = set()  # on-demand lookups without bars since the last refresh
+        self._pending = {}  # ticker -> (bars, analysis) handed to a running refresh
+        self._refreshing = False  # guarded, with _pending, by _state_lock
+
+        self._lock = threading.Lock()  # serializes changes to the watcher
+        self._state_lock = threading.Lock()  # small shared state, never held for I/O
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _ticker_body(analysis: dict, rank: int, window: pd.DataFrame = None) -> dict:
+        """/ticker response: the analysis with its rank and bar window"""
+        return {
+            **analysis,
+            'rank': rank,
+            'bars': 0 if window is None else len(window),
+            'last_bar': None if window is None or window.empty
+            else window.index[-1].isoformat(),
+        }
+
+    def _publish(self):
+        """Encode the watcher's current state as the served snapshot"""
+        analyses = self.watcher.analyses
+        ranking = sorted(analyses.values(), key=lambda a: a['confidence_score'],
+                         reverse=True)
+
+        tickers = {}
+        for rank, analysis in enumerate(ranking, 1):
+            window = self.watcher.bars.get(analysis['ticker'])
+            tickers[analysis['ticker']] = _encode(self._ticker_body(analysis, rank, window))
+
+        # Each attribute is replaced whole, so readers see either the old
+        # or the new version and never a partial update
+        self._ranking = ranking
+        self._top = _encode(ranking[:config.TOP_N_STOCKS])
+        self._tickers = tickers
+        self._unqualified = frozenset(
+            [t for t in self.watcher.bars if t not in tickers] + list(self._no_bars))
+
+    def refresh(self, period: str = "1d") -> List[str]:
+        """Run one refresh cycle and publish the result"""
+        self.status['state'] = 'refreshing'
+        start = time.time()
+        try:
+            with self._lock:
+                with self._state_lock:
+                    self._refreshing = True
+                try:
+                    changed = self.watcher.refresh(period=period)
+                    self._no_bars.clear()
+                finally:
+                    # Clearing the flag and taking the handed-over results is
+                    # one step, so every result handed over is merged here and
+                    # later ones wait for self._lock in ticker()
+                    with self._state_lock:
+                        self._refreshing = False
+                        pending, self._pending = self._pending, {}
+                    self._merge(pending)
+                self._publish()
+        except Exception as e:
+            self.status['errors'] += 1
+            self.status['state'] = 'idle'
+            print(f"⚠️  Refresh failed: {str(e)[:100]}")
+            return []
+
+        self.status.update({
+            'state': 'idle',
+            'cycles': self.watcher.cycles,
+            'last_refresh': pd.Timestamp.now(tz=config.MARKET_TIMEZONE).isoformat(),
+            'last_refresh_seconds': round(time.time() - start, 3),
+            'last_changed': len(changed),
+        })
+        return changed
+
+    def _refresh_loop(self):
+        self.refresh(period="5d")
+        print(f"✅ Initial window loaded for {len(self.watcher.bars)} stocks, "
+              f"{len(self._ranking)} qualify")
+
+        while not self._stop.is_set():
+            wake = next_bar_close() + pd.Timedelta(seconds=config.WATCH_SETTLE_SECONDS)
+            self.status['next_refresh'] = wake.isoformat()
+            delay = (wake - pd.Timestamp.now(tz=config.MARKET_TIMEZONE)).total_seconds()
+            if self._stop.wait(max(delay, 0)):
+                break
+            self.refresh()
+
+    def start(self):
+        """Start refreshing in a background thread"""
+        self._thread = threading.Thread(target=self._refresh_loop, name="scan-refresh",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def top(self, n: int = None) -> bytes:
+        """Encoded ranking of the best n analyses"""
+        if n is None or n == config.TOP_N_STOCKS:
+            return self._top
+        return _encode(self._ranking[:max(n, 0)])
+
+    def _bars_for(self, ticker: str, fetch: bool = False) -> Optional[pd.DataFrame]:
+        """Bars already held in memory or the bar cache, else fetched bars"""
+        now = pd.Timestamp.now(tz=config.MARKET_TIMEZONE)
+        window = self.watcher.bars.get(ticker)
+        if window is not None and not window.empty and not fetch:
+            return window
+
+        cache = self.screener.bar_cache
+        if cache is not None and not fetch:
+            cached = cache.load(ticker, self.watcher.interval)
+            if cached is not None and not cached.empty and \
+                    now - cached.index[-1] <= pd.Timedelta(days=1):
+                return cached.iloc[-config.WATCH_WINDOW_BARS:]
+
+        fetched = self.watcher.fetch_fn([ticker], "5d").get(ticker)
+        if fetched is None or fetched.empty:
+            return None
+        return self.watcher._closed_bars(
+            fetched[['Open', 'High', 'Low', 'Close', 'Volume']], now
+        ).iloc[-config.WATCH_WINDOW_BARS:]
+
+    def ticker(self, ticker: str, refresh: bool = False) -> Optional[bytes]:
+        """
+        Encoded analysis for one ticker
+
+        Args:
+            ticker: Stock ticker symbol
+            refresh: Fetch fresh bars and rescan it instead of serving the
+                snapshot
+
+        Returns:
+            Response body, or None if the ticker has no bars or does not
+            pass the screener's filters
+        """
+        ticker = ticker.upper()
+        if not refresh:
+            body = self._tickers.get(ticker)
+            if body is not None or ticker in self._unqualified:
+                return body
+
+        # Load or fetch and analyze without the lock, which a refresh holds
+        # for its whole download
+        bars = self._bars_for(ticker, fetch=refresh)
+        analysis = None if bars is None else self.screener.analyze_bars(ticker, bars.copy())
+
+        # While a refresh holds self._lock for its download, hand the result
+        # to it instead of waiting. The check and the hand-over happen under
+        # _state_lock, which the refresh takes to clear the flag and collect
+        # _pending, so a handed-over result is never left unmerged.
+        with self._state_lock:
+            handed_over = self._refreshing
+            if handed_over:
+                self._pending[ticker] = (bars, analysis)
+
+        if handed_over:
+            if analysis is None:
+                self._unqualified = self._unqualified | {ticker}
+                return None
+            rank = 1 + sum(a['confidence_score'] > analysis['confidence_score']
+                           for a in self._ranking)
+            return _encode(self._ticker_body(analysis, rank, bars))
+
+        with self._lock:
+            self._merge({ticker: (bars, analysis)})
+            self._publish()
+        return self._tickers.get(ticker)
+
+    def _merge(self, results: dict):
+        """Merge on-demand results, ticker -> (bars, analysis), into the
+        watcher (caller holds self._lock)"""
+        for ticker, (bars, analysis) in results.items():
+            if bars is None:
+                self._no_bars.add(ticker)
+                continue
+
+            window = self.watcher.bars.get(ticker)
+            if window is not None and not window.empty and window.index[-1] > bars.index[-1]:
+                continue  # A refresh merged (and rescored) newer bars meanwhile
+
+            self._no_bars.discard(ticker)
+            self.watcher.bars[ticker] = bars
+            if ticker not in self.watcher.tickers:
+                self.watcher.tickers.append(ticker)
+                if self.watcher.scheduler is not None:
+                    self.watcher.scheduler.tier.setdefault(ticker, COLD)
+
+            if analysis is None:
+                self.watcher.analyses.pop(ticker, None)
+            else:
+                self.watcher.analyses[ticker] = analysis
+            for sink in self.watcher.sinks:
+                if analysis is not None:
+                    sink.write(analysis)
+                elif hasattr(sink, 'remove'):
+                    sink.remove(ticker)
+
+    def count_request(self):
+        """Count one served request (handlers run on concurrent threads)"""
+        with self._state_lock:
+            self.requests += 1
+
+    def _collect_metrics(self, telemetry):
+        telemetry.set_gauge('service_universe', len(self.watcher.tickers))
+        telemetry.set_gauge('service_scored', len(self._ranking))
+        telemetry.set_gauge('service_requests', self.requests)
+        telemetry.set_gauge('service_refresh_errors', self.status['errors'])
+        if self.status['last_refresh_seconds'] is not None:
+            telemetry.set_gauge('service_last_refresh_seconds',
+                                self.status['last_refresh_seconds'])
+
+    def scan_status(self) -> bytes:
+        """Encoded refresh status and coverage"""
+        scheduler = self.watcher.scheduler
+        return _encode({
+            **self.status,
+            'universe': len(self.watcher.tickers),
+            'with_bars': len(self.watcher.bars),
+            'scored': len(self._ranking),
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'requests_served': self.requests,
+            **({'tiers': scheduler.summary()} if scheduler is not None else {}),
+        })
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """Routes GET requests to the server's ScanService"""
+
+    def do_GET(self):
+        service = self.server.service
+        service.count_request()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split('/') if p]
+
+        try:
+            if parts == ['top']:
+                n = int(query['n'][0]) if 'n' in query else None
+                self._send(200, service.top(n))
+            elif len(parts) == 2 and parts[0] == 'ticker':
+                refresh = query.get('refresh', ['0'])[0] not in ('0', 'false', '')
+                body = service.ticker(parts[1], refresh=refresh)
+                if body is None:
+                    self._send(404, _encode({'error': f"No qualifying analysis for {parts[1]}"}))
+                else:
+                    self._send(200, body)
+            elif parts == ['scan', 'status']:
+                self._send(200, service.scan_status())
+            elif parts == ['metrics']:
+                self._send(200, service.metrics.render().encode(), CONTENT_TYPE)
+            else:
+                self._send(404, _encode({'error': 'Unknown endpoint',
+                                         'endpoints': ['/top', '/ticker/{sym}',
+                                                       '/scan/status', '/metrics']}))
+        except ValueError as e:
+            self._send(400, _encode({'error': str(e)}))
+        except Exception as e:
+            self._send(500, _encode({'error': str(e)[:200]}))
+
+    def _send(self, code: int, body: bytes, content_type: str = 'application/json'):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate the console at polling rates
+        pass
+
+
+def serve(service: ScanService, host: str = None, port: int = None) -> ThreadingHTTPServer:
+    """
+    Start the service's refresh loop and an HTTP server for it
+
+    Args:
+        service: ScanService to expose
+        host: Bind address (defaults to config.SERVICE_HOST)
+        port: Port (defaults to config.SERVICE_PORT; 0 picks a free port)
+
+    Returns:
+        The server; call serve_forever() on it (or run it in a thread)
+    """
+    server = ThreadingHTTPServer((host or config.SERVICE_HOST,
+                                  config.SERVICE_PORT if port is None else port),
+                                 ScanRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    service.start()
+    return server
+
+
+if __name__ == "__main__":
+    from alert_engine import AlertEngine
+    from bar_cache import BarCache
+    from day_trading_screener import DayTradingScreener
+    from tiered_scheduler import TieredScheduler, previous_top_tickers
+
+    screener = DayTradingScreener(min_price=config.MIN_PRICE, max_price=config.MAX_PRICE,
+                                  min_volume=config.MIN_VOLUME, bar_cache=BarCache())
+    universe = screener.get_stock_universe()
+    if config.USE_PREFILTER:
+        universe = screener.prefilter_universe(universe)
+
+    scheduler = None
+    if config.USE_TIERED_SCHEDULER:
+        scheduler = TieredScheduler(universe, hot=previous_top_tickers(),
+                                    pinned=config.HOT_WATCHLIST,
+                                    tickers_per_request=config.WATCH_BATCH_SIZE)
+        universe = list(scheduler.tier)
+
+    service = ScanService(screener, universe, scheduler=scheduler,
+                          sinks=[AlertEngine()] if config.ENABLE_ALERTS else [])
+    server = serve(service)
+    host, port = server.server_address[:2]
+    print(f"🌐 Serving {len(universe)} stocks on http://{host}:{port} "
+          f"(/top, /ticker/{{sym}}, /scan/status, /metrics; Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Scan service stopped")
+    finally:
+        service.stop()
+        server.server_close()
@@ -0,0 +1,240 @@
+"""
+Scan Telemetry
+Stage timers, counters and per-ticker latencies for a scan, with latency
+percentiles, an EWMA-based ETA and a JSON run summary
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+import config
+
+PERCENTILES = (50, 95, 99)
+
+
+def _label_key(name: str, labels: Dict) -> tuple:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_name(key: tuple) -> str:
+    """'name' or 'name{k=v,...}' for a counter key"""
+    name, labels = key
+    if not labels:
+        return name
+    return f"{name}{{{','.join(f'{k}={v}' for k, v in labels)}}}"
+
+
+class ScanTelemetry:
+    """
+    Timers and counters for one scan
+
+    stage() times a block under a stage name (fetch, indicators, signals,
+    ml_inference, throttle, ...), count() increments a counter with
+    optional labels, and ticker() times one ticker end to end and advances
+    the progress. Stage timings keep the last TELEMETRY_MAX_SAMPLES
+    samples per stage, so a long-running watcher or service stays bounded.
+
+    The ETA is the remaining ticker count times an exponentially weighted
+    average of the time between finished tickers, so it follows the
+    current pace (a rate-limit pause, a faster cached stretch) instead of
+    the average since the start.
+
+    Work done in worker processes (analyze_many) is only visible as the
+    parent's stage around it.
+    """
+
+    def __init__(self, total: int = 0, alpha: float = None, max_samples: int = None):
+        """
+        Initialize telemetry
+
+        Args:
+            total: Tickers the scan will process (for progress and ETA)
+            alpha: EWMA smoothing factor (defaults to config.ETA_EWMA_ALPHA)
+            max_samples: Samples kept per stage (defaults to
+                config.TELEMETRY_MAX_SAMPLES)
+        """
+        self.alpha = config.ETA_EWMA_ALPHA if alpha is None else alpha
+        self.max_samples = max_samples or config.TELEMETRY_MAX_SAMPLES
+        self._lock = threading.Lock()
+        self.start(total)
+
+    def start(self, total: int = 0):
+        """Reset everything for a new scan of `total` tickers"""
+        with self._lock:
+            self.total = total
+            self.done = 0
+            self.started_at = time.time()
+            self._start = time.perf_counter()
+            self._last_done = self._start
+            self.ewma_interval = None  # Seconds between finished tickers
+            self.timings = {}  # stage -> deque of seconds
+            self.stage_totals = {}  # stage -> (calls, seconds), never truncated
+            self.counters = {}  # (name, labels) -> value
+            self.gauges = {}  # (name, labels) -> value
+            self.ticker_latency = {}  # ticker -> seconds
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def record(self, stage: str, seconds: float):
+        """Add one timing sample to a stage"""
+        with self._lock:
+            samples = self.timings.get(stage)
+            if samples is None:
+                samples = self.timings[stage] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+            calls, total = self.stage_totals.get(stage, (0, 0.0))
+            self.stage_totals[stage] = (calls + 1, total + seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one sample of stage `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def count(self, name: str, n: float = 1, **labels):
+        """Increment a counter, e.g. count('fetch_errors', type='HTTPError')"""
+        key = _label_key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to its current value, e.g. a queue depth"""
+        with self._lock:
+            self.gauges[_label_key(name, labels)] = value
+
+    def counter(self, name: str, **labels) -> float:
+        return self.counters.get(_label_key(name, labels), 0)
+
+    def series(self) -> tuple:
+        """Copies of the counters and gauges, keyed by (name, labels)"""
+        with self._lock:
+            return dict(self.counters), dict(self.gauges)
+
+    @contextmanager
+    def ticker(self, ticker: str):
+        """Time one ticker end to end and count it as done"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            with self._lock:
+                self.ticker_latency[ticker] = now - start
+                interval = now - self._last_done
+                self._last_done = now
+                self.done += 1
+                self.ewma_interval = interval if self.ewma_interval is None else \
+                    self.alpha * interval + (1 - self.alpha) * self.ewma_interval
+
+    def eta(self) -> Optional[float]:
+        """Seconds until the remaining tickers are done (None before the first)"""
+        if self.ewma_interval is None:
+            return None
+        return max(self.total - self.done, 0) * self.ewma_interval
+
+    def progress(self) -> str:
+        """One-line progress report"""
+        line = f"Progress: {self.done}/{self.total} stocks"
+        if self.total:
+            line += f" ({self.done / self.total * 100:.1f}%)"
+        eta = self.eta()
+        if eta is not None:
+            line += (f" - {self.ewma_interval:.2f}s/stock - "
+                     f"~{int(eta // 60)}min {int(eta % 60)}sec remaining")
+        with self._lock:
+            fetch = list(self.timings.get('fetch', ()))
+        if fetch:
+            line += f" | fetch p50 {np.median(fetch):.2f}s"
+        return line
+
+    def should_report(self) -> bool:
+        """Whether the progress is due (first ticker, then every PROGRESS_EVERY)"""
+        return config.SHOW_PROGRESS and (
+            self.done == 1 or self.done % config.PROGRESS_EVERY == 0 or self.done == self.total)
+
+    @staticmethod
+    def histogram(samples) -> Dict:
+        """count, total, mean, max and p50/p95/p99 of timing samples, in seconds"""
+        values = np.fromiter(samples, dtype=np.float64)
+        if not len(values):
+            return {'count': 0}
+        summary = {'count': int(len(values)), 'total': round(float(values.sum()), 6),
+                   'mean': round(float(values.mean()), 6), 'max': round(float(values.max()), 6)}
+        for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            summary[f"p{p}"] = round(float(value), 6)
+        return summary
+
+    def stage_table(self) -> Dict[str, Dict]:
+        """Histogram of every stage; count and total cover all calls, the
+        percentiles the retained samples"""
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self.timings.items()}
+            totals = dict(self.stage_totals)
+        table = {}
+        for stage, values in samples.items():
+            table[stage] = self.histogram(values)
+            calls, total = totals[stage]
+            table[stage].update(count=calls, total=round(total, 6))
+        return table
+
+    def summary(self, slowest: int = 10) -> Dict:
+        """Run summary for the JSON dump"""
+        with self._lock:
+            latencies = dict(self.ticker_latency)
+        counters, gauges = self.series()
+        return {
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'elapsed_seconds': round(self.elapsed, 3),
+            'tickers_total': self.total,
+            'tickers_done': self.done,
+            'tickers_per_second': round(self.done / self.elapsed, 3) if self.elapsed else None,
+            'stages': self.stage_table(),
+            'ticker_latency': self.histogram(latencies.values()),
+            'slowest_tickers': {t: round(s, 3) for t, s in
+                                sorted(latencies.items(), key=lambda x: -x[1])[:slowest]},
+            'counters': {_label_name(k): v for k, v in sorted(counters.items())},
+            'gauges': {_label_name(k): v for k, v in sorted(gauges.items())},
+        }
+
+    def format_stages(self) -> str:
+        """Printable stage latency table, slowest total first"""
+        table = self.stage_table()
+        lines = [f"   {'Stage':<16}{'Calls':>7}{'Total':>10}{'p50':>9}{'p95':>9}{'p99':>9}"]
+        for stage, h in sorted(table.items(), key=lambda x: -x[1]['total']):
+            lines.append(f"   {stage:<16}{h['count']:>7}{h['total']:>9.1f}s"
+                         f"{h['p50']:>8.3f}s{h['p95']:>8.3f}s{h['p99']:>8.3f}s")
+        return "\n".join(lines)
+
+    def write_summary(self, path: str = None) -> str:
+        """
+        Dump the run summary as JSON
+
+        Args:
+            path: Output file (defaults to a timestamped
+                RUN_SUMMARY_PREFIX file in OUTPUT_DIRECTORY)
+
+        Returns:
+            Path written
+        """
+        if path is None:
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(config.OUTPUT_DIRECTORY,
+                                f"{config.RUN_SUMMARY_PREFIX}_{stamp}.json")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2, default=str)
+        return path
+
@@ -0,0 +1,251 @@
+"""
+Sentiment Providers
+Batched sentiment lookups behind a TTL cache, prefetched in the background
+so sentiment is ready by the time a ticker's bars have been analyzed
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+import requests
+
+import config
+
+
+class SentimentProvider(ABC):
+    """
+    Source of sentiment scores (-1 bearish to 1 bullish)
+
+    Subclasses implement fetch_batch(), which scores up to `batch_size`
+    tickers in one request. Tickers without a score are left out of the
+    result.
+    """
+
+    batch_size = 50
+
+    @abstractmethod
+    def fetch_batch(self, tickers: List[str]) -> Dict[str, float]:
+        """Scores for one batch of at most `batch_size` tickers"""
+
+
+class FixtureSentimentProvider(SentimentProvider):
+    """
+    Scores from a local file or dictionary (for tests and offline runs)
+
+    The file is JSON ({"AAPL": 0.4, ...}) or CSV with ticker and
+    sentiment_score columns. `requests` counts fetch_batch() calls and
+    `latency` simulates a remote service.
+    """
+
+    def __init__(self, scores=None, batch_size: int = None, latency: float = 0.0):
+        scores = config.SENTIMENT_FIXTURE_PATH if scores is None else scores
+        if isinstance(scores, str):
+            if scores.endswith('.csv'):
+                table = pd.read_csv(scores)
+                scores = dict(zip(table['ticker'], table['sentiment_score']))
+            else:
+                with open(scores) as f:
+                    scores = json.load(f)
+        self.scores = {t.upper(): float(s) for t, s in scores.items()}
+        self.batch_size = batch_size or config.SENTIMENT_BATCH_SIZE
+        self.latency = latency
+        self.requests = 0
+
+    def fetch_batch(self, tickers: List[str]) -> Dict[str, float]:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {t: self.scores[t.upper()] for t in tickers if t.upper() in self.scores}
+
+
+class HttpSentimentProvider(SentimentProvider):
+    """
+    Batched lookups against an HTTP endpoint
+
+    Sends GET <url>?tickers=AAPL,MSFT,... with the API key as a bearer
+    token and expects a JSON object of ticker -> score. Put an adapter in
+    front of vendors with a different request format.
+    """
+
+    def __init__(self, url: str = None, api_key: str = None, batch_size: int = None,
+                 timeout: float = 10.0):
+        self.url = url or config.SENTIMENT_API_URL
+        if not self.url:
+            raise ValueError("HTTP sentiment needs a URL (set config.SENTIMENT_API_URL)")
+        self.api_key = api_key or config.SENTIMENT_API_KEY
+        self.batch_size = batch_size or config.SENTIMENT_BATCH_SIZE
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def fetch_batch(self, tickers: List[str]) -> Dict[str, float]:
+        headers = {'Authorization': f"Bearer {self.api_key}"} if self.api_key else {}
+        response = self.session.get(self.url, params={'tickers': ','.join(tickers)},
+                                    headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return {t: float(s) for t, s in response.json().items() if s is not None}
+
+
+def make_sentiment_provider(name: str = None) -> SentimentProvider:
+    """Build the provider named by config.SENTIMENT_PROVIDER"""
+    name = (name or config.SENTIMENT_PROVIDER).lower()
+    if name == 'fixture':
+        return FixtureSentimentProvider()
+    if name == 'http':
+        return HttpSentimentProvider()
+    raise ValueError(f"Unknown sentiment provider '{name}' (use fixture or http)")
+
+
+class SentimentCache:
+    """
+    Caches provider scores for SENTIMENT_TTL_MINUTES
+
+    A score is reused until its entry is older than the TTL, however long
+    the scan that asked for it runs. Misses are fetched in provider-sized
+    batches; tickers a successful batch has no score for are cached as
+    None so they are not asked for again until they expire, while a failed
+    batch is not cached at all and is retried by the next lookup.
+
+    prefetch() queues batches for a list of tickers on a background thread
+    and returns immediately; a later get() for a ticker that is still in
+    flight waits for its own batch instead of issuing a second request. A
+    get() that misses goes through the same batches, together with every
+    other ticker whose entry has expired, so a scan that outlives the TTL
+    refetches the universe in a few batched requests rather than one
+    request per ticker.
+    """
+
+    def __init__(self, provider: SentimentProvider, ttl_seconds: float = None):
+        """
+        Initialize the cache
+
+        Args:
+            provider: SentimentProvider to fetch from
+            ttl_seconds: Entry lifetime
+        """
+        self.provider = provider
+        self.ttl_seconds = config.SENTIMENT_TTL_MINUTES * 60 \
+            if ttl_seconds is None else ttl_seconds
+
+        self.entries = {}  # ticker -> (score, fetched_at)
+        self.in_flight = {}  # ticker -> Future of its batch
+        self.expired = {}  # tickers evicted and not fetched since (ordered set)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix="sentiment-prefetch")
+
+    def _evict(self, now: float):
+        expired = [t for t, (_, fetched_at) in self.entries.items()
+                   if now - fetched_at > self.ttl_seconds]
+        for ticker in expired:
+            del self.entries[ticker]
+            self.expired[ticker] = None
+
+    def _fetch(self, batch: List[str], now: float) -> Dict[str, Optional[float]]:
+        """Fetch one provider batch and store the results
+
+        A failed batch is not cached, so the next lookup retries it"""
+        try:
+            fetched = self.provider.fetch_batch(batch)
+        except Exception as e:
+            print(f"⚠️  Sentiment batch failed: {str(e)[:100]}")
+            return {}
+
+        scores = {ticker: fetched.get(ticker) for ticker in batch}
+        with self._lock:
+            for ticker, score in scores.items():
+                self.entries[ticker] = (score, now)
+                self.expired.pop(ticker, None)
+        return scores
+
+    def _split(self, tickers: List[str], now: float) -> tuple:
+        """Split tickers into cached scores, in-flight futures and misses
+        (call with the lock held)"""
+        self._evict(now)
+        cached, waiting, misses = {}, {}, []
+        for ticker in dict.fromkeys(tickers):
+            if ticker in self.entries:
+                cached[ticker] = self.entries[ticker][0]
+            elif ticker in self.in_flight:
+                waiting[ticker] = self.in_flight[ticker]
+            else:
+                misses.append(ticker)
+        return cached, waiting, misses
+
+    def _submit(self, misses: List[str], now: float) -> Dict[str, Future]:
+        """Queue misses in provider-sized batches (call with the lock held)
+
+        Misses are registered as in flight under the same lock that found
+        them, so a concurrent get() waits for the batch instead of
+        requesting the tickers again"""
+        futures = {}
+        for start in range(0, len(misses), self.provider.batch_size):
+            batch = misses[start:start + self.provider.batch_size]
+            future = self._executor.submit(self._fetch, batch, now)
+            for ticker in batch:
+                self.in_flight[ticker] = futures[ticker] = future
+            future.add_done_callback(lambda _, batch=batch: self._release(batch))
+        return futures
+
+    def prefetch(self, tickers: List[str], now: float = None) -> List[Future]:
+        """
+        Start fetching scores in the background
+
+        Args:
+            tickers: Tickers to score (cached and in-flight ones are skipped)
+            now: Time in epoch seconds (defaults to now)
+
+        Returns:
+            One future per provider batch, resolving to its {ticker: score}
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            _, _, misses = self._split(tickers, now)
+            futures = self._submit(misses, now)
+        return list(dict.fromkeys(futures.values()))
+
+    def _release(self, tickers: List[str]):
+        with self._lock:
+            for ticker in tickers:
+                self.in_flight.pop(ticker, None)
+
+    def get_many(self, tickers: List[str], now: float = None) -> Dict[str, Optional[float]]:
+        """
+        Scores for many tickers, fetching only the misses
+
+        Args:
+            tickers: Tickers to score
+            now: Time in epoch seconds (defaults to now)
+
+        Returns:
+            Dictionary of ticker -> score (None where the provider has none)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            scores, waiting, misses = self._split(tickers, now)
+            if misses:
+                # The misses lead the batches; expired tickers fill the rest
+                requested = set(misses)
+                refetch = misses + [t for t in self.expired
+                                    if t not in requested and t not in self.in_flight]
+                submitted = self._submit(refetch, now)
+                waiting.update({t: submitted[t] for t in misses})
+            self.hits += len(scores) + len(waiting) - len(misses)
+            self.misses += len(misses)
+
+        for ticker, future in waiting.items():
+            scores[ticker] = future.result().get(ticker)
+        return scores
+
+    def get(self, ticker: str, now: float = None) -> Optional[float]:
+        """Score for one ticker (None if the provider has none)"""
+        return self.get_many([ticker], now)[ticker]
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
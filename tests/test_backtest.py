@@ -0,0 +1,105 @@
+"""
+Tests for the array-based trade simulation (backtest.py)
+"""
+
+import pandas as pd
+import pytest
+
+from backtest import max_drawdown, simulate_trades, summarize_trades
+
+CLOSES = [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]
+
+
+def bars(closes=CLOSES, day="2024-03-04"):
+    """5-minute bars with a one-dollar range around each close"""
+    index = pd.date_range(f"{day} 09:30", periods=len(closes), freq="5min",
+                          tz="America/New_York")
+    closes = pd.Series(closes, index=index)
+    return pd.DataFrame({'Open': closes, 'High': closes + 0.5, 'Low': closes - 0.5,
+                         'Close': closes, 'Volume': 1000.0})
+
+
+def signal(df, direction, at=1, predicted_move_pct=0.0):
+    """A single confident signal on bar `at` (NEUTRAL elsewhere)"""
+    scores = pd.DataFrame({'trade_direction': 'NEUTRAL', 'confidence_score': 0.0,
+                           'predicted_move_pct': predicted_move_pct}, index=df.index)
+    scores.iloc[at, scores.columns.get_loc('trade_direction')] = direction
+    scores.iloc[at, scores.columns.get_loc('confidence_score')] = 90.0
+    return scores
+
+
+def test_time_exit_after_hold_bars():
+    df = bars()
+    trades = simulate_trades(df, signal(df, 'LONG'), min_confidence=50,
+                             stop_loss=0.5, hold_bars=3)
+
+    assert len(trades) == 1
+    trade = trades.iloc[0]
+    assert trade['entry_time'] == df.index[1]
+    assert trade['exit_time'] == df.index[4]
+    assert trade['entry_price'] == 101.0
+    assert trade['exit_price'] == 104.0
+    assert trade['exit_reason'] == 'time'
+    assert trade['return_pct'] == pytest.approx(3 / 101 * 100)
+
+
+def test_time_exit_stops_at_the_session_close():
+    df = bars()
+    trades = simulate_trades(df, signal(df, 'LONG', at=3), min_confidence=50,
+                             stop_loss=0.5, hold_bars=10)
+
+    assert trades.iloc[0]['exit_time'] == df.index[-1]
+    assert trades.iloc[0]['exit_price'] == 105.0
+
+
+def test_long_and_short_returns_have_opposite_signs():
+    df = bars()
+    long = simulate_trades(df, signal(df, 'LONG'), min_confidence=50,
+                           stop_loss=0.5, hold_bars=3).iloc[0]
+    short = simulate_trades(df, signal(df, 'SHORT'), min_confidence=50,
+                            stop_loss=0.5, hold_bars=3).iloc[0]
+
+    assert long['direction'] == 'LONG' and short['direction'] == 'SHORT'
+    assert long['return_pct'] > 0
+    assert short['return_pct'] == pytest.approx(-long['return_pct'])
+
+
+def test_stop_and_target_exits():
+    df = bars()
+    # Short from 101 with a 1% stop at 102.01: bar 2 reaches 102.5
+    stopped = simulate_trades(df, signal(df, 'SHORT'), min_confidence=50,
+                              stop_loss=0.01, hold_bars=3).iloc[0]
+    assert stopped['exit_reason'] == 'stop'
+    assert stopped['exit_price'] == pytest.approx(101 * 1.01)
+    assert stopped['return_pct'] == pytest.approx(-1.0)
+
+    # Long from 101 with a 1.5% target at 102.515: bar 3 reaches 103.5
+    target = simulate_trades(df, signal(df, 'LONG', predicted_move_pct=1.5),
+                             min_confidence=50, stop_loss=0.5, hold_bars=3).iloc[0]
+    assert target['exit_reason'] == 'target'
+    assert target['exit_time'] == df.index[3]
+    assert target['return_pct'] == pytest.approx(1.5)
+
+
+def test_max_drawdown():
+    # Equity 1, -1, 2, -2: the 2 peak falls to -2
+    assert max_drawdown(pd.Series([1.0, -2.0, 3.0, -4.0])) == pytest.approx(4.0)
+    # Losses from the start count against a zero peak
+    assert max_drawdown(pd.Series([-1.0, -1.0])) == pytest.approx(2.0)
+    assert max_drawdown(pd.Series([1.0, 2.0])) == 0.0
+
+
+def test_summarize_trades():
+    trades = pd.DataFrame({
+        'entry_time': pd.date_range("2024-03-04 09:30", periods=4, freq="5min"),
+        'ticker': ['AAA', 'AAA', 'AAA', 'BBB'],
+        'return_pct': [1.0, -2.0, 3.0, -0.5],
+    })
+    summary = summarize_trades(trades, by='ticker')
+
+    assert summary.loc['AAA', 'trades'] == 3
+    assert summary.loc['AAA', 'hit_rate'] == pytest.approx(66.667)
+    assert summary.loc['AAA', 'expectancy_pct'] == pytest.approx(0.667)
+    assert summary.loc['AAA', 'total_return_pct'] == pytest.approx(2.0)
+    assert summary.loc['AAA', 'max_drawdown_pct'] == pytest.approx(2.0)
+    assert summary.loc['BBB', 'max_drawdown_pct'] == pytest.approx(0.5)
@@ -0,0 +1,72 @@
+"""
+Tests for the append-only bar archive (bar_archive.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from bar_archive import BarArchive
+
+
+def bars(day, periods=4, start_price=100.0):
+    """5-minute bars with increasing closes"""
+    index = pd.date_range(f"{day} 09:30", periods=periods, freq="5min",
+                          tz="America/New_York")
+    closes = start_price + np.arange(periods, dtype=np.float64)
+    return pd.DataFrame({'Open': closes, 'High': closes + 0.5, 'Low': closes - 0.5,
+                         'Close': closes, 'Volume': 1000.0}, index=index)
+
+
+def test_append_skips_bars_already_archived(tmp_path):
+    archive = BarArchive(str(tmp_path))
+    first = bars("2024-03-04", periods=4)
+    assert archive.append("AAA", first) == 4
+
+    # Overlaps the last two archived bars and adds two new ones
+    overlap = bars("2024-03-04", periods=6)
+    assert archive.append("AAA", overlap) == 2
+    assert archive.append("AAA", overlap) == 0
+
+    loaded = archive.load("AAA")
+    assert len(loaded) == 6
+    assert loaded.index.is_unique
+    assert list(loaded['Close']) == list(overlap['Close'])
+    assert archive.dates("AAA") == ["2024-03-04"]
+
+
+def test_tickers_are_deduplicated_independently(tmp_path):
+    archive = BarArchive(str(tmp_path))
+    archive.append("AAA", bars("2024-03-04"))
+    assert archive.append("BBB", bars("2024-03-04", start_price=50.0)) == 4
+
+    assert archive.tickers() == ["AAA", "BBB"]
+    assert list(archive.load("BBB")['Close']) == [50.0, 51.0, 52.0, 53.0]
+    assert list(archive.load("AAA")['Close']) == [100.0, 101.0, 102.0, 103.0]
+
+
+def test_load_date_ranges(tmp_path):
+    archive = BarArchive(str(tmp_path))
+    days = ["2024-03-04", "2024-03-05", "2024-03-06"]
+    for i, day in enumerate(days):
+        archive.append("AAA", bars(day, start_price=100.0 * (i + 1)))
+
+    assert len(archive.load("AAA")) == 12
+    # The end date is inclusive
+    window = archive.load("AAA", start="2024-03-05", end="2024-03-06")
+    assert sorted(set(window.index.strftime('%Y-%m-%d'))) == days[1:]
+    assert len(archive.load("AAA", end="2024-03-04")) == 4
+    assert len(archive.load("AAA", start="2024-03-06")) == 4
+    assert archive.load("AAA", start="2024-03-07").empty
+    assert archive.load("MISSING") is None
+
+    day = archive.load_day("AAA", "2024-03-05")
+    assert list(day['Close']) == [200.0, 201.0, 202.0, 203.0]
+    assert str(day.index.tz) == "America/New_York"
+
+
+def test_reopened_archive_sees_appended_rows(tmp_path):
+    BarArchive(str(tmp_path)).append("AAA", bars("2024-03-04"))
+
+    archive = BarArchive(str(tmp_path))
+    assert archive.append("AAA", bars("2024-03-04", periods=5)) == 1
+    assert len(archive.load("AAA")) == 5
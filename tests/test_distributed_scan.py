@@ -0,0 +1,58 @@
+"""
+Tests for the sharded scan queue and coordinator (distributed_scan.py)
+"""
+
+import os
+
+import config
+from distributed_scan import DONE, FAILED, ShardQueue, fake_provider, run_coordinator
+
+TICKERS = [f"T{i:03d}" for i in range(30)]
+
+
+def crashing_provider(ticker: str):
+    """fake_provider that kills its worker process on the first ticker"""
+    if ticker == TICKERS[0]:
+        os._exit(1)
+    return fake_provider(ticker)
+
+
+def test_fake_provider_passes_default_filters():
+    from day_trading_screener import DayTradingScreener
+
+    screener = DayTradingScreener(config.MIN_PRICE, config.MAX_PRICE, config.MIN_VOLUME)
+    passed = [t for t in TICKERS if screener.analyze_bars(t, fake_provider(t))]
+    assert passed == TICKERS
+
+
+def test_local_workers_merge_one_ranking(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'SHARD_POLL_SECONDS', 0.1)
+    queue_path = str(tmp_path / 'queue.sqlite')
+
+    ranking = run_coordinator(TICKERS, queue_path=queue_path, shard_size=4,
+                              local_workers=2, provider='distributed_scan:fake_provider')
+
+    assert not ranking.empty
+    assert sorted(ranking['ticker']) == TICKERS  # every ticker once, from every shard
+    assert ranking['confidence_score'].is_monotonic_decreasing
+
+    queue = ShardQueue(queue_path)
+    counts = queue.progress(queue.latest_scan())
+    assert counts[DONE] == 8 and counts[FAILED] == 0
+
+
+def test_coordinator_finishes_when_workers_die(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'SHARD_POLL_SECONDS', 0.1)
+    monkeypatch.setattr(config, 'SHARD_LEASE_SECONDS', 0.5)
+    monkeypatch.setattr(config, 'SHARD_WORKER_RESPAWNS', 1)
+    queue_path = str(tmp_path / 'queue.sqlite')
+
+    ranking = run_coordinator(TICKERS, queue_path=queue_path, shard_size=4,
+                              local_workers=2,
+                              provider='test_distributed_scan:crashing_provider')
+
+    # The first shard kills every worker that leases it; the rest still merge
+    assert sorted(ranking['ticker']) == TICKERS[4:]
+    queue = ShardQueue(queue_path)
+    counts = queue.progress(queue.latest_scan())
+    assert counts[DONE] == 7 and counts[FAILED] == 1
@@ -0,0 +1,70 @@
+"""
+Tests for trade selection under the daily limits (portfolio.py)
+"""
+
+import pandas as pd
+import pytest
+
+from portfolio import ORDER_COLUMNS, select_trades
+
+
+def sized(rows):
+    """size_positions()-shaped candidates from (ticker, shares, price, stop_distance)"""
+    df = pd.DataFrame(rows, columns=['ticker', 'shares', 'entry_price', 'stop_distance'])
+    return df.assign(
+        side='BUY',
+        stop_price=df['entry_price'] - df['stop_distance'],
+        target_price=df['entry_price'] + 2 * df['stop_distance'],
+        risk_dollars=df['shares'] * df['stop_distance'],
+        notional=df['shares'] * df['entry_price'],
+        confidence_score=range(90, 90 - len(df), -1),
+        trade_direction='LONG',
+    )
+
+
+def test_stops_at_max_trades():
+    candidates = sized([('AAA', 10, 10.0, 1.0), ('BBB', 10, 10.0, 1.0),
+                        ('CCC', 10, 10.0, 1.0)])
+    orders = select_trades(candidates, account_value=100_000, max_trades=2)
+
+    assert list(orders.columns) == ORDER_COLUMNS
+    assert list(orders['ticker']) == ['AAA', 'BBB']
+    assert list(orders['shares']) == [10, 10]
+
+
+def test_shrinks_and_skips_under_the_risk_budget():
+    candidates = sized([('AAA', 10, 10.0, 2.0), ('BBB', 10, 10.0, 2.0),
+                        ('CCC', 10, 10.0, 20.0), ('DDD', 10, 10.0, 1.0)])
+    orders = select_trades(candidates, account_value=100_000, max_trades=5,
+                           risk_budget=31)
+
+    # AAA risks 20, BBB shrinks to the 11 left (5 shares), CCC cannot fit a
+    # share in the last dollar, DDD takes it
+    assert list(orders['ticker']) == ['AAA', 'BBB', 'DDD']
+    assert list(orders['shares']) == [10, 5, 1]
+    assert list(orders['risk_dollars']) == [20.0, 10.0, 1.0]
+    assert orders['risk_dollars'].sum() <= 31
+
+
+def test_respects_capital():
+    candidates = sized([('AAA', 2, 100.0, 1.0), ('BBB', 1, 100.0, 1.0),
+                        ('CCC', 4, 25.0, 1.0)])
+    orders = select_trades(candidates, account_value=100_000, max_trades=5,
+                           capital=250)
+
+    assert list(orders['ticker']) == ['AAA', 'CCC']
+    assert list(orders['shares']) == [2, 2]
+    assert list(orders['notional']) == [200.0, 50.0]
+
+
+def test_defaults_come_from_config(monkeypatch):
+    import config
+    monkeypatch.setattr(config, 'MAX_DAILY_TRADES', 1)
+    monkeypatch.setattr(config, 'MAX_DAILY_LOSS', 0.001)
+
+    candidates = sized([('AAA', 10, 10.0, 1.0), ('BBB', 10, 10.0, 1.0)])
+    orders = select_trades(candidates, account_value=5_000)
+
+    # 0.1% of 5,000 is 5 dollars of risk
+    assert list(orders['ticker']) == ['AAA']
+    assert orders['risk_dollars'].iloc[0] == pytest.approx(5.0)
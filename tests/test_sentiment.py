@@ -0,0 +1,78 @@
+"""
+Tests for the batched sentiment cache (sentiment.py)
+"""
+
+import math
+
+import pytest
+
+from sentiment import FixtureSentimentProvider, SentimentCache, SentimentProvider
+
+TICKERS = [f"T{i:03d}" for i in range(390)]
+SCORES = {t: (i % 21 - 10) / 10 for i, t in enumerate(TICKERS)}
+BATCHES = math.ceil(len(TICKERS) / 50)
+
+
+def scan(cache, start, minutes):
+    """get() every ticker, spreading the calls over `minutes`"""
+    step = minutes * 60 / len(TICKERS)
+    return {t: cache.get(t, now=start + i * step) for i, t in enumerate(TICKERS)}
+
+
+def test_prefetched_scores_survive_a_bucket_boundary():
+    provider = FixtureSentimentProvider(SCORES, batch_size=50)
+    cache = SentimentCache(provider, ttl_seconds=3600)
+    start = 15 * 60 * 1000 - 60  # a minute before a 15-minute boundary
+
+    for future in cache.prefetch(TICKERS, now=start):
+        future.result()
+    scores = scan(cache, start, minutes=30)
+
+    assert scores == SCORES
+    assert provider.requests == BATCHES
+    assert cache.misses == 0
+
+
+def test_expired_scores_are_refetched_in_batches():
+    provider = FixtureSentimentProvider(SCORES, batch_size=50)
+    cache = SentimentCache(provider, ttl_seconds=600)
+
+    for future in cache.prefetch(TICKERS, now=0):
+        future.result()
+    scores = scan(cache, 601, minutes=5)  # every entry has expired
+
+    assert scores == SCORES
+    assert provider.requests == 2 * BATCHES
+
+
+def test_unknown_tickers_are_cached_as_none():
+    provider = FixtureSentimentProvider({'AAPL': 0.4}, batch_size=50)
+    cache = SentimentCache(provider, ttl_seconds=600)
+
+    assert cache.get_many(['AAPL', 'NOPE'], now=0) == {'AAPL': 0.4, 'NOPE': None}
+    assert cache.get('NOPE', now=300) is None
+    assert provider.requests == 1
+
+
+class FlakyProvider(FixtureSentimentProvider):
+    """Fixture provider whose first request fails"""
+
+    def fetch_batch(self, tickers):
+        if self.requests == 0:
+            self.requests += 1
+            raise ConnectionError("provider unavailable")
+        return super().fetch_batch(tickers)
+
+
+def test_failed_batch_is_retried():
+    provider = FlakyProvider({'AAPL': 0.4}, batch_size=50)
+    cache = SentimentCache(provider, ttl_seconds=600)
+
+    assert cache.get('AAPL', now=0) is None
+    assert cache.get('AAPL', now=1) == 0.4
+    assert provider.requests == 2
+
+
+def test_provider_must_implement_fetch_batch():
+    with pytest.raises(TypeError):
+        SentimentProvider()
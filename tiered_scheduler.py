@@ -0,0 +1,194 @@
+"""
+Tiered Scheduler
+Decides which tickers to refresh on each bar close under a request budget:
+hot names every bar, warm names every few bars, the cold universe on rotation
+"""
+
+import glob
+import math
+import os
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+import config
+
+HOT = 'hot'
+WARM = 'warm'
+COLD = 'cold'
+TIERS = [HOT, WARM, COLD]
+
+
+def previous_top_tickers(n: int = None) -> List[str]:
+    """
+    Top tickers from the most recent saved scan results
+
+    Args:
+        n: Number of tickers (defaults to config.TOP_N_STOCKS)
+
+    Returns:
+        Tickers ranked by confidence score, or [] if no results are saved
+    """
+    pattern = os.path.join(config.OUTPUT_DIRECTORY, f"{config.OUTPUT_FILENAME_PREFIX}_*.csv")
+    files = sorted(glob.glob(pattern), key=os.path.getmtime)
+    if not files:
+        return []
+
+    results = pd.read_csv(files[-1])
+    if 'ticker' not in results or 'confidence_score' not in results:
+        return []
+    results = results.sort_values('confidence_score', ascending=False)
+    return results['ticker'].head(n or config.TOP_N_STOCKS).tolist()
+
+
+class TieredScheduler:
+    """
+    Priority tiers with automatic promotion and demotion
+
+    Each cycle (bar close) can spend `request_budget` download requests of
+    `tickers_per_request` tickers each. Hot tickers are scheduled first,
+    then warm tickers that are due, then the cold tickers that have gone
+    longest without a refresh, until the budget is used up. Tickers that
+    are fetched in separate calls (e.g. a short period for tickers with a
+    recent window, a longer one for the rest) fill separate requests, so
+    each fetch group is charged its own requests.
+
+    A result whose confidence score or volume ratio crosses the hot/warm
+    thresholds promotes its ticker immediately. Tickers are demoted one tier
+    after `demote_after` consecutive refreshes below their tier's
+    thresholds. Pinned tickers (the watchlist) always stay hot.
+    """
+
+    def __init__(self, tickers: List[str], hot: List[str] = None,
+                 pinned: List[str] = None, request_budget: int = None,
+                 tickers_per_request: int = 1, warm_every: int = None,
+                 demote_after: int = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            tickers: Full universe
+            hot: Tickers that start in the hot tier (e.g. yesterday's top N)
+            pinned: Tickers that are always hot (e.g. the trading watchlist)
+            request_budget: Requests allowed per cycle
+            tickers_per_request: Tickers one request refreshes (1 for
+                per-ticker fetches, the batch size for batched downloads)
+            warm_every: Warm tickers are refreshed every N cycles
+            demote_after: Consecutive weak refreshes before demotion
+        """
+        self.pinned = set(pinned or [])
+        self.request_budget = request_budget or config.SCHEDULER_REQUEST_BUDGET
+        self.tickers_per_request = tickers_per_request
+        self.warm_every = warm_every or config.SCHEDULER_WARM_EVERY_BARS
+        self.demote_after = demote_after or config.SCHEDULER_DEMOTE_AFTER
+
+        self.tier = {t: COLD for t in tickers}
+        for ticker in list(hot or []) + list(self.pinned):
+            self.tier[ticker] = HOT
+
+        self.cycle = 0
+        self.last_refresh = {}  # ticker -> cycle of the last refresh
+        self.weak_streak = {}  # ticker -> consecutive refreshes below its tier
+        self.requests_used = 0
+
+    @property
+    def capacity(self) -> int:
+        """Tickers that can be refreshed per cycle"""
+        return self.request_budget * self.tickers_per_request
+
+    def tickers_in(self, tier: str) -> List[str]:
+        return [t for t, t_tier in self.tier.items() if t_tier == tier]
+
+    def _staleness(self, ticker: str) -> int:
+        # Never-refreshed tickers are the stalest
+        return self.cycle - self.last_refresh.get(ticker, -math.inf)
+
+    def plan(self, group: Callable[[str], object] = None) -> List[str]:
+        """
+        Choose the tickers to refresh this cycle and advance the cycle
+
+        Args:
+            group: group(ticker) -> key of the fetch call the ticker will be
+                downloaded in (all tickers share one call if omitted)
+
+        Returns:
+            Tickers to refresh, hot first
+        """
+        by_staleness = lambda tickers: sorted(tickers, key=self._staleness, reverse=True)
+
+        hot = by_staleness(self.tickers_in(HOT))
+        warm = by_staleness([t for t in self.tickers_in(WARM)
+                             if self._staleness(t) >= self.warm_every])
+        cold = by_staleness(self.tickers_in(COLD))
+
+        planned = []
+        group_sizes = {}  # fetch group -> tickers planned in it
+        requests = 0
+        for ticker in hot + warm + cold:
+            key = group(ticker) if group is not None else None
+            size = group_sizes.get(key, 0)
+            if size % self.tickers_per_request == 0:
+                # The ticker opens a new request in its group
+                if requests >= self.request_budget:
+                    if all(n % self.tickers_per_request == 0 for n in group_sizes.values()):
+                        break  # Budget spent and no partly filled request left
+                    continue
+                requests += 1
+            group_sizes[key] = size + 1
+            planned.append(ticker)
+
+        for ticker in planned:
+            self.last_refresh[ticker] = self.cycle
+
+        self.requests_used += requests
+        self.cycle += 1
+        return planned
+
+    def _target_tier(self, analysis: Dict) -> str:
+        confidence = analysis.get('confidence_score') or 0
+        volume_ratio = analysis.get('volume_ratio') or 0
+
+        if confidence >= config.HOT_CONFIDENCE or volume_ratio >= config.HOT_VOLUME_RATIO:
+            return HOT
+        if confidence >= config.WARM_CONFIDENCE or volume_ratio >= config.WARM_VOLUME_RATIO:
+            return WARM
+        return COLD
+
+    def observe(self, ticker: str, analysis: Dict = None) -> str:
+        """
+        Update a ticker's tier from its latest analysis
+
+        Args:
+            ticker: Stock ticker symbol
+            analysis: Latest analysis (None if it no longer qualifies)
+
+        Returns:
+            The ticker's tier after the update
+        """
+        if ticker in self.pinned:
+            return HOT
+
+        current = self.tier.get(ticker, COLD)
+        target = self._target_tier(analysis) if analysis else COLD
+
+        if TIERS.index(target) < TIERS.index(current):
+            self.tier[ticker] = target
+            self.weak_streak[ticker] = 0
+        elif TIERS.index(target) > TIERS.index(current):
+            self.weak_streak[ticker] = self.weak_streak.get(ticker, 0) + 1
+            if self.weak_streak[ticker] >= self.demote_after:
+                self.tier[ticker] = TIERS[TIERS.index(current) + 1]
+                self.weak_streak[ticker] = 0
+        else:
+            self.weak_streak[ticker] = 0
+
+        return self.tier[ticker]
+
+    def summary(self) -> Dict:
+        """Tier sizes and budget usage"""
+        return {
+            'cycle': self.cycle,
+            **{tier: len(self.tickers_in(tier)) for tier in TIERS},
+            'capacity_per_cycle': self.capacity,
+            'requests_used': self.requests_used,
+        }
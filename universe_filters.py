@@ -0,0 +1,339 @@
+"""
+Universe Filters
+Cheap, batched pre-screening stages that run before the per-ticker analysis
+"""
+
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+import config
+
+# In-memory cache of daily bars: (ticker, period) -> (fetched_at, DataFrame)
+_DAILY_BAR_CACHE: Dict[tuple, tuple] = {}
+
+
+def split_download(data: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Split a grouped yf.download() frame into one DataFrame per ticker"""
+    frames = {}
+
+    if data is None or data.empty:
+        return frames
+
+    if not isinstance(data.columns, pd.MultiIndex):
+        # Single ticker downloads may come back without the ticker level
+        if len(tickers) == 1:
+            frames[tickers[0]] = data.dropna(how='all')
+        return frames
+
+    available = set(data.columns.get_level_values(0))
+    for ticker in tickers:
+        if ticker not in available:
+            continue
+        df = data[ticker].dropna(how='all')
+        if not df.empty:
+            frames[ticker] = df
+
+    return frames
+
+
+def fetch_daily_bars(tickers: List[str], period: str = "3mo",
+                     batch_size: int = None,
+                     max_age: float = None) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch daily OHLCV bars for many tickers using batched downloads
+
+    Tickers fetched within the last `max_age` seconds are served from the
+    in-memory cache; only the remainder is downloaded, `batch_size` symbols
+    per request.
+
+    Args:
+        tickers: Stock ticker symbols
+        period: Daily history period (1mo, 3mo, 6mo)
+        batch_size: Symbols per download request
+        max_age: Maximum cache age in seconds
+
+    Returns:
+        Dictionary of ticker -> daily OHLCV DataFrame
+    """
+    batch_size = batch_size or config.PREFILTER_BATCH_SIZE
+    max_age = config.PREFILTER_CACHE_SECONDS if max_age is None else max_age
+    now = time.time()
+
+    frames = {}
+    missing = []
+    for ticker in tickers:
+        cached = _DAILY_BAR_CACHE.get((ticker, period))
+        if cached is not None and now - cached[0] <= max_age:
+            frames[ticker] = cached[1]
+        else:
+            missing.append(ticker)
+
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        try:
+            data = yf.download(batch, period=period, interval="1d",
+                               group_by="ticker", auto_adjust=False,
+                               threads=True, progress=False)
+        except Exception as e:
+            print(f"⚠️  Daily batch download failed: {str(e)[:100]}")
+            continue
+
+        for ticker, df in split_download(data, batch).items():
+            _DAILY_BAR_CACHE[(ticker, period)] = (now, df)
+            frames[ticker] = df
+
+    return frames
+
+
+def download_intraday_bars(tickers: List[str], period: str = "1d", interval: str = "5m",
+                           batch_size: int = None) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch intraday bars for many tickers with batched downloads
+
+    Args:
+        tickers: Stock ticker symbols
+        period: History period per request ("1d" for the newest bars)
+        interval: Bar interval
+        batch_size: Symbols per download request
+
+    Returns:
+        Dictionary of ticker -> OHLCV DataFrame
+    """
+    batch_size = batch_size or config.WATCH_BATCH_SIZE
+    frames = {}
+
+    for start in range(0, len(tickers), batch_size):
+        batch = tickers[start:start + batch_size]
+        try:
+            data = yf.download(batch, period=period, interval=interval,
+                               group_by="ticker", threads=True, progress=False)
+        except Exception as e:
+            print(f"⚠️  Intraday batch download failed: {str(e)[:100]}")
+            continue
+        frames.update(split_download(data, batch))
+
+    return frames
+
+
+def build_snapshot(daily_bars: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Build a last-bar quote snapshot from daily bars
+
+    Args:
+        daily_bars: Dictionary of ticker -> daily OHLCV DataFrame
+
+    Returns:
+        DataFrame indexed by ticker with last_close and avg_volume
+    """
+    rows = []
+    for ticker, df in daily_bars.items():
+        if df is None or df.empty:
+            continue
+        rows.append({
+            'ticker': ticker,
+            'last_close': df['Close'].iloc[-1],
+            'avg_volume': df['Volume'].mean(),
+        })
+
+    if not rows:
+        return pd.DataFrame(columns=['last_close', 'avg_volume'])
+
+    return pd.DataFrame(rows).set_index('ticker')
+
+
+def prefilter_snapshot(tickers: List[str], snapshot: pd.DataFrame,
+                       min_price: float, max_price: float,
+                       min_volume: float) -> List[str]:
+    """
+    Drop tickers whose snapshot fails the price/volume criteria
+
+    Tickers missing from the snapshot are kept so the full analysis stage
+    can decide on them with its own data.
+
+    Args:
+        tickers: Stock ticker symbols, in scan order
+        snapshot: Output of build_snapshot()
+        min_price: Minimum stock price
+        max_price: Maximum stock price
+        min_volume: Minimum average daily volume
+
+    Returns:
+        Surviving tickers, in their original order
+    """
+    if snapshot.empty:
+        return list(tickers)
+
+    eligible = snapshot[
+        (snapshot['last_close'] >= min_price) &
+        (snapshot['last_close'] <= max_price) &
+        (snapshot['avg_volume'] >= min_volume)
+    ].index
+    eligible = set(eligible)
+    known = set(snapshot.index)
+
+    return [t for t in tickers if t in eligible or t not in known]
+
+
+def prefilter_universe(tickers: List[str], min_price: float, max_price: float,
+                       min_volume: float) -> tuple:
+    """
+    Run the quote prefilter stage over a universe
+
+    Args:
+        tickers: Stock ticker symbols
+        min_price: Minimum stock price
+        max_price: Maximum stock price
+        min_volume: Minimum average daily volume
+
+    Returns:
+        Tuple of (surviving tickers, snapshot DataFrame)
+    """
+    print(f"Prefiltering {len(tickers)} stocks on daily price/volume...")
+
+    daily_bars = fetch_daily_bars(tickers, period=config.PREFILTER_PERIOD)
+    snapshot = build_snapshot(daily_bars)
+    survivors = prefilter_snapshot(tickers, snapshot, min_price,
+                                   max_price, min_volume)
+
+    print(f"✅ Prefilter kept {len(survivors)}/{len(tickers)} stocks "
+          f"({len(tickers) - len(survivors)} skipped before full analysis)")
+
+    return survivors, snapshot
+
+
+def _field_panel(daily_bars: Dict[str, pd.DataFrame], field: str) -> pd.DataFrame:
+    """Align one OHLCV field across tickers into a date x ticker panel"""
+    return pd.DataFrame({t: df[field] for t, df in daily_bars.items()
+                         if df is not None and not df.empty})
+
+
+def compute_daily_metrics(daily_bars: Dict[str, pd.DataFrame],
+                          atr_period: int = 14,
+                          volume_period: int = 20,
+                          trend_period: int = 20) -> pd.DataFrame:
+    """
+    Compute coarse daily-bar screening metrics for the whole universe
+
+    All tickers are aligned into date x ticker panels so each metric is a
+    single vectorized operation over the universe.
+
+    Args:
+        daily_bars: Dictionary of ticker -> daily OHLCV DataFrame
+        atr_period: ATR lookback in days
+        volume_period: Average volume lookback in days
+        trend_period: SMA lookback for the trend measure
+
+    Returns:
+        DataFrame indexed by ticker with gap_pct, atr_pct, rel_volume,
+        trend_pct
+    """
+    if not daily_bars:
+        return pd.DataFrame(columns=['gap_pct', 'atr_pct', 'rel_volume', 'trend_pct'])
+
+    open_ = _field_panel(daily_bars, 'Open')
+    high = _field_panel(daily_bars, 'High')
+    low = _field_panel(daily_bars, 'Low')
+    close = _field_panel(daily_bars, 'Close')
+    volume = _field_panel(daily_bars, 'Volume')
+
+    # Forward-fill so tickers with a missing latest row still get metrics
+    close = close.ffill()
+    prev_close = close.shift(1)
+
+    # Gap: today's open vs. yesterday's close
+    gap_pct = (open_.ffill().iloc[-1] - prev_close.iloc[-1]) / prev_close.iloc[-1] * 100
+
+    # ATR as a percentage of price
+    true_range = np.fmax(high - low, np.fmax((high - prev_close).abs(),
+                                             (low - prev_close).abs()))
+    atr = true_range.rolling(atr_period, min_periods=1).mean()
+    atr_pct = atr.ffill().iloc[-1] / close.iloc[-1] * 100
+
+    # Relative volume: latest day vs. average of the prior days
+    avg_volume = volume.shift(1).rolling(volume_period, min_periods=1).mean()
+    rel_volume = volume.ffill().iloc[-1] / avg_volume.iloc[-1]
+
+    # Trend: distance from the daily SMA
+    sma = close.rolling(trend_period, min_periods=1).mean()
+    trend_pct = (close.iloc[-1] - sma.iloc[-1]) / sma.iloc[-1] * 100
+
+    metrics = pd.DataFrame({
+        'gap_pct': gap_pct,
+        'atr_pct': atr_pct,
+        'rel_volume': rel_volume,
+        'trend_pct': trend_pct,
+    })
+    metrics.index.name = 'ticker'
+
+    return metrics.replace([np.inf, -np.inf], np.nan)
+
+
+def score_daily_metrics(metrics: pd.DataFrame, weights: Dict = None) -> pd.Series:
+    """
+    Combine daily metrics into a 0-100 coarse score
+
+    Each metric is converted to a cross-sectional percentile rank (gap and
+    trend by magnitude, since either direction is tradable) and the ranks
+    are blended with the configured weights.
+
+    Args:
+        metrics: Output of compute_daily_metrics()
+        weights: Metric name -> weight (defaults to config.COARSE_SCREEN_WEIGHTS)
+
+    Returns:
+        Series of coarse scores indexed by ticker
+    """
+    weights = weights or config.COARSE_SCREEN_WEIGHTS
+
+    magnitudes = pd.DataFrame({
+        'gap_pct': metrics['gap_pct'].abs(),
+        'atr_pct': metrics['atr_pct'],
+        'rel_volume': metrics['rel_volume'],
+        'trend_pct': metrics['trend_pct'].abs(),
+    })
+    ranks = magnitudes.rank(pct=True).fillna(0)
+
+    total_weight = sum(weights.values())
+    score = sum(ranks[name] * weight for name, weight in weights.items())
+
+    return (score / total_weight * 100).round(2)
+
+
+def coarse_screen(tickers: List[str], top_k: int = None) -> tuple:
+    """
+    Rank the universe on daily bars and keep the top-K for intraday analysis
+
+    Uses the same cached daily download as the prefilter, so running both
+    stages costs a single batched request per `PREFILTER_BATCH_SIZE`
+    tickers. Tickers without daily data are appended after the ranked ones
+    so they are not silently dropped.
+
+    Args:
+        tickers: Stock ticker symbols
+        top_k: Number of survivors (defaults to config.COARSE_SCREEN_TOP_K)
+
+    Returns:
+        Tuple of (top-K tickers, metrics DataFrame with coarse_score)
+    """
+    top_k = config.COARSE_SCREEN_TOP_K if top_k is None else top_k
+
+    print(f"Daily coarse screen over {len(tickers)} stocks...")
+
+    daily_bars = fetch_daily_bars(tickers, period=config.PREFILTER_PERIOD)
+    metrics = compute_daily_metrics(daily_bars)
+    metrics = metrics.loc[metrics.index.intersection(tickers)]
+    metrics['coarse_score'] = score_daily_metrics(metrics)
+    metrics = metrics.sort_values('coarse_score', ascending=False)
+
+    ranked = list(metrics.index)
+    unranked = [t for t in tickers if t not in metrics.index]
+    survivors = (ranked + unranked)[:top_k]
+
+    print(f"✅ Coarse screen kept top {len(survivors)}/{len(tickers)} stocks "
+          f"for intraday analysis")
+
+    return survivors, metrics
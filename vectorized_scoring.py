@@ -0,0 +1,149 @@
+"""
+Vectorized Scoring
+Computes DayTradingScreener's signals and scores at every bar at once
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+import config
+
+SIGNAL_COLUMNS = ['rsi_signal', 'macd_signal', 'bb_signal', 'vwap_signal',
+                  'ma_signal', 'volume_signal', 'momentum_signal']
+
+# Signals that set trade direction and predicted move (volume only amplifies)
+DIRECTIONAL_SIGNALS = ['rsi_signal', 'macd_signal', 'bb_signal', 'vwap_signal',
+                       'ma_signal', 'momentum_signal']
+
+# Parameters that change signals/scores but not the indicators themselves
+SCORING_PARAMS = ['rsi_oversold', 'rsi_overbought', 'high_volume_threshold',
+                  'above_average_volume_threshold', 'momentum_threshold',
+                  'bb_squeeze_quantile', 'confidence_weights',
+                  'signal_alignment_bonus', 'bb_squeeze_bonus',
+                  'low_volatility', 'high_volatility', 'high_volume_ratio']
+
+
+def default_params() -> Dict:
+    """Scoring parameters taken from config.py"""
+    return {
+        'rsi_oversold': config.RSI_OVERSOLD,
+        'rsi_overbought': config.RSI_OVERBOUGHT,
+        'high_volume_threshold': config.HIGH_VOLUME_THRESHOLD,
+        'above_average_volume_threshold': config.ABOVE_AVERAGE_VOLUME_THRESHOLD,
+        'momentum_threshold': config.MOMENTUM_THRESHOLD,
+        'bb_squeeze_quantile': config.BB_SQUEEZE_QUANTILE,
+        'confidence_weights': dict(config.CONFIDENCE_WEIGHTS),
+        'signal_alignment_bonus': config.SIGNAL_ALIGNMENT_BONUS,
+        'bb_squeeze_bonus': config.BB_SQUEEZE_BONUS,
+        'low_volatility': config.LOW_VOLATILITY,
+        'high_volatility': config.HIGH_VOLATILITY,
+        'high_volume_ratio': config.HIGH_VOLUME_RATIO,
+    }
+
+
+def score_bars(df: pd.DataFrame, params: Dict = None) -> pd.DataFrame:
+    """
+    Score every bar the way DayTradingScreener.analyze_bars scores the last one
+
+    The last row equals analyze_bars()'s signals and scores for the same
+    bars. Earlier rows only use data up to that bar (the BB squeeze
+    quantile is an expanding quantile), so the output can be backtested
+    without lookahead.
+
+    Args:
+        df: Bars with DayTradingScreener.calculate_technical_indicators() columns
+        params: Scoring parameters (defaults to default_params())
+
+    Returns:
+        DataFrame indexed like df with signal columns, confidence_score,
+        predicted_move_pct, trade_direction and risk_level
+    """
+    p = default_params()
+    if params:
+        p.update(params)
+
+    close = df['Close']
+    out = pd.DataFrame(index=df.index)
+
+    # RSI
+    rsi = df['RSI']
+    out['rsi_signal'] = np.select([rsi < p['rsi_oversold'], rsi > p['rsi_overbought']],
+                                  [1.0, -1.0], 0.0)
+
+    # MACD (crossovers compare against the previous bar)
+    macd, macd_sig = df['MACD'], df['MACD_Signal']
+    prev_macd, prev_sig = macd.shift(1), macd_sig.shift(1)
+    out['macd_signal'] = np.select(
+        [(macd > macd_sig) & (prev_macd <= prev_sig),
+         (macd < macd_sig) & (prev_macd >= prev_sig),
+         macd > macd_sig,
+         macd < macd_sig],
+        [1.0, -1.0, 0.5, -0.5], 0.0)
+
+    # Bollinger Bands
+    bb_valid = df['BB_Upper'].notna() & df['BB_Lower'].notna()
+    out['bb_signal'] = np.select([bb_valid & (close <= df['BB_Lower']),
+                                  bb_valid & (close >= df['BB_Upper'])],
+                                 [1.0, -1.0], 0.0)
+    squeeze_level = df['BB_Width'].expanding().quantile(p['bb_squeeze_quantile'])
+    out['bb_squeeze'] = bb_valid & (df['BB_Width'] < squeeze_level)
+
+    # VWAP
+    out['vwap_signal'] = np.select([close > df['VWAP'], close < df['VWAP']], [1.0, -1.0], 0.0)
+
+    # Moving averages
+    out['ma_signal'] = np.select([df['EMA_9'] > df['EMA_20'], df['EMA_9'] < df['EMA_20']],
+                                 [1.0, -1.0], 0.0)
+
+    # Volume
+    volume_ratio = df['Volume_Ratio']
+    out['volume_signal'] = np.select(
+        [volume_ratio > p['high_volume_threshold'],
+         volume_ratio > p['above_average_volume_threshold']],
+        [1.0, 0.5], 0.0)
+
+    # Momentum over the last 20 bars
+    momentum = (close - close.shift(19)) / close.shift(19) * 100
+    out['momentum_pct'] = momentum
+    out['momentum_signal'] = np.select([momentum > p['momentum_threshold'],
+                                        momentum < -p['momentum_threshold']],
+                                       [1.0, -1.0], 0.0)
+
+    # Confidence: weighted absolute signal strength with bonuses
+    weights = p['confidence_weights']
+    signals = out[list(weights)].to_numpy()
+    weight_values = np.array(list(weights.values()))
+    confidence = np.abs(signals) @ weight_values / weight_values.sum() * 100
+
+    aligned = ~((signals > 0).any(axis=1) & (signals < 0).any(axis=1))
+    confidence = np.where(aligned, np.minimum(100, confidence * p['signal_alignment_bonus']),
+                          confidence)
+    confidence = np.where(out['bb_squeeze'], np.minimum(100, confidence * p['bb_squeeze_bonus']),
+                          confidence)
+    out['confidence_score'] = np.round(confidence, 2)
+
+    # Volatility: ATR % with a rolling-std fallback
+    fallback_volatility = close.rolling(20, min_periods=1).std() / \
+        close.rolling(20, min_periods=1).mean() * 100
+    volatility = (df['ATR'] / close * 100).where(df['ATR'].notna(), fallback_volatility)
+
+    # Predicted move and direction
+    signal_sum = out[DIRECTIONAL_SIGNALS].sum(axis=1)
+    direction = np.sign(signal_sum)
+    strength = signal_sum.abs() / len(DIRECTIONAL_SIGNALS)
+    predicted = direction * volatility * (0.5 + strength * 0.5)
+    predicted = predicted.where(out['volume_signal'] <= 0, predicted * 1.2)
+    out['predicted_move_pct'] = predicted.round(2)
+
+    out['trade_direction'] = np.select([signal_sum > 1, signal_sum < -1],
+                                       ['LONG', 'SHORT'], 'NEUTRAL')
+
+    # Risk level
+    out['risk_level'] = np.select(
+        [(volatility < p['low_volatility']) & (volume_ratio < p['high_volume_threshold']),
+         (volatility > p['high_volatility']) | (volume_ratio > p['high_volume_ratio'])],
+        ['LOW', 'HIGH'], 'MEDIUM')
+
+    return out
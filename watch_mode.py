@@ -0,0 +1,259 @@
+"""
+Watch Mode
+Long-running scanner that wakes at each bar close during market hours and
+rescores only the tickers that received a new bar
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+import config
+from scan_pipeline import ConsoleSink, LeaderboardSink
+from tiered_scheduler import TieredScheduler, previous_top_tickers
+from universe_filters import download_intraday_bars
+
+
+def market_session(day: pd.Timestamp) -> tuple:
+    """Open and close timestamps of the regular session on a given day"""
+    day = day.normalize()
+    market_open = day + pd.Timedelta(hours=config.MARKET_OPEN_HOUR,
+                                     minutes=config.MARKET_OPEN_MINUTE)
+    market_close = day + pd.Timedelta(hours=config.MARKET_CLOSE_HOUR,
+                                      minutes=config.MARKET_CLOSE_MINUTE)
+    return market_open, market_close
+
+
+def next_bar_close(now: pd.Timestamp = None, minutes: int = None) -> pd.Timestamp:
+    """
+    Next bar close, counted in whole bars from the market open
+
+    Outside market hours (and on weekends) this is the first bar close of
+    the next session. Exchange holidays are not known and are treated as
+    trading days.
+
+    Args:
+        now: Current time (defaults to now, in config.MARKET_TIMEZONE)
+        minutes: Bar length in minutes
+
+    Returns:
+        Timestamp of the next bar close, in config.MARKET_TIMEZONE
+    """
+    minutes = minutes or config.WATCH_INTERVAL_MINUTES
+    bar = pd.Timedelta(minutes=minutes)
+    now = pd.Timestamp.now(tz=config.MARKET_TIMEZONE) if now is None \
+        else pd.Timestamp(now).tz_convert(config.MARKET_TIMEZONE)
+
+    day = now
+    while True:
+        market_open, market_close = market_session(day)
+        if day.weekday() < 5 and now < market_close:
+            if now < market_open + bar:
+                return market_open + bar
+            bars_done = (now - market_open) // bar
+            return min(market_open + (bars_done + 1) * bar, market_close)
+        day = day.normalize() + pd.Timedelta(days=1)
+
+
+class BarWatcher:
+    """
+    Keeps a rolling bar window per ticker and rescores on each bar close
+
+    Each refresh downloads only the current session's bars in batches,
+    merges the closed bars that are newer than the ticker's window, and
+    re-runs the analysis only for tickers whose window changed. Indicators
+    are recomputed over the bounded window (WATCH_WINDOW_BARS), which keeps
+    each ticker's update to a few milliseconds.
+    """
+
+    def __init__(self, screener, tickers: List[str], sinks: List = None,
+                 fetch_fn: Callable = None, interval: str = "5m",
+                 scheduler=None):
+        """
+        Initialize the watcher
+
+        Args:
+            screener: DayTradingScreener providing analyze_bars() and filters
+            tickers: Tickers to watch
+            sinks: Objects with write(analysis) and close(); each changed
+                ticker's new analysis is published to them
+            fetch_fn: fetch_fn(tickers, period) -> {ticker: bars}
+                (defaults to batched yfinance downloads)
+            interval: Bar interval
+            scheduler: Optional TieredScheduler choosing which tickers to
+                refresh each cycle (all tickers every cycle without one)
+        """
+        self.screener = screener
+        self.scheduler = scheduler
+        self.tickers = list(tickers)
+        self.interval = interval
+        self.leaderboard = LeaderboardSink(print_every=0)
+        self.sinks = (sinks if sinks is not None else [ConsoleSink()]) + [self.leaderboard]
+        self.fetch_fn = fetch_fn or (lambda tickers, period: download_intraday_bars(
+            tickers, period=period, interval=interval))
+        self.bars = {}  # ticker -> rolling window of closed bars
+        self.analyses = {}  # ticker -> latest analysis
+        self.cycles = 0
+
+    def _closed_bars(self, df: pd.DataFrame, now: pd.Timestamp) -> pd.DataFrame:
+        """Drop the still-forming bar (its close is after `now`)"""
+        bar = pd.Timedelta(minutes=config.WATCH_INTERVAL_MINUTES)
+        return df[df.index + bar <= now]
+
+    def _fetch_period(self, ticker: str, now: pd.Timestamp, period: str) -> str:
+        """Download period for a ticker: `period` if its window is recent,
+        else "5d" (new, or skipped by the scheduler for over a day) to avoid a gap"""
+        window = self.bars.get(ticker)
+        if window is not None and not window.empty and \
+                now - window.index[-1] <= pd.Timedelta(days=1):
+            return period
+        return "5d"
+
+    def refresh(self, now: pd.Timestamp = None, period: str = "1d") -> List[str]:
+        """
+        Merge newly closed bars and rescore the tickers that changed
+
+        Args:
+            now: Current time (defaults to now)
+            period: Download period ("5d" for the initial window)
+
+        Returns:
+            Tickers whose analysis was recomputed
+        """
+        now = pd.Timestamp.now(tz=config.MARKET_TIMEZONE) if now is None else now
+        period_of = lambda ticker: self._fetch_period(ticker, now, period)
+        # One fetch call per period; the scheduler budgets each call's requests
+        tickers = self.scheduler.plan(group=period_of) if self.scheduler is not None \
+            else self.tickers
+
+        groups = {}
+        for ticker in tickers:
+            groups.setdefault(period_of(ticker), []).append(ticker)
+        telemetry = self.screener.telemetry
+        fetched = {}
+        with telemetry.stage('watch_fetch'):
+            for group_period, group in groups.items():
+                fetched.update(self.fetch_fn(group, group_period))
+
+        changed = []
+        for ticker, df in fetched.items():
+            df = self._closed_bars(df[['Open', 'High', 'Low', 'Close', 'Volume']], now)
+            window = self.bars.get(ticker)
+
+            if window is not None and not window.empty:
+                new = df[df.index > window.index[-1]]
+                if new.empty:
+                    continue
+                window = pd.concat([window, new])
+            elif df.empty:
+                continue
+            else:
+                window = df
+
+            self.bars[ticker] = window.iloc[-config.WATCH_WINDOW_BARS:]
+            if self.screener.bar_cache is not None:
+                self.screener.bar_cache.update(ticker, df, interval=self.interval)
+            changed.append(ticker)
+
+        for ticker in changed:
+            try:
+                analysis = self.screener.analyze_bars(ticker, self.bars[ticker].copy())
+            except Exception as e:
+                telemetry.count('analysis_errors', type=type(e).__name__)
+                print(f"⚠️  Analysis failed for {ticker}: {str(e)[:100]}")
+                continue
+            if self.scheduler is not None:
+                self.scheduler.observe(ticker, analysis)
+            if analysis is None:
+                self.analyses.pop(ticker, None)
+                for sink in self.sinks:
+                    if hasattr(sink, 'remove'):
+                        sink.remove(ticker)
+                continue
+            self.analyses[ticker] = analysis
+            for sink in self.sinks:
+                sink.write(analysis)
+
+        self.cycles += 1
+        telemetry.count('tickers_scanned', len(changed))
+        telemetry.set_gauge('watched_tickers', len(self.tickers))
+        return changed
+
+    def ranking(self, top_n: int = None) -> pd.DataFrame:
+        """Current ranking of every watched ticker, best first"""
+        board = self.leaderboard.top(top_n or len(self.analyses) or 1)
+        return pd.DataFrame(board)
+
+    def run(self, max_cycles: int = None):
+        """
+        Watch until interrupted (or for max_cycles bar closes)
+
+        Args:
+            max_cycles: Stop after this many refreshes
+        """
+        print(f"👀 Watching {len(self.tickers)} stocks on {self.interval} bar closes "
+              f"(Ctrl+C to stop)...")
+        start = time.time()
+        self.refresh(period="5d")
+        print(f"✅ Initial window loaded for {len(self.bars)} stocks "
+              f"in {time.time() - start:.1f}s")
+        self.leaderboard.print_board()
+
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                wake = next_bar_close() + pd.Timedelta(seconds=config.WATCH_SETTLE_SECONDS)
+                delay = (wake - pd.Timestamp.now(tz=config.MARKET_TIMEZONE)).total_seconds()
+                print(f"💤 Next refresh at {wake.strftime('%a %H:%M:%S')}")
+                time.sleep(max(delay, 0))
+
+                start = time.time()
+                changed = self.refresh()
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] "
+                      f"{len(changed)}/{len(self.tickers)} stocks had a new bar, "
+                      f"refreshed in {time.time() - start:.1f}s")
+                if self.scheduler is not None:
+                    tiers = self.scheduler.summary()
+                    print(f"   Tiers: {tiers['hot']} hot, {tiers['warm']} warm, "
+                          f"{tiers['cold']} cold ({tiers['requests_used']} requests used)")
+                if changed:
+                    self.leaderboard.print_board()
+                cycles += 1
+        except KeyboardInterrupt:
+            print("\n👋 Watch mode stopped")
+        finally:
+            for sink in self.sinks:
+                sink.close()
+
+
+if __name__ == "__main__":
+    from alert_engine import AlertEngine
+    from bar_cache import BarCache
+    from day_trading_screener import DayTradingScreener
+    from metrics_export import cache_collector, start_metrics_export
+
+    screener = DayTradingScreener(min_price=config.MIN_PRICE, max_price=config.MAX_PRICE,
+                                  min_volume=config.MIN_VOLUME, bar_cache=BarCache())
+    universe = screener.get_stock_universe()
+    if config.USE_PREFILTER:
+        universe = screener.prefilter_universe(universe)
+
+    scheduler = None
+    if config.USE_TIERED_SCHEDULER:
+        scheduler = TieredScheduler(universe, hot=previous_top_tickers(),
+                                    pinned=config.HOT_WATCHLIST,
+                                    tickers_per_request=config.WATCH_BATCH_SIZE)
+        universe = list(scheduler.tier)
+
+    sinks = [ConsoleSink()]
+    if config.ENABLE_ALERTS:
+        sinks.append(AlertEngine())
+
+    exporter = start_metrics_export(screener.telemetry,
+                                    [cache_collector('bars', screener.bar_cache)])
+
+    BarWatcher(screener, universe, sinks=sinks, scheduler=scheduler).run()
+    if exporter:
+        exporter.stop()